@@ -0,0 +1,293 @@
+# License: BSD
+
+"""Board registry.
+
+Lists the supported boards with their vendor, FPGA family, device, default clock and available
+resources without importing the platform modules (and LiteX/vendor toolchain packages): platform
+sources are statically analyzed and the resulting index is cached on disk, only boards whose
+platform file changed being analyzed again.
+
+    >>> from litex_boards import platforms
+    >>> platforms.boards(family="ECP5", resource="eth")
+    ['colorlight_5a_75b', 'ecpix5', 'trellisboard', 'versa_ecp5']
+    >>> platforms.board_info("arty")["device"]
+    'xc7a35ticsg324-1L'
+    >>> platform = platforms.load("arty").Platform()
+"""
+
+import os
+import ast
+import json
+import importlib
+import operator
+
+__all__ = ["boards", "board_info", "families", "load"]
+
+# Families -----------------------------------------------------------------------------------------
+
+_families = [
+    # Prefix    Vendor       Family
+    ("xc6s",   "xilinx",    "Spartan6"),
+    ("xc7s",   "xilinx",    "Spartan7"),
+    ("xc7a",   "xilinx",    "Artix7"),
+    ("xc7k",   "xilinx",    "Kintex7"),
+    ("xc7v",   "xilinx",    "Virtex7"),
+    ("xcku",   "xilinx",    "Kintex UltraScale"),
+    ("xczu",   "xilinx",    "Zynq UltraScale+"),
+    ("xcvu",   "xilinx",    "Virtex UltraScale+"),
+    ("ep4c",   "intel",     "Cyclone4"),
+    ("5c",     "intel",     "Cyclone5"),
+    ("10cl",   "intel",     "Cyclone10"),
+    ("10m",    "intel",     "Max10"),
+    ("ice40",  "lattice",   "iCE40"),
+    ("lcmxo",  "lattice",   "MachXO"),
+    ("lfe5",   "lattice",   "ECP5"),
+    ("mpf",    "microsemi", "PolarFire"),
+]
+
+# Default toolchain of the vendor Platforms.
+_default_toolchains = {
+    "XilinxPlatform"    : "ise",
+    "LatticePlatform"   : "diamond",
+    "AlteraPlatform"    : "quartus",
+    "MicrosemiPlatform" : "libero_soc_polarfire",
+}
+
+def _device_family(device):
+    for prefix, vendor, family in _families:
+        if device.lower().startswith(prefix):
+            return vendor, family
+    return None, None
+
+# Static Analysis ----------------------------------------------------------------------------------
+
+_binops = {
+    ast.Add  : operator.add,
+    ast.Sub  : operator.sub,
+    ast.Mult : operator.mul,
+    ast.Div  : operator.truediv,
+}
+
+class _Unknown(Exception):
+    pass
+
+def _eval(node, env):
+    """Evaluate the simple expressions used in platform files (constants, dict lookups, string
+    concatenations/formatting) with `env` bindings."""
+    if isinstance(node, ast.Name):
+        if node.id not in env:
+            raise _Unknown
+        return env[node.id]
+    if isinstance(node, ast.BinOp) and type(node.op) in _binops:
+        return _binops[type(node.op)](_eval(node.left, env), _eval(node.right, env))
+    if isinstance(node, ast.Subscript):
+        index = node.slice.value if isinstance(node.slice, getattr(ast, "Index", ())) else node.slice
+        return _eval(node.value, env)[_eval(index, env)]
+    if isinstance(node, ast.Dict):
+        return {_eval(k, env): _eval(v, env) for k, v in zip(node.keys, node.values)}
+    if isinstance(node, ast.Call) and getattr(node.func, "id", None) == "compiled_connectors":
+        return _eval(node.args[0], env)
+    if isinstance(node, ast.JoinedStr):
+        return "".join(str(_eval(v.value if isinstance(v, ast.FormattedValue) else v, env))
+            for v in node.values)
+    try:
+        return ast.literal_eval(node)
+    except ValueError:
+        raise _Unknown
+
+def _resources(io):
+    resources = {}
+    for entry in io:
+        if isinstance(entry, ast.Tuple) and len(entry.elts) >= 2:
+            try:
+                name = ast.literal_eval(entry.elts[0])
+            except ValueError:
+                continue
+            resources[name] = resources.get(name, 0) + 1
+    return resources
+
+def _connectors(connectors):
+    names = []
+    for entry in connectors:
+        try:
+            names.append(ast.literal_eval(entry.elts[0]))
+        except (AttributeError, IndexError, ValueError):
+            continue
+    return names
+
+def _analyze(filename):
+    with open(filename) as f:
+        tree = ast.parse(f.read(), filename)
+
+    # Module level lists (_io, _connectors, ...) are represented by their AST elements.
+    env = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and isinstance(node.value, ast.List):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    env[target.id] = node.value.elts
+
+    info = {}
+    for node in tree.body:
+        if not (isinstance(node, ast.ClassDef) and node.name == "Platform"):
+            continue
+        for base in node.bases:
+            if isinstance(base, ast.Name):
+                info["base"] = base.id
+        for item in node.body:
+            # Class attributes (default_clk_name, default_clk_period).
+            if isinstance(item, ast.Assign):
+                for target in item.targets:
+                    if isinstance(target, ast.Name) and target.id.startswith("default_"):
+                        try:
+                            info[target.id] = _eval(item.value, {})
+                        except (_Unknown, KeyError, TypeError):
+                            pass
+            # Constructor: evaluate arguments passed to the vendor Platform.
+            if isinstance(item, ast.FunctionDef) and item.name == "__init__":
+                local_env  = dict(env)
+                parameters = item.args.args[len(item.args.args) - len(item.args.defaults):]
+                for arg, default in zip(parameters, item.args.defaults):
+                    try:
+                        local_env[arg.arg] = _eval(default, {})
+                    except _Unknown:
+                        pass
+                for statement in ast.walk(item):
+                    if isinstance(statement, ast.Assign) and isinstance(statement.targets[0], ast.Name):
+                        name = statement.targets[0].id
+                        try:
+                            local_env[name] = _eval(statement.value, local_env)
+                        except (_Unknown, KeyError, TypeError):
+                            continue
+                        # Device variants.
+                        if name == "device" and isinstance(statement.value, ast.Subscript) \
+                           and isinstance(statement.value.value, ast.Dict):
+                            devices = _eval(statement.value.value, local_env).values()
+                            info["devices"] = sorted(d.strip() for d in devices)
+                    if isinstance(statement, ast.Call) and \
+                       isinstance(statement.func, ast.Attribute) and \
+                       statement.func.attr == "__init__" and \
+                       getattr(statement.func.value, "id", None) == info.get("base"):
+                        kwargs = {k.arg: k.value for k in statement.keywords if k.arg is not None}
+                        args   = statement.args[1:]
+                        for i, name in enumerate(["device", "io", "connectors"]):
+                            node = args[i] if i < len(args) else kwargs.get(name)
+                            if node is None:
+                                continue
+                            try:
+                                info[name] = _eval(node, local_env)
+                            except (_Unknown, KeyError, TypeError):
+                                pass
+                        if "toolchain" in kwargs:
+                            try:
+                                info["toolchain"] = _eval(kwargs["toolchain"], local_env)
+                            except _Unknown:
+                                pass
+
+    device = info.get("device").strip() if isinstance(info.get("device"), str) else None
+    vendor, family = _device_family(device) if device is not None else (None, None)
+    return {
+        "vendor"             : vendor,
+        "family"             : family,
+        "device"             : device,
+        "devices"            : info.get("devices", [device] if device is not None else []),
+        "toolchain"          : info.get("toolchain", _default_toolchains.get(info.get("base"))),
+        "default_clk_name"   : info.get("default_clk_name"),
+        "default_clk_period" : info.get("default_clk_period"),
+        "default_clk_freq"   : 1e9/info["default_clk_period"] if "default_clk_period" in info else None,
+        "resources"          : _resources(info.get("io", [])),
+        "connectors"         : _connectors(info.get("connectors", [])),
+    }
+
+# Index --------------------------------------------------------------------------------------------
+
+_platforms_dir = os.path.dirname(os.path.abspath(__file__))
+_index_file    = os.path.join(os.path.expanduser("~"), ".cache", "litex_boards", "platforms.json")
+_index_version = 1
+_index         = None
+
+def _stat(filename):
+    s = os.stat(filename)
+    return [s.st_size, s.st_mtime_ns]
+
+def _load_index():
+    global _index
+    if _index is not None:
+        return _index
+
+    # Load cached index.
+    cache = {}
+    try:
+        with open(_index_file) as f:
+            cache = json.load(f)
+        if cache.get("version") != _index_version or cache.get("path") != _platforms_dir:
+            cache = {}
+    except (OSError, ValueError):
+        pass
+    cached_boards = cache.get("boards", {})
+
+    # Update entries of new/modified platform files.
+    index   = {}
+    updated = False
+    for f in sorted(os.listdir(_platforms_dir)):
+        if not f.endswith(".py") or f.startswith("_"):
+            continue
+        name  = f[:-3]
+        stat  = _stat(os.path.join(_platforms_dir, f))
+        entry = cached_boards.get(name)
+        if entry is None or entry["stat"] != stat:
+            entry   = {"stat": stat, "info": _analyze(os.path.join(_platforms_dir, f))}
+            updated = True
+        index[name] = entry
+    updated |= (len(index) != len(cached_boards))
+
+    # Save index.
+    if updated:
+        try:
+            os.makedirs(os.path.dirname(_index_file), exist_ok=True)
+            tmp = _index_file + ".{}".format(os.getpid())
+            with open(tmp, "w") as f:
+                json.dump({"version": _index_version, "path": _platforms_dir, "boards": index}, f)
+            os.replace(tmp, _index_file)
+        except OSError:
+            pass
+
+    _index = {name: entry["info"] for name, entry in index.items()}
+    return _index
+
+# Registry -----------------------------------------------------------------------------------------
+
+def boards(vendor=None, family=None, device=None, resource=None, connector=None):
+    """Return the sorted list of boards, optionally filtered by vendor, FPGA family, device (prefix,
+    case insensitive), available resource and connector."""
+    r = []
+    for name, info in sorted(_load_index().items()):
+        if vendor is not None and info["vendor"] != vendor.lower():
+            continue
+        if family is not None and (info["family"] or "").lower() != family.lower():
+            continue
+        if device is not None and not any(d.lower().startswith(device.lower()) for d in info["devices"]):
+            continue
+        if resource is not None and resource not in info["resources"]:
+            continue
+        if connector is not None and connector not in info["connectors"]:
+            continue
+        r.append(name)
+    return r
+
+def board_info(name):
+    """Return the static description of board `name` (vendor, family, device(s), toolchain,
+    default clock and available resources/connectors)."""
+    index = _load_index()
+    if name not in index:
+        raise ValueError("Unknown board {}, available boards: {}".format(name, ", ".join(sorted(index))))
+    return index[name]
+
+def families():
+    """Return the sorted list of FPGA families of the supported boards."""
+    return sorted(set(info["family"] for info in _load_index().values() if info["family"] is not None))
+
+def load(name):
+    """Import and return the platform module of board `name`."""
+    board_info(name)
+    return importlib.import_module("litex_boards.platforms." + name)
@@ -0,0 +1,39 @@
+# License: BSD
+
+"""Shared, precompiled connector tables.
+
+Platforms' _io lists are module level literals: they are only evaluated once per process, when the
+platform module is imported, and are shared by all Platform instances. Connector tables however are
+parsed (pin strings split, "None" pins converted) by LiteX's ConnectorManager on each Platform
+construction. compiled_connectors() does this parsing once per process and returns the connectors
+in the pre-parsed form ({pin number: pin} dicts) that ConnectorManager uses as-is, so all the
+Platform instances of a board share the same tables.
+
+Set LITEX_BOARDS_NO_CONSTRAINTS_CACHE=1 to pass the original connector tables to LiteX.
+"""
+
+import os
+
+_compiled = {}
+
+def _compile(connectors):
+    r = []
+    for connector in connectors:
+        name, pins = connector[0], connector[1]
+        if isinstance(pins, str):
+            pin_list = []
+            for pins in connector[1:]:
+                pin_list += pins.split()
+            pins = {n: None if pin == "None" else pin for n, pin in enumerate(pin_list)}
+        r.append((name, pins))
+    return r
+
+def compiled_connectors(connectors):
+    if os.getenv("LITEX_BOARDS_NO_CONSTRAINTS_CACHE", "0") != "0":
+        return connectors
+    try:
+        return _compiled[id(connectors)][1]
+    except KeyError:
+        # Keep a reference on the source table: its id must not be reused.
+        _compiled[id(connectors)] = (connectors, _compile(connectors))
+        return _compiled[id(connectors)][1]
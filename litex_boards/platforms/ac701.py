@@ -4,6 +4,8 @@
 from litex.build.generic_platform import *
 from litex.build.xilinx import XilinxPlatform, VivadoProgrammer
 
+from litex_boards.platforms._constraints import compiled_connectors
+
 # IOs ----------------------------------------------------------------------------------------------
 
 _io = [
@@ -214,7 +216,7 @@ class Platform(XilinxPlatform):
     default_clk_period = 1e9/156.5e6
 
     def __init__(self):
-        XilinxPlatform.__init__(self, "xc7a200t-fbg676-2", _io, _connectors, toolchain="vivado")
+        XilinxPlatform.__init__(self, "xc7a200t-fbg676-2", _io, compiled_connectors(_connectors), toolchain="vivado")
         self.toolchain.bitstream_commands = ["set_property BITSTREAM.CONFIG.SPI_BUSWIDTH 4 [current_design]"]
         self.toolchain.additional_commands = ["write_cfgmem -force -format bin -interface spix4 -size 16 -loadbit \"up 0x0 {build_name}.bit\" -file {build_name}.bin"]
         self.add_platform_command("set_property INTERNAL_VREF 0.750 [get_iobanks 33]")
@@ -5,6 +5,8 @@
 from litex.build.generic_platform import Pins, Subsignal, IOStandard, Misc
 from litex.build.xilinx import XilinxPlatform, VivadoProgrammer
 
+from litex_boards.platforms._constraints import compiled_connectors
+
 # IOs ----------------------------------------------------------------------------------------------
 
 _io = [
@@ -201,7 +203,7 @@ class Platform(XilinxPlatform):
             "s7-25": "xc7s25csga324-1",
             "s7-50": "xc7s50csga324-1"
         }[variant]
-        XilinxPlatform.__init__(self, device, _io, _connectors, toolchain="vivado")
+        XilinxPlatform.__init__(self, device, _io, compiled_connectors(_connectors), toolchain="vivado")
         self.toolchain.bitstream_commands = \
             ["set_property BITSTREAM.CONFIG.SPI_BUSWIDTH 4 [current_design]"]
         self.toolchain.additional_commands = \
@@ -7,6 +7,9 @@
 from litex.build.generic_platform import *
 from litex.build.lattice import LatticePlatform
 
+from litex_boards.platforms._constraints import compiled_connectors
+from litex_boards.tools.programmer import ECP5Programmer
+
 # IOs ----------------------------------------------------------------------------------------------
 
 _io_v6_1 = [ # Documented by @smunaut
@@ -219,4 +222,11 @@ class Platform(LatticePlatform):
         device     = {"6.1": "LFE5U-25F-6BG381C", "7.0": "LFE5U-25F-6BG256C"}[revision]
         io         = {"6.1": _io_v6_1,            "7.0": _io_v7_0}[revision]
         connectors = {"6.1": _connectors_v6_1,            "7.0": _connectors_v7_0}[revision]
-        LatticePlatform.__init__(self, device, io, connectors=connectors, toolchain="trellis")
+        LatticePlatform.__init__(self, device, io, compiled_connectors(connectors), toolchain="trellis")
+
+    def create_programmer(self):
+        return ECP5Programmer(self.device, ftdi_config={
+            "vid_pid"     : (0x0403, 0x6011),
+            "channel"     : 0,
+            "layout_init" : (0x0098, 0x008b),
+        })
@@ -5,6 +5,8 @@ from litex.build.generic_platform import *
 from litex.build.lattice import LatticePlatform
 from litex.build.lattice.programmer import OpenOCDJTAGProgrammer
 
+from litex_boards.platforms._constraints import compiled_connectors
+
 import os
 
 # IOs ----------------------------------------------------------------------------------------------
@@ -123,7 +125,7 @@ class Platform(LatticePlatform):
     default_clk_period = 1e9/12e6
 
     def __init__(self, **kwargs):
-        LatticePlatform.__init__(self, "LFE5UM5G-85F-8BG381", _io, _connectors, **kwargs)
+        LatticePlatform.__init__(self, "LFE5UM5G-85F-8BG381", _io, compiled_connectors(_connectors), **kwargs)
 
     def request(self, *args, **kwargs):
         if "serial" in args:
@@ -4,6 +4,9 @@
 from litex.build.generic_platform import *
 from litex.build.lattice import LatticePlatform
 
+from litex_boards.platforms._constraints import compiled_connectors
+from litex_boards.tools.programmer import ECP5Programmer
+
 # IOs ----------------------------------------------------------------------------------------------
 
 _io = [
@@ -95,4 +98,11 @@ class Platform(LatticePlatform):
     default_clk_period = 1e9/100e6
 
     def __init__(self, **kwargs):
-        LatticePlatform.__init__(self, "LFE5UM5G-85F-8BG554I", _io, _connectors, **kwargs)
+        LatticePlatform.__init__(self, "LFE5UM5G-85F-8BG554I", _io, compiled_connectors(_connectors), **kwargs)
+
+    def create_programmer(self):
+        return ECP5Programmer(self.device, ftdi_config={
+            "vid_pid"     : (0x0403, 0x6010),
+            "channel"     : 0,
+            "layout_init" : (0x00e8, 0x60eb),
+        })
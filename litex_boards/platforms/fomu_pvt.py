@@ -9,6 +9,8 @@ from litex.build.generic_platform import *
 from litex.build.lattice import LatticePlatform
 from litex.build.lattice.programmer import IceStormProgrammer
 
+from litex_boards.platforms._constraints import compiled_connectors
+
 # IOs ----------------------------------------------------------------------------------------------
 
 _io = [
@@ -62,7 +64,7 @@ class Platform(LatticePlatform):
     default_clk_period = 1e9/48e6
 
     def __init__(self):
-        LatticePlatform.__init__(self, "ice40-up5k-uwg30", _io, _connectors, toolchain="icestorm")
+        LatticePlatform.__init__(self, "ice40-up5k-uwg30", _io, compiled_connectors(_connectors), toolchain="icestorm")
 
     def create_programmer(self):
         return IceStormProgrammer()
@@ -4,6 +4,8 @@
 from litex.build.generic_platform import *
 from litex.build.xilinx import XilinxPlatform, VivadoProgrammer
 
+from litex_boards.platforms._constraints import compiled_connectors
+
 # IOs ----------------------------------------------------------------------------------------------
 
 _io = [
@@ -113,7 +115,7 @@ class Platform(XilinxPlatform):
     default_clk_period = 1e9/200e6
 
     def __init__(self):
-        XilinxPlatform.__init__(self, "xc7k325t-ffg900-2", _io, _connectors, toolchain="vivado")
+        XilinxPlatform.__init__(self, "xc7k325t-ffg900-2", _io, compiled_connectors(_connectors), toolchain="vivado")
 
     def create_programmer(self):
         return VivadoProgrammer()
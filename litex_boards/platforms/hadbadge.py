@@ -7,6 +7,8 @@
 from litex.build.generic_platform import *
 from litex.build.lattice import LatticePlatform
 
+from litex_boards.platforms._constraints import compiled_connectors
+
 # IOs ----------------------------------------------------------------------------------------------
 
 _io = [
@@ -208,8 +210,11 @@ class Platform(LatticePlatform):
     default_clk_period = 1e9/8e6
 
     def __init__(self, toolchain="trellis", **kwargs):
-        LatticePlatform.__init__(self, "LFE5U-45F-8CABGA381", io=_io, connectors=_connectors,
-            toolchain=toolchain, **kwargs)
+        LatticePlatform.__init__(self, "LFE5U-45F-8CABGA381",
+            io         = _io,
+            connectors = compiled_connectors(_connectors),
+            toolchain  = toolchain,
+            **kwargs)
 
     def create_programmer(self):
         raise ValueError("{} programmer is not supported"
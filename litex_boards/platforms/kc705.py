@@ -5,6 +5,8 @@
 from litex.build.generic_platform import *
 from litex.build.xilinx import XilinxPlatform, VivadoProgrammer
 
+from litex_boards.platforms._constraints import compiled_connectors
+
 # IOs ----------------------------------------------------------------------------------------------
 
 _io = [
@@ -539,7 +541,7 @@ class Platform(XilinxPlatform):
     default_clk_period = 1e9/156.5e6
 
     def __init__(self):
-        XilinxPlatform.__init__(self, "xc7k325t-ffg900-2", _io, _connectors, toolchain="vivado")
+        XilinxPlatform.__init__(self, "xc7k325t-ffg900-2", _io, compiled_connectors(_connectors), toolchain="vivado")
         self.add_platform_command("""
 set_property CFGBVS VCCO [current_design]
 set_property CONFIG_VOLTAGE 2.5 [current_design]
@@ -4,6 +4,8 @@
 from litex.build.generic_platform import *
 from litex.build.xilinx import XilinxPlatform, VivadoProgrammer
 
+from litex_boards.platforms._constraints import compiled_connectors
+
 # IOs ----------------------------------------------------------------------------------------------
 
 _io = [
@@ -491,7 +493,7 @@ class Platform(XilinxPlatform):
     default_clk_period = 1e9/125e6
 
     def __init__(self):
-        XilinxPlatform.__init__(self, "xcku040-ffva1156-2-e", _io, _connectors, toolchain="vivado")
+        XilinxPlatform.__init__(self, "xcku040-ffva1156-2-e", _io, compiled_connectors(_connectors), toolchain="vivado")
 
     def create_programmer(self):
         return VivadoProgrammer()
@@ -8,6 +8,8 @@
 from litex.build.generic_platform import *
 from litex.build.xilinx import XilinxPlatform
 
+from litex_boards.platforms._constraints import compiled_connectors
+
 # IOs ----------------------------------------------------------------------------------------------
 
 _io = [
@@ -289,4 +291,4 @@ class Platform(XilinxPlatform):
     default_clk_period = 1e9/25e6
 
     def __init__(self):
-        XilinxPlatform.__init__(self, "xc6slx16-2-ftg256", _io, _connectors)
+        XilinxPlatform.__init__(self, "xc6slx16-2-ftg256", _io, compiled_connectors(_connectors))
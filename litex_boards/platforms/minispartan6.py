@@ -5,6 +5,8 @@ from litex.build.generic_platform import *
 from litex.build.xilinx import XilinxPlatform
 from litex.build.xilinx.programmer import FpgaProg
 
+from litex_boards.platforms._constraints import compiled_connectors
+
 # IOs ----------------------------------------------------------------------------------------------
 
 _io = [
@@ -133,7 +135,7 @@ class Platform(XilinxPlatform):
 
     def __init__(self, device="xc6slx25"):
         assert device in ["xc6slx9", "xc6slx25"]
-        XilinxPlatform.__init__(self, device+"-3-ftg256", _io, _connectors)
+        XilinxPlatform.__init__(self, device+"-3-ftg256", _io, compiled_connectors(_connectors))
 
     def create_programmer(self):
         return FpgaProg()
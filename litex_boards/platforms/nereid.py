@@ -5,6 +5,8 @@
 from litex.build.generic_platform import *
 from litex.build.xilinx import XilinxPlatform, XC3SProg, VivadoProgrammer
 
+from litex_boards.platforms._constraints import compiled_connectors
+
 # IOs ----------------------------------------------------------------------------------------------
 
 _io = [
@@ -384,7 +386,7 @@ class Platform(XilinxPlatform):
     default_clk_period = 1e9/100e6
 
     def __init__(self, toolchain="vivado"):
-        XilinxPlatform.__init__(self, "xc7k160t-fbg676-1", _io, _connectors, toolchain=toolchain)
+        XilinxPlatform.__init__(self, "xc7k160t-fbg676-1", _io, compiled_connectors(_connectors), toolchain=toolchain)
 
         self.add_platform_command("""
 set_property CFGBVS VCCO [current_design]
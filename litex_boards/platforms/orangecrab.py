@@ -4,6 +4,8 @@
 from litex.build.generic_platform import *
 from litex.build.lattice import LatticePlatform
 
+from litex_boards.platforms._constraints import compiled_connectors
+
 # IOs ----------------------------------------------------------------------------------------------
 
 _io_r0_1 = [
@@ -187,4 +189,4 @@ class Platform(LatticePlatform):
         self.revision = revision
         io         = {"0.1": _io_r0_1,            "0.2": _io_r0_2        }[revision]
         connectors = {"0.1": _connectors_r0_1,    "0.2": _connectors_r0_2}[revision]
-        LatticePlatform.__init__(self, f"LFE5U-{device}-8MG285C", io, connectors, **kwargs)
+        LatticePlatform.__init__(self, f"LFE5U-{device}-8MG285C", io, compiled_connectors(connectors), **kwargs)
@@ -10,6 +10,8 @@ from litex.build.xilinx import XilinxPlatform
 from litex.build.xilinx.programmer import XC3SProg
 from litex.build.openocd import OpenOCD
 
+from litex_boards.platforms._constraints import compiled_connectors
+
 # IOs ----------------------------------------------------------------------------------------------
 
 _io = [
@@ -149,5 +151,5 @@ class Platform(XilinxPlatform):
     default_clk_period = 1e9/50e6
 
     def __init__(self):
-        XilinxPlatform.__init__(self, "xc6slx45-csg324-3", _io, _connectors)
+        XilinxPlatform.__init__(self, "xc6slx45-csg324-3", _io, compiled_connectors(_connectors))
         self.toolchain.bitgen_opt += " -g Compress -g ConfigRate:6"
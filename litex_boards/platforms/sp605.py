@@ -5,6 +5,8 @@
 from litex.build.generic_platform import *
 from litex.build.xilinx import XilinxPlatform, iMPACT
 
+from litex_boards.platforms._constraints import compiled_connectors
+
 _io = [
     ("user_led", 0, Pins("D17"), IOStandard("LVCMOS25")),
     ("user_led", 1, Pins("AB4"), IOStandard("LVCMOS25")),
@@ -158,7 +160,7 @@ class Platform(XilinxPlatform):
     default_clk_period = 1e9/200e6
 
     def __init__(self):
-        XilinxPlatform.__init__(self, "xc6slx45t-fgg484-3", _io, _connectors, toolchain="ise")
+        XilinxPlatform.__init__(self, "xc6slx45t-fgg484-3", _io, compiled_connectors(_connectors), toolchain="ise")
 
     def create_programmer(self):
         return iMPACT()
@@ -6,6 +6,8 @@ from litex.build.generic_platform import *
 from litex.build.lattice import LatticePlatform
 from litex.build.lattice.programmer import TinyProgProgrammer
 
+from litex_boards.platforms._constraints import compiled_connectors
+
 # IOs ----------------------------------------------------------------------------------------------
 
 _io = [
@@ -62,7 +64,7 @@ class Platform(LatticePlatform):
     default_clk_period = 1e9/16e6
 
     def __init__(self):
-        LatticePlatform.__init__(self, "ice40-lp8k-cm81", _io, _connectors, toolchain="icestorm")
+        LatticePlatform.__init__(self, "ice40-lp8k-cm81", _io, compiled_connectors(_connectors), toolchain="icestorm")
         self.add_extension(serial)
 
     def create_programmer(self):
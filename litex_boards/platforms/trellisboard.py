@@ -5,6 +5,8 @@ from litex.build.generic_platform import *
 from litex.build.lattice import LatticePlatform
 from litex.build.lattice.programmer import LatticeProgrammer
 
+from litex_boards.platforms._constraints import compiled_connectors
+
 # IOs ----------------------------------------------------------------------------------------------
 
 _io = [
@@ -217,7 +219,7 @@ class Platform(LatticePlatform):
     default_clk_period = 1e9/12e6
 
     def __init__(self, **kwargs):
-        LatticePlatform.__init__(self, "LFE5UM5G-85F-8BG756C", _io, _connectors, **kwargs)
+        LatticePlatform.__init__(self, "LFE5UM5G-85F-8BG756C", _io, compiled_connectors(_connectors), **kwargs)
 
     def do_finalize(self, fragment):
         try:
@@ -5,6 +5,8 @@
 from litex.build.generic_platform import *
 from litex.build.xilinx import XilinxPlatform, VivadoProgrammer
 
+from litex_boards.platforms._constraints import compiled_connectors
+
 # IOs ----------------------------------------------------------------------------------------------
 
 _io = [
@@ -174,7 +176,7 @@ class Platform(XilinxPlatform):
     default_clk_period = 1e9/125e6
 
     def __init__(self):
-        XilinxPlatform.__init__(self, "xcvu9p-flga2104-2-e", _io, _connectors, toolchain="vivado")
+        XilinxPlatform.__init__(self, "xcvu9p-flga2104-2-e", _io, compiled_connectors(_connectors), toolchain="vivado")
 
     def create_programmer(self):
         return VivadoProgrammer()
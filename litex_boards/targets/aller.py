@@ -10,15 +10,22 @@ import sys
 from migen import *
 from migen.genlib.misc import WaitTimer
 
-from litex.build import tools
-
 from litex_boards.platforms import aller
 
 from litex.soc.interconnect.csr import *
 from litex.soc.integration.soc_core import *
 from litex.soc.integration.soc_sdram import *
 from litex.soc.integration.builder import *
-from litex.soc.integration.export import *
+
+from litex_boards.tools.gateware_cache import gateware_cache_args, gateware_cache_build
+from litex_boards.tools.build_profile import build_profile_args, build_profile_start, build_profile_apply
+from litex_boards.tools.reports import reports_args, build_reports
+from litex_boards.tools.l2_cache import l2_cache_args, l2_cache_argdict, l2_cache_size, l2_cache_min_data_width
+from litex_boards.tools.dram_benchmark import dram_benchmark_args, dram_benchmark_apply
+from litex_boards.tools.fast_boot import fast_boot_args, fast_boot_apply
+from litex_boards.tools.remote_update import S7SPIFlashMaster
+from litex_boards.tools.pcie import pcie_args, pcie_argdict, add_pcie
+from litex_boards.tools.software_headers import generate_software_headers
 
 from litex.soc.cores.clock import *
 from litex.soc.cores.dna import DNA
@@ -29,9 +36,6 @@ from litedram.modules import MT41J128M16
 from litedram.phy import s7ddrphy
 
 from litepcie.phy.s7pciephy import S7PCIEPHY
-from litepcie.core import LitePCIeEndpoint, LitePCIeMSI
-from litepcie.frontend.dma import LitePCIeDMA
-from litepcie.frontend.wishbone import LitePCIeWishboneBridge
 
 
 
@@ -69,7 +73,8 @@ class CRG(Module, AutoCSR):
 # PCIeSoC -----------------------------------------------------------------------------------------
 
 class PCIeSoC(SoCCore):
-    def __init__(self, platform, **kwargs):
+    def __init__(self, platform, dma_channels=2, dma_buffering_depth=1024, dma_msi_mapping="channel",
+        with_dram_dma=False, **kwargs):
         sys_clk_freq = int(100e6)
 
         # SoCCore ----------------------------------------------------------------------------------
@@ -96,6 +101,10 @@ class PCIeSoC(SoCCore):
         self.icap.add_timing_constraints(platform, sys_clk_freq, self.crg.cd_sys.clk)
         self.add_csr("icap")
 
+        # SPI Flash (remote update) ----------------------------------------------------------------
+        self.submodules.flash = S7SPIFlashMaster(platform.request("flash"), sys_clk_freq)
+        self.add_csr("flash")
+
         # DDR3 SDRAM -------------------------------------------------------------------------------
         if not self.integrated_main_ram_size:
             self.submodules.ddrphy = s7ddrphy.A7DDRPHY(platform.request("ddram"),
@@ -109,8 +118,8 @@ class PCIeSoC(SoCCore):
                 module                  = MT41J128M16(sys_clk_freq, "1:4"),
                 origin                  = self.mem_map["main_ram"],
                 size                    = kwargs.get("max_sdram_size", 0x40000000),
-                l2_cache_size           = kwargs.get("l2_size", 8192),
-                l2_cache_min_data_width = kwargs.get("min_l2_data_width", 128),
+                l2_cache_size           = l2_cache_size(self.platform, **kwargs),
+                l2_cache_min_data_width = l2_cache_min_data_width(self.platform, **kwargs),
                 l2_cache_reverse        = True
             )
 
@@ -122,67 +131,44 @@ class PCIeSoC(SoCCore):
         platform.add_false_path_constraints(self.crg.cd_sys.clk, self.pcie_phy.cd_pcie.clk)
         self.add_csr("pcie_phy")
 
-        # Endpoint
-        self.submodules.pcie_endpoint = LitePCIeEndpoint(self.pcie_phy)
-
-        # Wishbone bridge
-        self.submodules.pcie_bridge = LitePCIeWishboneBridge(self.pcie_endpoint,
-            base_address = self.mem_map["csr"])
-        self.add_wb_master(self.pcie_bridge.wishbone)
-
-        # DMA0
-        self.submodules.pcie_dma0 = LitePCIeDMA(self.pcie_phy, self.pcie_endpoint,
-            with_buffering = True, buffering_depth=1024,
-            with_loopback  = True)
-        self.add_csr("pcie_dma0")
-
-        # DMA1
-        self.submodules.pcie_dma1 = LitePCIeDMA(self.pcie_phy, self.pcie_endpoint,
-            with_buffering = True, buffering_depth=1024,
-            with_loopback  = True)
-        self.add_csr("pcie_dma1")
-
-        self.add_constant("DMA_CHANNELS", 2)
-
-        # MSI
-        self.submodules.pcie_msi = LitePCIeMSI()
-        self.add_csr("pcie_msi")
-        self.comb += self.pcie_msi.source.connect(self.pcie_phy.msi)
-        self.interrupts = {
-            "PCIE_DMA0_WRITER":    self.pcie_dma0.writer.irq,
-            "PCIE_DMA0_READER":    self.pcie_dma0.reader.irq,
-            "PCIE_DMA1_WRITER":    self.pcie_dma1.writer.irq,
-            "PCIE_DMA1_READER":    self.pcie_dma1.reader.irq,
-        }
-        for i, (k, v) in enumerate(sorted(self.interrupts.items())):
-            self.comb += self.pcie_msi.irqs[i].eq(v)
-            self.add_constant(k + "_INTERRUPT", i)
-
-    def generate_software_headers(self):
-        csr_header = get_csr_header(self.csr_regions, self.constants, with_access_functions=False)
-        tools.write_to_file("csr.h", csr_header)
-        soc_header = get_soc_header(self.constants, with_access_functions=False)
-        tools.write_to_file("soc.h", soc_header)
-        mem_header = get_mem_header(self.mem_regions)
-        tools.write_to_file("mem.h", mem_header)
+        # Endpoint, Wishbone bridge, DMAs, MSI
+        add_pcie(self,
+            dma_channels        = dma_channels,
+            dma_buffering_depth = dma_buffering_depth,
+            dma_msi_mapping     = dma_msi_mapping,
+            with_dram_dma       = with_dram_dma)
 
 # Build --------------------------------------------------------------------------------------------
 
 def main():
     parser = argparse.ArgumentParser(description="LiteX SoC on Aller")
     builder_args(parser)
+    gateware_cache_args(parser)
+    build_profile_args(parser)
+    reports_args(parser)
+    fast_boot_args(parser)
     soc_sdram_args(parser)
+    l2_cache_args(parser)
+    dram_benchmark_args(parser)
+    pcie_args(parser)
     args = parser.parse_args()
+    build_profile_start(args)
 
     # Enforce arguments
     args.uart_name      = "crossover"
     args.csr_data_width = 32
+    args.csr_csv        = args.csr_csv or "csr.csv" # Used by remote_update.
 
     platform = aller.Platform()
-    soc      = PCIeSoC(platform, **soc_sdram_argdict(args))
+    soc      = PCIeSoC(platform,
+        **pcie_argdict(args), **soc_sdram_argdict(args), **l2_cache_argdict(args))
+    fast_boot_apply(soc.platform, args)
+    dram_benchmark_apply(soc, args)
     builder  = Builder(soc, **builder_argdict(args))
-    vns = builder.build()
-    soc.generate_software_headers()
+    build_profile_apply(builder, args)
+    build_reports(builder, args)
+    gateware_cache_build(builder, args)
+    generate_software_headers(soc)
 
 if __name__ == "__main__":
     main()
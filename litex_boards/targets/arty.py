@@ -15,6 +15,13 @@ from litex.soc.integration.soc_core import *
 from litex.soc.integration.soc_sdram import *
 from litex.soc.integration.builder import *
 
+from litex_boards.tools.gateware_cache import gateware_cache_args, gateware_cache_build
+from litex_boards.tools.build_profile import build_profile_args, build_profile_start, build_profile_apply
+from litex_boards.tools.reports import reports_args, build_reports
+from litex_boards.tools.l2_cache import l2_cache_args, l2_cache_argdict, l2_cache_size, l2_cache_min_data_width
+from litex_boards.tools.dram_benchmark import dram_benchmark_args, dram_benchmark_apply
+from litex_boards.tools.fast_boot import fast_boot_args, fast_boot_apply
+
 from litedram.modules import MT41K128M16
 from litedram.phy import s7ddrphy
 
@@ -72,8 +79,8 @@ class BaseSoC(SoCCore):
                 module                  = MT41K128M16(sys_clk_freq, "1:4"),
                 origin                  = self.mem_map["main_ram"],
                 size                    = kwargs.get("max_sdram_size", 0x40000000),
-                l2_cache_size           = kwargs.get("l2_size", 8192),
-                l2_cache_min_data_width = kwargs.get("min_l2_data_width", 128),
+                l2_cache_size           = l2_cache_size(self.platform, **kwargs),
+                l2_cache_min_data_width = l2_cache_min_data_width(self.platform, **kwargs),
                 l2_cache_reverse        = True
             )
 
@@ -98,17 +105,28 @@ class BaseSoC(SoCCore):
 def main():
     parser = argparse.ArgumentParser(description="LiteX SoC on Arty")
     builder_args(parser)
+    gateware_cache_args(parser)
+    build_profile_args(parser)
+    reports_args(parser)
+    fast_boot_args(parser)
     soc_sdram_args(parser)
+    l2_cache_args(parser)
+    dram_benchmark_args(parser)
     vivado_build_args(parser)
     parser.add_argument("--with-ethernet", action="store_true", help="enable Ethernet support")
     parser.add_argument("--with-etherbone", action="store_true", help="enable Etherbone support")
     args = parser.parse_args()
+    build_profile_start(args)
 
     assert not (args.with_ethernet and args.with_etherbone)
     soc = BaseSoC(with_ethernet=args.with_ethernet, with_etherbone=args.with_etherbone,
-        **soc_sdram_argdict(args))
+        **soc_sdram_argdict(args), **l2_cache_argdict(args))
+    fast_boot_apply(soc.platform, args)
+    dram_benchmark_apply(soc, args)
     builder = Builder(soc, **builder_argdict(args))
-    builder.build(**vivado_build_argdict(args))
+    build_profile_apply(builder, args)
+    build_reports(builder, args)
+    gateware_cache_build(builder, args, **vivado_build_argdict(args))
 
 
 if __name__ == "__main__":
@@ -16,6 +16,12 @@ from litex.soc.integration.soc_core import *
 from litex.soc.integration.soc_sdram import *
 from litex.soc.integration.builder import *
 
+from litex_boards.tools.gateware_cache import gateware_cache_args, gateware_cache_build
+from litex_boards.tools.build_profile import build_profile_args, build_profile_start, build_profile_apply
+from litex_boards.tools.reports import reports_args, build_reports
+from litex_boards.tools.l2_cache import l2_cache_args, l2_cache_argdict, l2_cache_size, l2_cache_min_data_width
+from litex_boards.tools.dram_benchmark import dram_benchmark_args, dram_benchmark_apply
+
 from litedram.modules import MT48LC16M16
 from litedram.phy import GENSDRPHY
 
@@ -76,8 +82,8 @@ class BaseSoC(SoCCore):
                 module                  = MT48LC16M16(sys_clk_freq, "1:1"),
                 origin                  = self.mem_map["main_ram"],
                 size                    = kwargs.get("max_sdram_size", 0x40000000),
-                l2_cache_size           = kwargs.get("l2_size", 8192),
-                l2_cache_min_data_width = kwargs.get("min_l2_data_width", 128),
+                l2_cache_size           = l2_cache_size(self.platform, **kwargs),
+                l2_cache_min_data_width = l2_cache_min_data_width(self.platform, **kwargs),
                 l2_cache_reverse        = True
             )
 
@@ -94,14 +100,23 @@ class BaseSoC(SoCCore):
 def main():
     parser = argparse.ArgumentParser(description="LiteX SoC on C10 LP RefKit")
     builder_args(parser)
+    gateware_cache_args(parser)
+    build_profile_args(parser)
+    reports_args(parser)
     soc_sdram_args(parser)
+    l2_cache_args(parser)
+    dram_benchmark_args(parser)
     parser.add_argument("--with-ethernet", action="store_true",
                         help="enable Ethernet support")
     args = parser.parse_args()
+    build_profile_start(args)
 
-    soc = BaseSoC(with_ethernet=args.with_ethernet, **soc_sdram_argdict(args))
+    soc = BaseSoC(with_ethernet=args.with_ethernet, **soc_sdram_argdict(args), **l2_cache_argdict(args))
+    dram_benchmark_apply(soc, args)
     builder = Builder(soc, **builder_argdict(args))
-    builder.build()
+    build_profile_apply(builder, args)
+    build_reports(builder, args)
+    gateware_cache_build(builder, args)
 
 
 if __name__ == "__main__":
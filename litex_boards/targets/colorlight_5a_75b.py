@@ -34,6 +34,7 @@
 # Etherbone stack that need to be optimized. It was initially just used to validate the reversed
 # pinout but happens to work on hardware...
 
+import os
 import argparse
 import sys
 
@@ -50,6 +51,14 @@ from litex.soc.cores.clock import *
 from litex.soc.integration.soc_core import *
 from litex.soc.integration.builder import *
 
+from litex_boards.tools.gateware_cache import gateware_cache_args, gateware_cache_build
+from litex_boards.tools.build_profile import build_profile_args, build_profile_start, build_profile_apply
+from litex_boards.tools.reports import reports_args, build_reports
+from litex_boards.tools.l2_cache import l2_cache_args, l2_cache_argdict, l2_cache_size, l2_cache_min_data_width
+from litex_boards.tools.dram_benchmark import dram_benchmark_args, dram_benchmark_apply
+from litex_boards.tools.programmer import programmer_args, programmer_load
+from litex_boards.tools.fmax_search import resolve_sys_clk_freq
+
 from litedram.modules import M12L16161A
 from litedram.phy import GENSDRPHY
 
@@ -113,8 +122,8 @@ class BaseSoC(SoCCore):
                 module                  = M12L16161A(sys_clk_freq, "1:1"),
                 origin                  = self.mem_map["main_ram"],
                 size                    = kwargs.get("max_sdram_size", 0x40000000),
-                l2_cache_size           = kwargs.get("l2_size", 8192),
-                l2_cache_min_data_width = kwargs.get("min_l2_data_width", 128),
+                l2_cache_size           = l2_cache_size(self.platform, **kwargs),
+                l2_cache_min_data_width = l2_cache_min_data_width(self.platform, **kwargs),
                 l2_cache_reverse        = True
             )
 
@@ -134,51 +143,45 @@ class BaseSoC(SoCCore):
             self.add_csr("ethphy")
             self.add_etherbone(phy=self.ethphy)
 
-# Load ---------------------------------------------------------------------------------------------
-
-def load():
-    import os
-    f = open("openocd.cfg", "w")
-    f.write(
-"""
-interface ftdi
-ftdi_vid_pid 0x0403 0x6011
-ftdi_channel 0
-ftdi_layout_init 0x0098 0x008b
-reset_config none
-adapter_khz 25000
-jtag newtap ecp5 tap -irlen 8 -expected-id 0x41111043
-""")
-    f.close()
-    os.system("openocd -f openocd.cfg -c \"transport select jtag; init; svf soc_basesoc_colorlight_5a_75b/gateware/top.svf; exit\"")
-    exit()
-
 # Build --------------------------------------------------------------------------------------------
 
 def main():
     parser = argparse.ArgumentParser(description="LiteX SoC on Colorlight 5A-75B")
     builder_args(parser)
+    gateware_cache_args(parser)
+    build_profile_args(parser)
+    reports_args(parser)
     soc_core_args(parser)
+    l2_cache_args(parser)
+    dram_benchmark_args(parser)
     trellis_args(parser)
     parser.add_argument("--revision", default="7.0", type=str, help="Board revision 7.0 (default) or 6.1")
     parser.add_argument("--with-ethernet",  action="store_true", help="enable Ethernet support")
     parser.add_argument("--with-etherbone", action="store_true", help="enable Etherbone support")
     parser.add_argument("--eth-phy", default=0, type=int, help="Ethernet PHY 0 or 1 (default=0)")
     parser.add_argument("--load", action="store_true", help="load bitstream")
-    parser.add_argument("--sys-clk-freq", default=60e6, help="system clock frequency (default=60MHz)")
+    programmer_args(parser)
+    parser.add_argument("--sys-clk-freq", default=60e6, help="system clock frequency (default=60MHz, recorded: frequency recorded by fmax_search)")
     args = parser.parse_args()
+    build_profile_start(args)
 
-    if args.load:
-        load()
+    # Resolved value in args: used by the gateware cache key.
+    args.sys_clk_freq = sys_clk_freq = resolve_sys_clk_freq("colorlight_5a_75b", args.sys_clk_freq, default=60e6)
 
     assert not (args.with_ethernet and args.with_etherbone)
     soc = BaseSoC(revision=args.revision,
         with_ethernet  = args.with_ethernet,
         with_etherbone = args.with_etherbone,
-        sys_clk_freq = args.sys_clk_freq,
-        **soc_core_argdict(args))
+        sys_clk_freq   = sys_clk_freq,
+        **soc_core_argdict(args), **l2_cache_argdict(args))
+    dram_benchmark_apply(soc, args)
     builder = Builder(soc, **builder_argdict(args))
-    builder.build(**trellis_argdict(args))
+    build_profile_apply(builder, args)
+    build_reports(builder, args)
+    if args.load:
+        programmer_load(soc.platform, os.path.join(builder.gateware_dir, "top.bit"), args)
+    else:
+        gateware_cache_build(builder, args, **trellis_argdict(args))
 
 if __name__ == "__main__":
     main()
@@ -14,6 +14,10 @@ from litex.soc.cores.clock import *
 from litex.soc.integration.soc_core import *
 from litex.soc.integration.builder import *
 
+from litex_boards.tools.gateware_cache import gateware_cache_args, gateware_cache_build
+from litex_boards.tools.build_profile import build_profile_args, build_profile_start, build_profile_apply
+from litex_boards.tools.reports import reports_args, build_reports
+
 # CRG ----------------------------------------------------------------------------------------------
 
 class _CRG(Module):
@@ -58,12 +62,16 @@ def main():
     parser.add_argument("--gateware-toolchain", dest="toolchain", default="trellis",
         help="gateware toolchain to use, trellis (default) or diamond")
     builder_args(parser)
+    gateware_cache_args(parser)
+    build_profile_args(parser)
+    reports_args(parser)
     soc_core_args(parser)
     parser.add_argument("--sys-clk-freq", default=60e6,
                         help="system clock frequency (default=60MHz)")
     parser.add_argument("--x5-clk-freq", type=int,
                         help="use X5 oscillator as system clock at the specified frequency")
     args = parser.parse_args()
+    build_profile_start(args)
 
     cls = BaseSoC
     soc = cls(toolchain=args.toolchain,
@@ -71,7 +79,9 @@ def main():
         x5_clk_freq  = args.x5_clk_freq,
         **soc_core_argdict(args))
     builder = Builder(soc, **builder_argdict(args))
-    builder.build()
+    build_profile_apply(builder, args)
+    build_reports(builder, args)
+    gateware_cache_build(builder, args)
 
 if __name__ == "__main__":
     main()
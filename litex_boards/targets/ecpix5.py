@@ -3,6 +3,7 @@
 # This file is Copyright (c) 2020 Florent Kermarrec <florent@enjoy-digital.fr>
 # License: BSD
 
+import os
 import argparse
 import sys
 
@@ -17,6 +18,13 @@ from litex.soc.cores.clock import *
 from litex.soc.integration.soc_core import *
 from litex.soc.integration.builder import *
 
+from litex_boards.tools.gateware_cache import gateware_cache_args, gateware_cache_build
+from litex_boards.tools.build_profile import build_profile_args, build_profile_start, build_profile_apply
+from litex_boards.tools.reports import reports_args, build_reports
+from litex_boards.tools.l2_cache import l2_cache_args, l2_cache_argdict, l2_cache_size, l2_cache_min_data_width
+from litex_boards.tools.dram_benchmark import dram_benchmark_args, dram_benchmark_apply
+from litex_boards.tools.programmer import programmer_args, programmer_load
+
 from litedram.modules import MT41K256M16
 from litedram.phy import ECP5DDRPHY
 
@@ -92,8 +100,8 @@ class BaseSoC(SoCCore):
                 module                  = MT41K256M16(sys_clk_freq, "1:2"),
                 origin                  = self.mem_map["main_ram"],
                 size                    = kwargs.get("max_sdram_size", 0x40000000),
-                l2_cache_size           = kwargs.get("l2_size", 8192),
-                l2_cache_min_data_width = kwargs.get("min_l2_data_width", 128),
+                l2_cache_size           = l2_cache_size(self.platform, **kwargs),
+                l2_cache_min_data_width = l2_cache_min_data_width(self.platform, **kwargs),
                 l2_cache_reverse        = True
             )
 
@@ -111,42 +119,33 @@ class BaseSoC(SoCCore):
             for c in "rgb":
                 self.comb += getattr(rgb_led_pads, c).eq(1)
 
-# Load ---------------------------------------------------------------------------------------------
-
-def load():
-    import os
-    f = open("openocd.cfg", "w")
-    f.write(
-"""
-interface ftdi
-ftdi_vid_pid 0x0403 0x6010
-ftdi_channel 0
-ftdi_layout_init 0x00e8 0x60eb
-reset_config none
-adapter_khz 25000
-jtag newtap ecp5 tap -irlen 8 -expected-id 0x41111043
-""")
-    f.close()
-    os.system("openocd -f openocd.cfg -c \"transport select jtag; init; svf soc_basesoc_ecpix5/gateware/top.svf; exit\"")
-    exit()
-
 # Build --------------------------------------------------------------------------------------------
 
 def main():
     parser = argparse.ArgumentParser(description="LiteX SoC on ECPIX-5")
     builder_args(parser)
+    gateware_cache_args(parser)
+    build_profile_args(parser)
+    reports_args(parser)
     soc_core_args(parser)
+    l2_cache_args(parser)
+    dram_benchmark_args(parser)
     trellis_args(parser)
     parser.add_argument("--with-ethernet", action="store_true", help="enable Ethernet support")
     parser.add_argument("--load", action="store_true", help="load bitstream")
+    programmer_args(parser)
     args = parser.parse_args()
+    build_profile_start(args)
 
-    if args.load:
-        load()
-
-    soc     = BaseSoC(with_ethernet=with_ethernet, **soc_core_argdict(args))
+    soc     = BaseSoC(with_ethernet=args.with_ethernet, **soc_core_argdict(args), **l2_cache_argdict(args))
+    dram_benchmark_apply(soc, args)
     builder = Builder(soc, **builder_argdict(args))
-    builder.build(**trellis_argdict(args))
+    build_profile_apply(builder, args)
+    build_reports(builder, args)
+    if args.load:
+        programmer_load(soc.platform, os.path.join(builder.gateware_dir, "top.bit"), args)
+    else:
+        gateware_cache_build(builder, args, **trellis_argdict(args))
 
 if __name__ == "__main__":
     main()
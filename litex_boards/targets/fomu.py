@@ -15,6 +15,11 @@ from litex.soc.integration.builder import Builder, builder_argdict, builder_args
 from litex.soc.integration.soc_core import soc_core_argdict, soc_core_args
 from litex.soc.integration.doc import AutoDoc
 
+from litex_boards.tools.gateware_cache import gateware_cache_args, gateware_cache_build
+from litex_boards.tools.build_profile import build_profile_args, build_profile_start, build_profile_apply
+from litex_boards.tools.reports import reports_args, build_reports
+from litex_boards.tools.nextpnr_sweep import nextpnr_seed_sweep_args, nextpnr_seed_sweep_build
+
 from valentyusb.usbcore import io as usbio
 from valentyusb.usbcore.cpu import dummyusb, epfifo, eptri
 
@@ -290,13 +295,23 @@ def main():
         "--placer", default="heap", choices=["sa", "heap"], help="which placer to use in nextpnr"
     )
     builder_args(parser)
+    gateware_cache_args(parser)
+    build_profile_args(parser)
+    reports_args(parser)
+    nextpnr_seed_sweep_args(parser)
     soc_core_args(parser)
     args = parser.parse_args()
+    build_profile_start(args)
 
     soc = BaseSoC(board=args.board, pnr_placer=args.placer, pnr_seed=args.seed,
                 debug=True, **soc_core_argdict(args))
     builder = Builder(soc, **builder_argdict(args))
-    builder.build()
+    build_profile_apply(builder, args)
+    build_reports(builder, args)
+    if args.seed_sweep:
+        nextpnr_seed_sweep_build(builder, args, clocks=["usb_48", "sys"])
+    else:
+        gateware_cache_build(builder, args)
 
 if __name__ == "__main__":
     main()
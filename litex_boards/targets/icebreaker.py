@@ -14,6 +14,7 @@
 # with more features, examples to run C/Rust code on the RISC-V CPU and documentation can be found
 # at: https://github.com/icebreaker-fpga/icebreaker-litex-examples
 
+import os
 import argparse
 
 from migen import *
@@ -27,6 +28,12 @@ from litex.soc.cores.clock import iCE40PLL
 from litex.soc.integration.soc_core import *
 from litex.soc.integration.builder import *
 
+from litex_boards.tools.gateware_cache import gateware_cache_args, gateware_cache_build
+from litex_boards.tools.build_profile import build_profile_args, build_profile_start, build_profile_apply
+from litex_boards.tools.reports import reports_args, build_reports
+from litex_boards.tools.nextpnr_sweep import nextpnr_seed_sweep_args, nextpnr_seed_sweep_build
+from litex_boards.tools.spiflash import spiflash_args, spiflash_update, IceprogBackend
+
 kB = 1024
 mB = 1024*kB
 
@@ -104,29 +111,38 @@ class BaseSoC(SoCCore):
 
 # Flash --------------------------------------------------------------------------------------------
 
-def flash(bios_flash_offset):
-    from litex.build.lattice.programmer import IceStormProgrammer
-    prog = IceStormProgrammer()
-    prog.flash(bios_flash_offset, "soc_basesoc_icebreaker/software/bios/bios.bin")
-    prog.flash(0x00000000,        "soc_basesoc_icebreaker/gateware/top.bin")
-    exit()
+def flash(builder, bios_flash_offset, args):
+    spiflash_update(IceprogBackend(), [
+        (0x00000000,        os.path.join(builder.gateware_dir, "top.bin")),
+        (bios_flash_offset, os.path.join(builder.software_dir, "bios", "bios.bin")),
+    ], args)
 
 # Build --------------------------------------------------------------------------------------------
 
 def main():
     parser = argparse.ArgumentParser(description="LiteX SoC on iCEBreaker")
-    parser.add_argument("--bios-flash-offset", default=0x40000, help="BIOS offset in SPI Flash")
-    parser.add_argument("--flash", action="store_true", help="Load Bitstream")
+    parser.add_argument("--bios-flash-offset", default=0x40000, type=lambda x: int(x, 0), help="BIOS offset in SPI Flash")
+    parser.add_argument("--flash", action="store_true", help="Flash Bitstream and BIOS (changed sectors only)")
+    spiflash_args(parser)
     builder_args(parser)
+    gateware_cache_args(parser)
+    build_profile_args(parser)
+    reports_args(parser)
+    nextpnr_seed_sweep_args(parser)
     soc_core_args(parser)
     args = parser.parse_args()
-
-    if args.flash:
-        flash(args.bios_flash_offset)
+    build_profile_start(args)
 
     soc     = BaseSoC(args.bios_flash_offset, **soc_core_argdict(args))
     builder = Builder(soc, **builder_argdict(args))
-    builder.build()
+    build_profile_apply(builder, args)
+    build_reports(builder, args)
+    if args.flash:
+        flash(builder, args.bios_flash_offset, args)
+    elif args.seed_sweep:
+        nextpnr_seed_sweep_build(builder, args, clocks=["sys"])
+    else:
+        gateware_cache_build(builder, args)
 
 if __name__ == "__main__":
     main()
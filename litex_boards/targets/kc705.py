@@ -16,11 +16,22 @@ from litex.soc.integration.soc_core import *
 from litex.soc.integration.soc_sdram import *
 from litex.soc.integration.builder import *
 
+from litex_boards.tools.gateware_cache import gateware_cache_args, gateware_cache_build
+from litex_boards.tools.build_profile import build_profile_args, build_profile_start, build_profile_apply
+from litex_boards.tools.reports import reports_args, build_reports
+from litex_boards.tools.l2_cache import l2_cache_args, l2_cache_argdict, l2_cache_size, l2_cache_min_data_width
+from litex_boards.tools.dram_benchmark import dram_benchmark_args, dram_benchmark_apply
+from litex_boards.tools.fast_boot import fast_boot_args, fast_boot_apply
+from litex_boards.tools.pcie import pcie_args, pcie_argdict, add_pcie
+from litex_boards.tools.software_headers import generate_software_headers
+
 from litedram.modules import MT8JTF12864
 from litedram.phy import s7ddrphy
 
 from liteeth.phy import LiteEthPHY
 
+from litepcie.phy.s7pciephy import S7PCIEPHY
+
 # CRG ----------------------------------------------------------------------------------------------
 
 class _CRG(Module):
@@ -65,8 +76,8 @@ class BaseSoC(SoCCore):
                 module                  = MT8JTF12864(sys_clk_freq, "1:4"),
                 origin                  = self.mem_map["main_ram"],
                 size                    = kwargs.get("max_sdram_size", 0x40000000),
-                l2_cache_size           = kwargs.get("l2_size", 8192),
-                l2_cache_min_data_width = kwargs.get("min_l2_data_width", 128),
+                l2_cache_size           = l2_cache_size(self.platform, **kwargs),
+                l2_cache_min_data_width = l2_cache_min_data_width(self.platform, **kwargs),
                 l2_cache_reverse        = True
             )
 
@@ -79,19 +90,74 @@ class BaseSoC(SoCCore):
             self.add_csr("ethphy")
             self.add_ethernet(phy=self.ethphy)
 
+# PCIeSoC -----------------------------------------------------------------------------------------
+
+class PCIeSoC(BaseSoC):
+    def __init__(self, pcie_lanes=4, pcie_data_width=128, dma_channels=2, dma_buffering_depth=1024,
+        dma_msi_mapping="channel", with_dram_dma=False, **kwargs):
+        assert pcie_lanes in [1, 2, 4, 8]
+        assert pcie_data_width in [64, 128]
+        assert not (pcie_lanes == 8 and pcie_data_width != 128) # Gen2 X8 requires the 128-bit interface.
+        BaseSoC.__init__(self, **kwargs)
+        platform = self.platform
+
+        # PCIe -------------------------------------------------------------------------------------
+        # PHY
+        self.submodules.pcie_phy = S7PCIEPHY(platform, platform.request("pcie_x{}".format(pcie_lanes)),
+            data_width = pcie_data_width,
+            bar0_size  = 0x20000)
+        platform.add_false_path_constraints(self.crg.cd_sys.clk, self.pcie_phy.cd_pcie.clk)
+        self.add_csr("pcie_phy")
+
+        # Endpoint, Wishbone bridge, DMAs, MSI
+        add_pcie(self,
+            dma_channels        = dma_channels,
+            dma_buffering_depth = dma_buffering_depth,
+            dma_msi_mapping     = dma_msi_mapping,
+            with_dram_dma       = with_dram_dma)
+
 # Build --------------------------------------------------------------------------------------------
 
 def main():
     parser = argparse.ArgumentParser(description="LiteX SoC on KC705")
     builder_args(parser)
+    gateware_cache_args(parser)
+    build_profile_args(parser)
+    reports_args(parser)
+    fast_boot_args(parser)
     soc_sdram_args(parser)
+    l2_cache_args(parser)
+    dram_benchmark_args(parser)
     parser.add_argument("--with-ethernet", action="store_true",
                         help="enable Ethernet support")
+    parser.add_argument("--with-pcie",           action="store_true", help="enable PCIe support (PCIeSoC)")
+    parser.add_argument("--pcie-lanes",          default=4,    type=int, choices=[1, 2, 4, 8], help="PCIe lanes")
+    parser.add_argument("--pcie-data-width",     default=128,  type=int, choices=[64, 128], help="PCIe datapath width")
+    pcie_args(parser)
     args = parser.parse_args()
-
-    soc = BaseSoC(with_ethernet=args.with_ethernet, **soc_sdram_argdict(args))
+    if args.with_pcie and args.pcie_lanes == 8 and args.pcie_data_width != 128:
+        parser.error("PCIe X8 requires --pcie-data-width=128.")
+    build_profile_start(args)
+
+    if args.with_pcie:
+        # Enforce arguments
+        args.uart_name      = "crossover"
+        args.csr_data_width = 32
+        soc = PCIeSoC(
+            pcie_lanes          = args.pcie_lanes,
+            pcie_data_width     = args.pcie_data_width,
+            with_ethernet       = args.with_ethernet,
+            **pcie_argdict(args), **soc_sdram_argdict(args), **l2_cache_argdict(args))
+    else:
+        soc = BaseSoC(with_ethernet=args.with_ethernet, **soc_sdram_argdict(args), **l2_cache_argdict(args))
+    fast_boot_apply(soc.platform, args)
+    dram_benchmark_apply(soc, args)
     builder = Builder(soc, **builder_argdict(args))
-    builder.build()
+    build_profile_apply(builder, args)
+    build_reports(builder, args)
+    gateware_cache_build(builder, args)
+    if args.with_pcie:
+        generate_software_headers(soc)
 
 
 if __name__ == "__main__":
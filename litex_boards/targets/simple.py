@@ -14,6 +14,10 @@ from litex.build.io import CRG
 from litex.soc.integration.soc_core import *
 from litex.soc.integration.builder import *
 
+from litex_boards.tools.gateware_cache import gateware_cache_args, gateware_cache_build
+from litex_boards.tools.build_profile import build_profile_args, build_profile_start, build_profile_apply
+from litex_boards.tools.reports import reports_args, build_reports
+
 from liteeth.phy import LiteEthPHY
 
 # BaseSoC ------------------------------------------------------------------------------------------
@@ -42,6 +46,9 @@ class BaseSoC(SoCCore):
 def main():
     parser = argparse.ArgumentParser(description="Generic LiteX SoC")
     builder_args(parser)
+    gateware_cache_args(parser)
+    build_profile_args(parser)
+    reports_args(parser)
     soc_core_args(parser)
     parser.add_argument("--with-ethernet", action="store_true",
                         help="enable Ethernet support")
@@ -50,6 +57,7 @@ def main():
     parser.add_argument("--gateware-toolchain", default=None,
                         help="FPGA gateware toolchain used for build")
     args = parser.parse_args()
+    build_profile_start(args)
 
     platform_module = importlib.import_module(args.platform)
     if args.gateware_toolchain is not None:
@@ -58,7 +66,9 @@ def main():
         platform = platform_module.Platform()
     soc = BaseSoC(platform, with_ethernet=args.with_ethernet, **soc_core_argdict(args))
     builder = Builder(soc, **builder_argdict(args))
-    builder.build()
+    build_profile_apply(builder, args)
+    build_reports(builder, args)
+    gateware_cache_build(builder, args)
 
 
 if __name__ == "__main__":
@@ -17,6 +17,13 @@ from litex.soc.integration.soc_core import *
 from litex.soc.integration.soc_sdram import *
 from litex.soc.integration.builder import *
 
+from litex_boards.tools.gateware_cache import gateware_cache_args, gateware_cache_build
+from litex_boards.tools.build_profile import build_profile_args, build_profile_start, build_profile_apply
+from litex_boards.tools.reports import reports_args, build_reports
+from litex_boards.tools.l2_cache import l2_cache_args, l2_cache_argdict, l2_cache_size, l2_cache_min_data_width
+from litex_boards.tools.dram_benchmark import dram_benchmark_args, dram_benchmark_apply
+from litex_boards.tools.fmax_search import resolve_sys_clk_freq
+
 from litedram.modules import MT41J256M16
 from litedram.phy import ECP5DDRPHY
 
@@ -99,8 +106,8 @@ class BaseSoC(SoCCore):
                 module                  = MT41J256M16(sys_clk_freq, "1:2"),
                 origin                  = self.mem_map["main_ram"],
                 size                    = kwargs.get("max_sdram_size", 0x40000000),
-                l2_cache_size           = kwargs.get("l2_size", 8192),
-                l2_cache_min_data_width = kwargs.get("min_l2_data_width", 128),
+                l2_cache_size           = l2_cache_size(self.platform, **kwargs),
+                l2_cache_min_data_width = l2_cache_min_data_width(self.platform, **kwargs),
                 l2_cache_reverse        = True
             )
 
@@ -119,24 +126,36 @@ def main():
     parser.add_argument("--gateware-toolchain", dest="toolchain", default="trellis",
         help="gateware toolchain to use, trellis (default) or diamond")
     builder_args(parser)
+    gateware_cache_args(parser)
+    build_profile_args(parser)
+    reports_args(parser)
     soc_sdram_args(parser)
+    l2_cache_args(parser)
+    dram_benchmark_args(parser)
     trellis_args(parser)
     parser.add_argument("--sys-clk-freq", default=75e6,
-                        help="system clock frequency (default=75MHz)")
+                        help="system clock frequency (default=75MHz, recorded: frequency recorded by fmax_search)")
     parser.add_argument("--with-ethernet", action="store_true",
                         help="enable Ethernet support")
     parser.add_argument("--with-spi-sdcard", action="store_true",
                         help="enable SPI-mode SDCard support")
     args = parser.parse_args()
+    build_profile_start(args)
+
+    # Resolved value in args: used by the gateware cache key.
+    args.sys_clk_freq = sys_clk_freq = resolve_sys_clk_freq("trellisboard", args.sys_clk_freq, default=75e6)
 
-    soc = BaseSoC(sys_clk_freq=int(float(args.sys_clk_freq)),
+    soc = BaseSoC(sys_clk_freq=sys_clk_freq,
         with_ethernet=args.with_ethernet,
-        **soc_sdram_argdict(args))
+        **soc_sdram_argdict(args), **l2_cache_argdict(args))
     if args.with_spi_sdcard:
         soc.add_spi_sdcard()
+    dram_benchmark_apply(soc, args)
     builder = Builder(soc, **builder_argdict(args))
+    build_profile_apply(builder, args)
+    build_reports(builder, args)
     builder_kargs = trellis_argdict(args) if args.toolchain == "trellis" else {}
-    builder.build(**builder_kargs)
+    gateware_cache_build(builder, args, **builder_kargs)
 
 if __name__ == "__main__":
     main()
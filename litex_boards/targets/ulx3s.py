@@ -21,6 +21,13 @@ from litex.soc.integration.soc_core import *
 from litex.soc.integration.soc_sdram import *
 from litex.soc.integration.builder import *
 
+from litex_boards.tools.gateware_cache import gateware_cache_args, gateware_cache_build
+from litex_boards.tools.build_profile import build_profile_args, build_profile_start, build_profile_apply
+from litex_boards.tools.reports import reports_args, build_reports
+from litex_boards.tools.l2_cache import l2_cache_args, l2_cache_argdict, l2_cache_size, l2_cache_min_data_width
+from litex_boards.tools.dram_benchmark import dram_benchmark_args, dram_benchmark_apply
+from litex_boards.tools.fmax_search import resolve_sys_clk_freq
+
 from litedram import modules as litedram_modules
 from litedram.phy import GENSDRPHY
 
@@ -84,8 +91,8 @@ class BaseSoC(SoCCore):
                 module                  = getattr(litedram_modules, sdram_module_cls)(sys_clk_freq, "1:1"),
                 origin                  = self.mem_map["main_ram"],
                 size                    = kwargs.get("max_sdram_size", 0x40000000),
-                l2_cache_size           = kwargs.get("l2_size", 8192),
-                l2_cache_min_data_width = kwargs.get("min_l2_data_width", 128),
+                l2_cache_size           = l2_cache_size(self.platform, **kwargs),
+                l2_cache_min_data_width = l2_cache_min_data_width(self.platform, **kwargs),
                 l2_cache_reverse        = True
             )
 
@@ -98,21 +105,33 @@ def main():
     parser.add_argument("--device", dest="device", default="LFE5U-45F",
         help="FPGA device, ULX3S can be populated with LFE5U-45F (default) or LFE5U-85F")
     parser.add_argument("--sys-clk-freq", default=50e6,
-                        help="system clock frequency (default=50MHz)")
+                        help="system clock frequency (default=50MHz, recorded: frequency recorded by fmax_search)")
     parser.add_argument("--sdram-module", default="MT48LC16M16",
                         help="SDRAM module: MT48LC16M16, AS4C32M16 or AS4C16M16 (default=MT48LC16M16)")
     builder_args(parser)
+    gateware_cache_args(parser)
+    build_profile_args(parser)
+    reports_args(parser)
     soc_sdram_args(parser)
+    l2_cache_args(parser)
+    dram_benchmark_args(parser)
     trellis_args(parser)
     args = parser.parse_args()
+    build_profile_start(args)
+
+    # Resolved value in args: used by the gateware cache key.
+    args.sys_clk_freq = sys_clk_freq = resolve_sys_clk_freq("ulx3s", args.sys_clk_freq, default=50e6)
 
     soc = BaseSoC(device=args.device, toolchain=args.toolchain,
-        sys_clk_freq=int(float(args.sys_clk_freq)),
+        sys_clk_freq=sys_clk_freq,
         sdram_module_cls=args.sdram_module,
-        **soc_sdram_argdict(args))
+        **soc_sdram_argdict(args), **l2_cache_argdict(args))
+    dram_benchmark_apply(soc, args)
     builder = Builder(soc, **builder_argdict(args))
+    build_profile_apply(builder, args)
+    build_reports(builder, args)
     builder_kargs = trellis_argdict(args) if args.toolchain == "trellis" else {}
-    builder.build(**builder_kargs)
+    gateware_cache_build(builder, args, **builder_kargs)
 
 if __name__ == "__main__":
     main()
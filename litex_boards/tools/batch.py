@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+
+# License: BSD
+
+"""Batch build of a matrix of targets x options with memory-aware scheduling.
+
+Jobs are scheduled concurrently while their estimated memory (from the toolchain and FPGA family)
+and CPU usage fit in the available memory and cores. The state of each job is saved to
+<output-dir>/batch.json: when restarted on the same output directory, successful jobs are skipped
+and interrupted/failed ones are built again.
+
+    ./batch.py --targets arty kc705 --option="" --option="--with-ethernet" --output-dir nightly
+
+The matrix can also be given as a JSON file:
+
+    {"targets": ["arty", "kc705"], "options": [[], ["--with-ethernet"]],
+     "jobs": [{"target": "fomu", "args": ["--board=pvt"]}]}
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import shlex
+import argparse
+import itertools
+import subprocess
+
+from litex_boards import platforms
+from litex_boards.tools.elaborate import root_dir
+from litex_boards.tools.benchmark import targets_dir, target_required_args
+from litex_boards.tools.software_cache import software_cache_env
+
+# Resources Estimation -----------------------------------------------------------------------------
+
+GiB = 1024**3
+
+# Estimated peak memory (GiB) and cores used by each toolchain.
+toolchain_resources = {
+    #  Toolchain              Memory  Cores
+    "vivado"               : (8,      4),
+    "ise"                  : (2,      1),
+    "quartus"              : (6,      2),
+    "diamond"              : (4,      1),
+    "trellis"              : (2,      1),
+    "icestorm"             : (1,      1),
+    "libero_soc_polarfire" : (8,      2),
+}
+
+# Estimated peak memory (GiB) overrides for large FPGA families.
+family_memory = {
+    "Kintex7"            : 10,
+    "Virtex7"            : 16,
+    "Kintex UltraScale"  : 16,
+    "Zynq UltraScale+"   : 16,
+    "Virtex UltraScale+" : 32,
+}
+
+# Target to platform names when they differ.
+target_platforms = {
+    "fomu" : "fomu_pvt",
+}
+
+def get_toolchain(target, args):
+    for i, arg in enumerate(args):
+        for option in ["--gateware-toolchain", "--toolchain"]:
+            if arg == option and i + 1 < len(args):
+                return args[i + 1]
+            if arg.startswith(option + "="):
+                return arg.split("=", 1)[1]
+    info = platforms.board_info(target_platforms.get(target, target))
+    toolchain = info["toolchain"]
+    # ECP5 targets default to the open source toolchain.
+    if info["family"] == "ECP5" and toolchain == "diamond":
+        toolchain = "trellis"
+    return toolchain
+
+def estimate_resources(target, args):
+    """Return (memory in bytes, cores) estimated for building `target` with `args`."""
+    toolchain      = get_toolchain(target, args)
+    memory, cores  = toolchain_resources.get(toolchain, (4, 1))
+    if toolchain in ["vivado", "ise"]:
+        family = platforms.board_info(target_platforms.get(target, target))["family"]
+        memory = family_memory.get(family, memory)
+    return memory*GiB, cores
+
+def available_memory():
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1])*1024
+    except OSError:
+        pass
+    return os.sysconf("SC_PAGE_SIZE")*os.sysconf("SC_PHYS_PAGES")
+
+# Jobs ---------------------------------------------------------------------------------------------
+
+class Job:
+    def __init__(self, target, args):
+        self.target = target
+        self.args   = list(args)
+        self.name   = "_".join([target] + [re.sub(r"[^\w.]+", "_", a).strip("_") for a in args])
+        if args:
+            # Different arguments can give the same name once sanitized (ex: "--a=b" and "--a b").
+            self.name += "_" + hashlib.sha1(json.dumps(self.args).encode()).hexdigest()[:8]
+        self.memory, self.cores = estimate_resources(target, args)
+
+    def command(self, output_dir):
+        return [sys.executable, os.path.join(targets_dir, self.target + ".py"),
+            "--output-dir", os.path.join(output_dir, self.name),
+        ] + target_required_args.get(self.target, []) + self.args
+
+def get_jobs(matrix):
+    jobs = []
+    for target, options in itertools.product(matrix.get("targets", []), matrix.get("options", [[]])):
+        jobs.append(Job(target, shlex.split(options) if isinstance(options, str) else options))
+    for job in matrix.get("jobs", []):
+        jobs.append(Job(job["target"], job.get("args", [])))
+    return jobs
+
+# Scheduler ----------------------------------------------------------------------------------------
+
+class BatchBuilder:
+    def __init__(self, jobs, output_dir, max_memory=None, max_cores=None, dry_run=False,
+        software_cache=True, software_cache_dir=None):
+        self.jobs               = jobs
+        self.output_dir         = os.path.abspath(output_dir)
+        self.max_memory         = max_memory or available_memory()
+        self.max_cores          = max_cores  or os.cpu_count() or 1
+        self.dry_run            = dry_run
+        self.software_cache     = software_cache
+        self.software_cache_dir = software_cache_dir
+        self.state_file         = os.path.join(self.output_dir, "batch.json")
+        self.state              = {}
+
+    def load_state(self):
+        if os.path.isfile(self.state_file):
+            with open(self.state_file) as f:
+                self.state = json.load(f)
+
+    def save_state(self):
+        tmp = self.state_file + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.state, f, indent=4, sort_keys=True)
+        os.replace(tmp, self.state_file)
+
+    def run(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.load_state()
+
+        # Resume: skip jobs already built successfully with the same arguments.
+        pending = []
+        for job in self.jobs:
+            state = self.state.get(job.name, {})
+            if state.get("status") == "success" and state.get("args") == job.args:
+                continue
+            pending.append(job)
+        # Schedule largest jobs first so they do not end up alone at the end of the batch.
+        pending.sort(key=lambda job: (job.memory, job.cores), reverse=True)
+
+        # Share the BIOS/software objects between the jobs.
+        env = software_cache_env(self.software_cache_dir) if self.software_cache else dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(p for p in [root_dir, env.get("PYTHONPATH")] if p)
+        running = {}
+        try:
+            while pending or running:
+                # Start jobs fitting in the remaining memory/cores (always allow one job to run).
+                used_memory = sum(job.memory for job, _, _, _ in running.values())
+                used_cores  = sum(job.cores  for job, _, _, _ in running.values())
+                for job in list(pending):
+                    fits = (used_memory + job.memory <= self.max_memory and
+                            used_cores  + job.cores  <= self.max_cores)
+                    if not fits and running:
+                        continue
+                    pending.remove(job)
+                    print("[{}] starting (~{:.0f}GiB, {} core(s))".format(job.name, job.memory/GiB, job.cores))
+                    used_memory += job.memory
+                    used_cores  += job.cores
+                    if self.dry_run:
+                        print("    " + " ".join(shlex.quote(a) for a in job.command(self.output_dir)))
+                        running[job.name] = (job, None, None, None)
+                        continue
+                    os.makedirs(os.path.join(self.output_dir, job.name), exist_ok=True)
+                    log = open(os.path.join(self.output_dir, job.name, "build.log"), "w")
+                    p   = subprocess.Popen(job.command(self.output_dir), env=env,
+                        stdout = log,
+                        stderr = subprocess.STDOUT)
+                    running[job.name] = (job, p, log, time.time())
+                    self.state[job.name] = {"target": job.target, "args": job.args, "status": "running"}
+                    self.save_state()
+
+                # Dry run: the jobs started together are assumed to finish together.
+                if self.dry_run:
+                    if pending:
+                        print("[waiting for the {} job(s) above to finish]".format(len(running)))
+                    running = {}
+                    continue
+
+                # Wait for a job to finish.
+                finished = [name for name, (_, p, _, _) in running.items() if p.poll() is not None]
+                if running and not finished:
+                    time.sleep(0.5)
+                for name in finished:
+                    job, p, log, start = running.pop(name)
+                    log.close()
+                    self.state[job.name].update({
+                        "status" : "success" if p.returncode == 0 else "failure",
+                        "time"   : time.time() - start,
+                    })
+                    self.save_state()
+                    print("[{}] {} ({:.1f}s)".format(job.name, self.state[job.name]["status"],
+                        self.state[job.name]["time"]))
+        except KeyboardInterrupt:
+            if self.dry_run:
+                raise
+            for job, p, log, start in running.values():
+                p.terminate()
+            for job, p, log, start in running.values():
+                p.wait()
+                log.close()
+                self.state[job.name]["status"] = "interrupted"
+            self.save_state()
+            raise
+        return self.state
+
+    def summary(self, file=sys.stdout):
+        errors = 0
+        print("-"*80, file=file)
+        for job in self.jobs:
+            state = self.state.get(job.name, {})
+            print("{:48s} {:12s} {:10s}".format(job.name, state.get("status", "not run"),
+                "{:.1f}s".format(state["time"]) if "time" in state else ""), file=file)
+            errors += state.get("status") != "success"
+        print("-"*80, file=file)
+        print("{} job(s), {} error(s), {:.1f}s total build time".format(len(self.jobs), errors,
+            sum(self.state.get(job.name, {}).get("time", 0) for job in self.jobs)), file=file)
+        return errors
+
+# Main ---------------------------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="LiteX boards batch builder")
+    parser.add_argument("--matrix",     default=None, help="JSON build matrix")
+    parser.add_argument("--targets",    nargs="+", default=[], help="targets to build")
+    parser.add_argument("--option",     action="append", default=None,
+        help="target options of one configuration, can be repeated (ex: --option=\"--with-ethernet\")")
+    parser.add_argument("--output-dir", default="batch", help="base output directory (default=batch)")
+    parser.add_argument("--max-memory", default=None, type=float,
+        help="memory available for the builds in GiB (default=available memory)")
+    parser.add_argument("--max-cores",  default=None, type=int,
+        help="cores available for the builds (default=CPU count)")
+    parser.add_argument("--dry-run",    action="store_true", help="only print the scheduled jobs")
+    parser.add_argument("--no-software-cache",  action="store_true",
+        help="do not share the BIOS/software objects between the jobs")
+    parser.add_argument("--software-cache-dir", default=None, help="BIOS/software objects cache directory")
+    args = parser.parse_args()
+
+    matrix = {"targets": args.targets, "options": args.option or [""]}
+    if args.matrix is not None:
+        with open(args.matrix) as f:
+            matrix = json.load(f)
+    batch = BatchBuilder(get_jobs(matrix), args.output_dir,
+        max_memory         = int(args.max_memory*GiB) if args.max_memory is not None else None,
+        max_cores          = args.max_cores,
+        dry_run            = args.dry_run,
+        software_cache     = not args.no_software_cache,
+        software_cache_dir = args.software_cache_dir)
+    batch.run()
+    if not args.dry_run:
+        sys.exit(batch.summary() != 0)
+
+if __name__ == "__main__":
+    main()
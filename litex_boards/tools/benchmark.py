@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+
+# License: BSD
+
+"""Elaboration benchmark of the targets.
+
+Each target is elaborated (SoC creation and Verilog generation, no software/gateware compilation)
+in its default configuration and in its feature-enabled ones:
+
+- minimal:  integrated main RAM instead of SDRAM (SDRAM targets only).
+- default:  target defaults (SDRAM on SDRAM targets).
+- ethernet: --with-ethernet (when supported by the target).
+- pcie:     --with-pcie (when supported by the target); PCIe targets (nereid, tagus, aller: PCIeSoC
+            only) are benchmarked in this configuration only.
+
+For each run, wall time, peak RSS and generated netlist size are recorded. Results can be saved to a
+JSON baseline and compared to it to flag regressions.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import resource
+import tempfile
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+
+from litex_boards.tools.elaborate import root_dir
+
+# Configurations -----------------------------------------------------------------------------------
+
+targets_dir = os.path.join(root_dir, "litex_boards", "targets")
+
+# Arguments required by some targets.
+target_required_args = {
+    "fomu": ["--board=pvt"],
+}
+
+def get_targets():
+    return sorted(f[:-3] for f in os.listdir(targets_dir)
+        if f.endswith(".py") and f not in ["__init__.py", "simple.py"])
+
+def get_configs(target):
+    """Return the benchmark configurations {name: args} supported by `target`."""
+    with open(os.path.join(targets_dir, target + ".py")) as f:
+        source = f.read()
+    if "class PCIeSoC(SoCCore)" in source:
+        return {"pcie": []}
+    configs = {"default": []}
+    if "add_sdram(" in source:
+        configs["minimal"] = ["--integrated-main-ram-size=0x8000"]
+    if "\"--with-ethernet\"" in source:
+        configs["ethernet"] = ["--with-ethernet"]
+    if "\"--with-pcie\"" in source:
+        configs["pcie"] = ["--with-pcie"]
+    return configs
+
+# Run ----------------------------------------------------------------------------------------------
+
+def _run_benchmark(cmd, env):
+    """Run `cmd`, return (returncode, stderr, wall time, peak RSS in bytes).
+
+    Called in a dedicated worker process (see run_benchmark): `cmd` is the only child of the worker,
+    so the RUSAGE_CHILDREN peak RSS of the worker is the one of `cmd`.
+    """
+    start = time.time()
+    with subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE) as p:
+        _, stderr = p.communicate()
+    duration = time.time() - start
+    rss      = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss*1024 # KiB on Linux.
+    return p.returncode, stderr, duration, rss
+
+def run_benchmark(target, args, output_dir):
+    """Elaborate `target` with `args` and return its time/memory/netlist measurements."""
+    cmd = [sys.executable, os.path.join(targets_dir, target + ".py"),
+        "--output-dir", output_dir,
+        "--no-compile-software",
+        "--no-compile-gateware",
+    ] + target_required_args.get(target, []) + args
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in [root_dir, env.get("PYTHONPATH")] if p)
+    # RUSAGE_CHILDREN peak RSS is a maximum over all the reaped children of a process, so each
+    # benchmark is run from its own worker process.
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        returncode, stderr, duration, rss = executor.submit(_run_benchmark, cmd, env).result()
+    top_v    = os.path.join(output_dir, "gateware", "top.v")
+    success  = (returncode == 0) and os.path.isfile(top_v)
+    result   = {
+        "success"      : success,
+        "time"         : duration,
+        "rss"          : rss,
+        "netlist_size" : os.path.getsize(top_v) if success else 0,
+    }
+    if not success:
+        result["error"] = stderr.decode(errors="replace")[-2048:]
+    return result
+
+def run(targets=None, configs=None, output_dir=None):
+    results = {}
+    tmp_dir = tempfile.mkdtemp(prefix="litex_boards_bench_") if output_dir is None else output_dir
+    try:
+        for target in targets or get_targets():
+            for config, args in sorted(get_configs(target).items()):
+                if configs is not None and config not in configs:
+                    continue
+                name = "{}:{}".format(target, config)
+                results[name] = run_benchmark(target, args, os.path.join(tmp_dir, target, config))
+                print_result(name, results[name])
+    finally:
+        if output_dir is None:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    return results
+
+# Baseline -----------------------------------------------------------------------------------------
+
+default_tolerances = {
+    "time"         : 0.20,
+    "rss"          : 0.10,
+    "netlist_size" : 0.05,
+}
+
+def compare(results, baseline, tolerances=default_tolerances):
+    """Compare `results` to `baseline`, return the list of regressions as strings."""
+    regressions = []
+    for name, result in sorted(results.items()):
+        if name not in baseline:
+            continue
+        if baseline[name]["success"] and not result["success"]:
+            regressions.append("{}: elaboration now fails".format(name))
+            continue
+        for metric, tolerance in tolerances.items():
+            ref, new = baseline[name].get(metric, 0), result.get(metric, 0)
+            if ref and new > ref*(1 + tolerance):
+                regressions.append("{}: {} {:.6g} -> {:.6g} (+{:.1f}%, tolerance {:.0f}%)".format(
+                    name, metric, ref, new, 100*(new - ref)/ref, 100*tolerance))
+    return regressions
+
+def print_result(name, result, file=sys.stdout):
+    print("{:32s} {:4s} {:8.2f}s {:8.1f}MiB {:10d}B".format(name,
+        "ok" if result["success"] else "FAIL",
+        result["time"],
+        result["rss"]/1024**2,
+        result["netlist_size"]), file=file)
+
+# Main ---------------------------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="LiteX boards elaboration benchmark")
+    parser.add_argument("--targets", nargs="+", default=None, help="targets to benchmark (default=all)")
+    parser.add_argument("--configs", nargs="+", default=None,
+        help="configurations to benchmark: minimal, default, ethernet, pcie (default=all)")
+    parser.add_argument("--output-dir", default=None, help="keep the builds in this directory")
+    parser.add_argument("--results",  default=None, help="save results to this JSON file")
+    parser.add_argument("--baseline", default=None, help="JSON baseline to compare results to")
+    parser.add_argument("--update-baseline", action="store_true", help="update the JSON baseline")
+    parser.add_argument("--time-tolerance", default=default_tolerances["time"], type=float,
+        help="allowed relative increase of wall time (default=0.20)")
+    parser.add_argument("--rss-tolerance", default=default_tolerances["rss"], type=float,
+        help="allowed relative increase of peak RSS (default=0.10)")
+    parser.add_argument("--netlist-tolerance", default=default_tolerances["netlist_size"], type=float,
+        help="allowed relative increase of netlist size (default=0.05)")
+    args = parser.parse_args()
+
+    results = run(args.targets, args.configs, args.output_dir)
+    if args.results is not None:
+        with open(args.results, "w") as f:
+            json.dump(results, f, indent=4, sort_keys=True)
+
+    regressions = []
+    if args.baseline is not None:
+        baseline = {}
+        if os.path.isfile(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        if args.update_baseline:
+            baseline.update(results)
+            with open(args.baseline, "w") as f:
+                json.dump(baseline, f, indent=4, sort_keys=True)
+        else:
+            regressions = compare(results, baseline, {
+                "time"         : args.time_tolerance,
+                "rss"          : args.rss_tolerance,
+                "netlist_size" : args.netlist_tolerance,
+            })
+            for regression in regressions:
+                print("REGRESSION: " + regression)
+    sys.exit(bool(regressions) or any(not r["success"] for r in results.values()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+# License: BSD
+
+"""Build hooks of the targets Builders.
+
+Tools acting around the build of a target (build profile, reports, nextpnr seed sweep) add a hook to
+the Builder instance the target passes them, instead of patching the Builder class or replacing the
+build method of the instance themselves:
+
+    def hook(build, **kwargs):
+        # Before the build.
+        r = build(**kwargs) # Builder.build (or the next hook).
+        # After the build.
+        return r
+
+    add_build_hook(builder, hook)
+
+Hooks are called in the order they are added: the first hook added is the outermost one.
+"""
+
+# Build Hooks --------------------------------------------------------------------------------------
+
+def add_build_hook(builder, hook):
+    """Run the builds of `builder` through `hook(build, **kwargs)`."""
+    hooks = builder.__dict__.get("build_hooks")
+    if hooks is None:
+        hooks = builder.build_hooks = []
+        build = builder.build
+        def hooked_build(**kwargs):
+            def call(i, **kwargs):
+                if i == len(hooks):
+                    return build(**kwargs)
+                return hooks[i](lambda **kwargs: call(i + 1, **kwargs), **kwargs)
+            return call(0, **kwargs)
+        builder.build = hooked_build
+    hooks.append(hook)
@@ -0,0 +1,212 @@
+# License: BSD
+
+"""Per-phase build timing and profiling of the targets.
+
+With --build-profile=<file.json>, a target build is split in phases:
+
+- elaboration:   SoC creation and finalization (Python).
+- verilog:       Verilog emission (Python).
+- software:      BIOS/libraries compilation (make).
+- gateware:      Toolchain run, with synthesis/place_and_route/bitstream sub-phases when they can be
+                 identified (Yosys/nextpnr: from the outputs of each step, Vivado: from its log).
+
+The report is written in Chrome's Trace Event format (viewable in chrome://tracing or Perfetto), one
+span per phase, with the cProfile hot spots of the Python phases in "otherData" (the full profile
+being saved next to the report as <file>.prof).
+
+Targets enable it with:
+
+    build_profile_args(parser)
+    args = parser.parse_args()
+    build_profile_start(args) # Before the SoC creation.
+    ...
+    builder = Builder(soc, **builder_argdict(args))
+    build_profile_apply(builder, args) # Profiles the build of this Builder.
+"""
+
+import os
+import re
+import json
+import time
+import pstats
+import cProfile
+import subprocess
+
+from litex_boards.tools.build_hooks import add_build_hook
+
+# Build Profiler -----------------------------------------------------------------------------------
+
+_toolchain_phases = [
+    # Phase            Outputs (ends of the phase)
+    ("synthesis",       [".json", ".blif"]),   # Yosys.
+    ("place_and_route", [".config", ".txt"]),  # nextpnr-ecp5 (textcfg), nextpnr-ice40/arachne (asc).
+    ("bitstream",       [".bit", ".bin"]),     # ecppack, icepack.
+]
+
+_vivado_phases = {
+    "synth_design"    : "synthesis",
+    "opt_design"      : "synthesis",
+    "place_design"    : "place_and_route",
+    "phys_opt_design" : "place_and_route",
+    "route_design"    : "place_and_route",
+    "write_bitstream" : "bitstream",
+}
+
+class BuildProfiler:
+    def __init__(self, filename, hotspots=30):
+        self.filename = filename
+        self.hotspots = hotspots
+        self.start    = time.time()
+        self.events   = []
+        self.profile  = cProfile.Profile()
+        self.profile.enable()
+        self.current  = ("elaboration", self.start)
+
+    # Spans ----------------------------------------------------------------------------------------
+
+    def add_span(self, name, start, end, tid=0, **args):
+        self.events.append({
+            "name" : name,
+            "ph"   : "X",
+            "ts"   : (start - self.start)*1e6,
+            "dur"  : (end - start)*1e6,
+            "pid"  : os.getpid(),
+            "tid"  : tid,
+            "args" : args,
+        })
+
+    def enter(self, name):
+        """Close the current Python phase and open phase `name`."""
+        now = time.time()
+        self.add_span(self.current[0], self.current[1], now)
+        self.current = (name, now)
+
+    # Instrumentation ------------------------------------------------------------------------------
+
+    def _wrap_subprocess(self, func):
+        def wrapper(args, *pargs, **kwargs):
+            cmd   = args if isinstance(args, str) else " ".join(str(a) for a in args)
+            phase = "software" if re.search(r"(^|/)make\b", cmd) else "gateware"
+            # Subprocess phases are not Python: pause the Python phase/profile.
+            self.profile.disable()
+            self.enter(phase)
+            try:
+                return func(args, *pargs, **kwargs)
+            finally:
+                self.enter("elaboration")
+                self.profile.enable()
+        return wrapper
+
+    def _wrap_verilog(self, func):
+        def wrapper(*args, **kwargs):
+            self.enter("verilog")
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.enter("elaboration")
+        return wrapper
+
+    def _collect_toolchain_phases(self, build_dir, build_name):
+        gateware = [e for e in self.events if e["name"] == "gateware"]
+        # Yosys/nextpnr: the build script is left untouched (shell independent), each sub-phase
+        # ending when its output is written.
+        if gateware:
+            t = self.start + gateware[-1]["ts"]/1e6
+            for name, extensions in _toolchain_phases:
+                mtimes = [os.path.getmtime(os.path.join(build_dir, build_name + ext))
+                    for ext in extensions if os.path.isfile(os.path.join(build_dir, build_name + ext))]
+                mtimes = [m for m in mtimes if m >= t]
+                if mtimes:
+                    self.add_span(name, t, max(mtimes), tid=1)
+                    t = max(mtimes)
+        # Vivado: reconstruct sub-phases from the elapsed times of the log.
+        vivado_log = os.path.join(build_dir, "vivado.log")
+        if os.path.isfile(vivado_log) and gateware:
+            t = self.start + gateware[-1]["ts"]/1e6
+            with open(vivado_log, errors="replace") as f:
+                for command, elapsed in re.findall(r"^(\w+): Time \(s\): cpu = [\d:]+ ; elapsed = ([\d:]+)",
+                    f.read(), re.MULTILINE):
+                    if command not in _vivado_phases:
+                        continue
+                    h, m, s = (int(v) for v in elapsed.split(":"))
+                    duration = 3600*h + 60*m + s
+                    self.add_span(_vivado_phases[command], t, t + duration, tid=1, command=command)
+                    t += duration
+
+    def build(self, builder, build, **kwargs):
+        """Run `build(**kwargs)` (Builder.build or a wrapper of it) with the instrumentation."""
+        from migen.fhdl import verilog
+        build_name = kwargs.get("build_name", "top")
+        # Only subprocess.call is wrapped: subprocess.check_call (make) calls it.
+        patches = [
+            (subprocess, "call",    self._wrap_subprocess(subprocess.call)),
+            (verilog,    "convert", self._wrap_verilog(verilog.convert)),
+        ]
+        originals = [(obj, name, getattr(obj, name)) for obj, name, _ in patches]
+        for obj, name, func in patches:
+            setattr(obj, name, func)
+        try:
+            return build(**kwargs)
+        finally:
+            for obj, name, func in originals:
+                setattr(obj, name, func)
+            self.enter("end")
+            self.profile.disable()
+            self._collect_toolchain_phases(builder.gateware_dir, build_name)
+            self.write()
+
+    # Report ---------------------------------------------------------------------------------------
+
+    def write(self):
+        self.profile.dump_stats(self.filename + ".prof")
+        stats    = pstats.Stats(self.profile)
+        hotspots = []
+        for (filename, line, function), (cc, nc, tt, ct, callers) in stats.stats.items():
+            hotspots.append({"function": "{}:{}({})".format(filename, line, function),
+                "calls": nc, "tottime": tt, "cumtime": ct})
+        hotspots = sorted(hotspots, key=lambda h: h["tottime"], reverse=True)[:self.hotspots]
+        phases = {}
+        for e in self.events:
+            if e["tid"] == 0:
+                phases[e["name"]] = phases.get(e["name"], 0) + e["dur"]/1e6
+        with open(self.filename, "w") as f:
+            json.dump({
+                "traceEvents"     : self.events,
+                "displayTimeUnit" : "ms",
+                "otherData"       : {
+                    "phases"          : phases,
+                    "python_hotspots" : hotspots,
+                },
+            }, f, indent=4)
+        print("Build profile written to {}:".format(self.filename))
+        for name, duration in phases.items():
+            print("  {:16s} {:10.2f}s".format(name, duration))
+
+# Target Arguments ---------------------------------------------------------------------------------
+
+_profiler = None
+
+def build_profile_args(parser):
+    parser.add_argument("--build-profile", default=None,
+        help="write a per-phase timing report (Trace Event JSON) and Python profile to this file")
+
+def build_profile_start(args):
+    """Start profiling (when --build-profile is given): the elaboration phase starts now and the
+    report is written at the end of the build of the Builder given to build_profile_apply."""
+    global _profiler
+    if getattr(args, "build_profile", None) is None:
+        return None
+    _profiler = BuildProfiler(args.build_profile)
+    return _profiler
+
+def build_profile_apply(builder, args):
+    """Profile the build of `builder` (when --build-profile is given)."""
+    if _profiler is None or getattr(args, "build_profile", None) is None:
+        return
+    def build_profile_hook(build, **kwargs):
+        return _profiler.build(builder, build, **kwargs)
+    add_build_hook(builder, build_profile_hook)
+
+def build_profiler():
+    """Return the active BuildProfiler (None when profiling is not enabled)."""
+    return _profiler
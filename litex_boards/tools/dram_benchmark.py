@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+
+# License: BSD
+
+"""DRAM bandwidth and latency benchmark.
+
+The SDRAM targets can add (with --with-dram-benchmark) a benchmark core on dedicated LiteDRAM
+crossbar ports:
+- a LiteDRAM BIST generator (writes) and checker (reads) with cycle counters measuring the duration
+  of each run,
+- a latency probe issuing sequential single reads and measuring the min/max/total number of cycles
+  between each read command and its data.
+
+The measurements are done in the sys clock domain at the native port of the controller, so the
+different PHYs (A7DDRPHY, K7DDRPHY, USDDRPHY, ECP5DDRPHY, GENSDRPHY) and configurations can be
+compared on equal terms, the efficiency being given relative to the native port bandwidth.
+
+The host tool reads the results through litex_server (UART bridge, Etherbone or PCIe):
+
+    litex_server --udp --udp-ip=192.168.1.50
+    ./dram_benchmark.py --csr-csv csr.csv --output arty.json
+"""
+
+import sys
+import json
+import time
+import argparse
+
+from migen import *
+
+from litex.soc.interconnect.csr import *
+
+from litedram.frontend.bist import LiteDRAMBISTGenerator, LiteDRAMBISTChecker
+
+# Cycle Counter ------------------------------------------------------------------------------------
+
+class _CycleCounter(Module):
+    """Count the cycles between `start` and `done` (once `done` has been deasserted)."""
+    def __init__(self, start, done):
+        self.cycles = Signal(32)
+
+        # # #
+
+        armed    = Signal()
+        counting = Signal()
+        self.sync += [
+            If(start,
+                armed.eq(1),
+                counting.eq(0),
+                self.cycles.eq(0)
+            ).Elif(armed & ~done,
+                armed.eq(0),
+                counting.eq(1),
+                self.cycles.eq(1)
+            ).Elif(counting,
+                If(done,
+                    counting.eq(0)
+                ).Else(
+                    self.cycles.eq(self.cycles + 1)
+                )
+            )
+        ]
+
+# Latency Probe ------------------------------------------------------------------------------------
+
+class DRAMLatencyProbe(Module, AutoCSR):
+    """Issue `count` sequential reads (one outstanding) from `base` with `stride` (in port words) and
+    measure the min/max/total latency (in cycles) between each read command and its data."""
+    def __init__(self, port):
+        self.start  = CSR()
+        self.done   = CSRStatus()
+        self.base   = CSRStorage(port.address_width)
+        self.stride = CSRStorage(port.address_width, reset=1)
+        self.count  = CSRStorage(16, reset=256)
+        self.min    = CSRStatus(32)
+        self.max    = CSRStatus(32)
+        self.total  = CSRStatus(32)
+
+        # # #
+
+        addr    = Signal(port.address_width)
+        count   = Signal(16)
+        latency = Signal(32)
+        _min    = Signal(32)
+        _max    = Signal(32)
+        total   = Signal(32)
+
+        self.comb += [
+            self.min.status.eq(_min),
+            self.max.status.eq(_max),
+            self.total.status.eq(total),
+            port.cmd.we.eq(0),
+            port.cmd.last.eq(1),
+            port.cmd.addr.eq(addr),
+        ]
+
+        self.submodules.fsm = fsm = FSM(reset_state="IDLE")
+        fsm.act("IDLE",
+            self.done.status.eq(1),
+            If(self.start.re,
+                NextValue(addr,    self.base.storage),
+                NextValue(count,   self.count.storage),
+                NextValue(latency, 0),
+                NextValue(_min,    2**32 - 1),
+                NextValue(_max,    0),
+                NextValue(total,   0),
+                NextState("CMD")
+            )
+        )
+        fsm.act("CMD",
+            port.cmd.valid.eq(1),
+            NextValue(latency, latency + 1),
+            If(port.cmd.ready,
+                NextState("DATA")
+            )
+        )
+        fsm.act("DATA",
+            port.rdata.ready.eq(1),
+            NextValue(latency, latency + 1),
+            If(port.rdata.valid,
+                If(latency < _min, NextValue(_min, latency)),
+                If(latency > _max, NextValue(_max, latency)),
+                NextValue(total,   total + latency),
+                NextValue(latency, 0),
+                NextValue(addr,    addr + self.stride.storage),
+                NextValue(count,   count - 1),
+                If(count <= 1,
+                    NextState("IDLE")
+                ).Else(
+                    NextState("CMD")
+                )
+            )
+        )
+
+# DRAM Benchmark -----------------------------------------------------------------------------------
+
+class DRAMBenchmark(Module, AutoCSR):
+    def __init__(self, crossbar):
+        self.write_cycles = CSRStatus(32)
+        self.read_cycles  = CSRStatus(32)
+
+        # # #
+
+        generator_port = crossbar.get_port()
+        checker_port   = crossbar.get_port()
+        latency_port   = crossbar.get_port()
+        self.data_width = generator_port.data_width
+
+        self.submodules.generator = LiteDRAMBISTGenerator(generator_port)
+        self.submodules.checker   = LiteDRAMBISTChecker(checker_port)
+        self.submodules.latency   = DRAMLatencyProbe(latency_port)
+
+        write_counter = _CycleCounter(self.generator.start.re, self.generator.done.status)
+        read_counter  = _CycleCounter(self.checker.start.re,   self.checker.done.status)
+        self.submodules += write_counter, read_counter
+        self.comb += [
+            self.write_cycles.status.eq(write_counter.cycles),
+            self.read_cycles.status.eq(read_counter.cycles),
+        ]
+
+# Target Arguments ---------------------------------------------------------------------------------
+
+def dram_benchmark_args(parser):
+    parser.add_argument("--with-dram-benchmark", action="store_true",
+        help="add DRAM bandwidth/latency benchmark core")
+
+def dram_benchmark_apply(soc, args=None):
+    """Add the benchmark core to `soc` (when --with-dram-benchmark is given and the SoC has an
+    SDRAM)."""
+    if args is not None and not getattr(args, "with_dram_benchmark", False):
+        return
+    if not hasattr(soc, "sdram"):
+        return
+    soc.submodules.sdram_bench = DRAMBenchmark(soc.sdram.crossbar)
+    soc.add_csr("sdram_bench")
+    soc.add_constant("SDRAM_BENCH_DATA_WIDTH", soc.sdram_bench.data_width)
+
+# Host ---------------------------------------------------------------------------------------------
+
+def _wait(reg, timeout=60.0):
+    deadline = time.time() + timeout
+    while not reg.read():
+        if time.time() > deadline:
+            raise TimeoutError("DRAM benchmark timeout.")
+
+def _bist(wb, name, base, length, random):
+    regs = wb.regs
+    getattr(regs, "sdram_bench_" + name + "_reset").write(1)
+    getattr(regs, "sdram_bench_" + name + "_base").write(base)
+    getattr(regs, "sdram_bench_" + name + "_end").write(base + length)
+    getattr(regs, "sdram_bench_" + name + "_length").write(length)
+    getattr(regs, "sdram_bench_" + name + "_random").write(0b11 if random else 0b00)
+    getattr(regs, "sdram_bench_" + name + "_start").write(1)
+    _wait(getattr(regs, "sdram_bench_" + name + "_done"))
+
+def run_benchmark(wb, base=0x0, length=16*1024*1024, random=False, latency_count=256, latency_stride=1):
+    """Run the write/read/latency benchmarks on the SoC behind `wb` (RemoteClient)."""
+    sys_clk_freq = wb.constants.config_clock_frequency
+    data_width   = wb.constants.sdram_bench_data_width
+    peak         = data_width//8*sys_clk_freq
+    results      = {
+        "sys_clk_freq" : sys_clk_freq,
+        "data_width"   : data_width,
+        "peak"         : peak,
+        "length"       : length,
+        "random"       : random,
+    }
+
+    # Write/Read bandwidth.
+    for name, bist, cycles in [
+        ("write", "generator", "write_cycles"),
+        ("read",  "checker",   "read_cycles")]:
+        _bist(wb, bist, base, length, random)
+        n = getattr(wb.regs, "sdram_bench_" + cycles).read()
+        bandwidth = length/(n/sys_clk_freq)
+        results[name] = {
+            "cycles"     : n,
+            "bandwidth"  : bandwidth,
+            "efficiency" : bandwidth/peak,
+        }
+    results["read"]["errors"] = wb.regs.sdram_bench_checker_errors.read()
+
+    # Latency.
+    regs = wb.regs
+    regs.sdram_bench_latency_base.write(base//(data_width//8))
+    regs.sdram_bench_latency_stride.write(latency_stride)
+    regs.sdram_bench_latency_count.write(latency_count)
+    regs.sdram_bench_latency_start.write(1)
+    _wait(regs.sdram_bench_latency_done)
+    ns = 1e9/sys_clk_freq
+    results["latency"] = {
+        "count"  : latency_count,
+        "stride" : latency_stride,
+        "min"    : regs.sdram_bench_latency_min.read()*ns,
+        "max"    : regs.sdram_bench_latency_max.read()*ns,
+        "avg"    : regs.sdram_bench_latency_total.read()/latency_count*ns,
+    }
+    return results
+
+def print_results(results, file=sys.stdout):
+    print("DRAM benchmark ({} bytes, {}, {}-bit native port @ {:.2f}MHz, peak {:.3f}GB/s):".format(
+        results["length"],
+        "random" if results["random"] else "sequential",
+        results["data_width"],
+        results["sys_clk_freq"]/1e6,
+        results["peak"]/1e9), file=file)
+    for name in ["write", "read"]:
+        r = results[name]
+        print("  {:<5}: {:.3f}GB/s ({:.1f}% of peak){}".format(
+            name, r["bandwidth"]/1e9, 100*r["efficiency"],
+            ", {} errors".format(r["errors"]) if "errors" in r else ""), file=file)
+    r = results["latency"]
+    print("  latency: min {:.1f}ns, avg {:.1f}ns, max {:.1f}ns ({} reads, stride {})".format(
+        r["min"], r["avg"], r["max"], r["count"], r["stride"]), file=file)
+
+# Main ---------------------------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="DRAM bandwidth and latency benchmark")
+    parser.add_argument("--csr-csv",        default="csr.csv", help="CSR configuration of the SoC")
+    parser.add_argument("--port",           default=1234, type=int, help="litex_server port")
+    parser.add_argument("--base",           default=0x0, type=lambda x: int(x, 0), help="base address (in bytes)")
+    parser.add_argument("--length",         default=16*1024*1024, type=lambda x: int(x, 0), help="length (in bytes)")
+    parser.add_argument("--random",         action="store_true", help="random data/addresses")
+    parser.add_argument("--latency-count",  default=256, type=int, help="number of reads of the latency test")
+    parser.add_argument("--latency-stride", default=1, type=int, help="address stride (in port words) of the latency test")
+    parser.add_argument("--output",         default=None, help="save the results to a JSON file")
+    args = parser.parse_args()
+
+    from litex import RemoteClient
+    wb = RemoteClient(csr_csv=args.csr_csv, port=args.port)
+    wb.open()
+    try:
+        results = run_benchmark(wb, args.base, args.length, args.random,
+            args.latency_count, args.latency_stride)
+    finally:
+        wb.close()
+    print_results(results)
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+
+if __name__ == "__main__":
+    main()
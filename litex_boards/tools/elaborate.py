@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+
+# License: BSD
+
+"""Parallel elaboration of the simple target on a list of platforms.
+
+Each platform is elaborated (Verilog generation only, no software/gateware compilation) in its own
+output directory, so elaborations are independent and can be run concurrently from a process pool.
+
+Two modes are available:
+- subprocess: each platform is elaborated by running simple.py in a new interpreter (as a user
+  would do from the command line).
+- in-process: simple.BaseSoC is imported once and each platform is elaborated in the worker
+  process, avoiding the interpreter startup and migen/litex imports for each platform.
+"""
+
+import io
+import os
+import sys
+import time
+import importlib
+import traceback
+import contextlib
+import shutil
+import argparse
+import tempfile
+import multiprocessing
+import subprocess
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import litex_boards
+
+# Helpers ------------------------------------------------------------------------------------------
+
+root_dir   = os.path.dirname(os.path.dirname(os.path.abspath(litex_boards.__file__)))
+simple_py  = os.path.join(root_dir, "litex_boards", "targets", "simple.py")
+
+ElaborationResult = namedtuple("ElaborationResult", "platform success duration output_dir log")
+
+def default_jobs():
+    return int(os.getenv("LITEX_BOARDS_JOBS", os.cpu_count() or 1))
+
+# Subprocess Elaboration ---------------------------------------------------------------------------
+
+def elaborate_subprocess(platform, output_dir, extra_args=()):
+    """Elaborate simple.py for `platform` in a new interpreter, with its own output directory."""
+    cmd = [sys.executable, simple_py, "litex_boards.platforms." + platform,
+        "--output-dir", output_dir,
+        "--no-compile-software",
+        "--no-compile-gateware",
+        "--uart-name=stub",
+    ] + list(extra_args)
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in [root_dir, env.get("PYTHONPATH")] if p)
+    start = time.time()
+    p = subprocess.run(cmd, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    duration = time.time() - start
+    success  = (p.returncode == 0) and os.path.isfile(os.path.join(output_dir, "gateware", "top.v"))
+    return ElaborationResult(platform, success, duration, output_dir, p.stdout.decode(errors="replace"))
+
+# In-Process Elaboration ---------------------------------------------------------------------------
+
+def elaborate_inprocess(platform, output_dir, with_ethernet=False, **kwargs):
+    """Elaborate simple.BaseSoC for `platform` in the current process."""
+    from litex.soc.integration.builder import Builder
+    from litex_boards.targets.simple import BaseSoC
+    kwargs.setdefault("uart_name", "stub")
+    log   = io.StringIO()
+    start = time.time()
+    try:
+        with contextlib.redirect_stdout(log):
+            platform_module = importlib.import_module("litex_boards.platforms." + platform)
+            soc     = BaseSoC(platform_module.Platform(), with_ethernet=with_ethernet, **kwargs)
+            builder = Builder(soc, output_dir=output_dir,
+                compile_software = False,
+                compile_gateware = False)
+            builder.build()
+        success = os.path.isfile(os.path.join(output_dir, "gateware", "top.v"))
+    except Exception:
+        log.write(traceback.format_exc())
+        success = False
+    duration = time.time() - start
+    return ElaborationResult(platform, success, duration, output_dir, log.getvalue())
+
+# Runner -------------------------------------------------------------------------------------------
+
+def run(platforms, jobs=None, output_dir=None, keep=False, inprocess=False, **kwargs):
+    """Elaborate `platforms` concurrently with up to `jobs` workers.
+
+    Each platform is built in `<output_dir>/<platform>`. When no `output_dir` is given, a temporary
+    directory is used and removed at the end unless `keep` is set. With `inprocess`, platforms are
+    elaborated in the current process (jobs=1) or in a process pool: with the fork start method,
+    workers inherit the imports done here; with spawn/forkserver, each worker imports them once.
+    Returns a list of ElaborationResult in the order of `platforms`.
+    """
+    jobs       = jobs or default_jobs()
+    elaborate  = elaborate_inprocess if inprocess else elaborate_subprocess
+    tmp_dir    = None
+    if output_dir is None:
+        output_dir = tmp_dir = tempfile.mkdtemp(prefix="litex_boards_")
+    try:
+        if inprocess:
+            if jobs == 1:
+                return [elaborate(name, os.path.join(output_dir, name), **kwargs)
+                    for name in platforms]
+            if multiprocessing.get_start_method() == "fork":
+                # Preload SoC/Builder modules before the fork: workers inherit them (not used here).
+                import litex.soc.integration.builder  # noqa: F401
+                import litex_boards.targets.simple    # noqa: F401
+            # Otherwise (spawn/forkserver), workers start from a fresh interpreter and nothing can
+            # be shared: each worker imports the modules on its first elaboration.
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [executor.submit(elaborate, name, os.path.join(output_dir, name), **kwargs)
+                for name in platforms]
+            return [f.result() for f in futures]
+    finally:
+        if tmp_dir is not None and not keep:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+def print_results(results, file=sys.stdout):
+    for r in results:
+        print("{:24s} {:4s} {:8.2f}s".format(r.platform, "ok" if r.success else "FAIL", r.duration),
+            file=file)
+    errors = sum(not r.success for r in results)
+    print("{} platform(s), {} error(s), {:.2f}s total elaboration time".format(
+        len(results), errors, sum(r.duration for r in results)), file=file)
+
+# Main ---------------------------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel elaboration of LiteX boards platforms")
+    parser.add_argument("platforms", nargs="+", help="platform module names (ex: arty kc705)")
+    parser.add_argument("--jobs", "-j", default=None, type=int,
+        help="number of concurrent elaborations (default=LITEX_BOARDS_JOBS or CPU count)")
+    parser.add_argument("--output-dir", default=None,
+        help="base output directory (default=temporary directory)")
+    parser.add_argument("--inprocess", action="store_true",
+        help="elaborate in worker processes instead of running simple.py for each platform")
+    parser.add_argument("--with-ethernet", action="store_true", help="enable Ethernet support")
+    parser.add_argument("--verbose", action="store_true", help="print logs of failed elaborations")
+    args = parser.parse_args()
+
+    if args.inprocess:
+        kwargs = {"with_ethernet": args.with_ethernet}
+    else:
+        kwargs = {"extra_args": ["--with-ethernet"] if args.with_ethernet else []}
+    results = run(args.platforms, jobs=args.jobs, output_dir=args.output_dir,
+        keep      = args.output_dir is not None,
+        inprocess = args.inprocess,
+        **kwargs)
+    if args.verbose:
+        for r in results:
+            if not r.success:
+                print("-"*80 + "\n" + r.platform + "\n" + "-"*80 + "\n" + r.log)
+    print_results(results)
+    sys.exit(any(not r.success for r in results))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# License: BSD
+
+"""Fast configuration boot profile for the Xilinx 7-series platforms.
+
+At power-up, 7-series FPGAs load the bitstream from the SPI flash with the default x1 bus width and
+3MHz configuration clock. The fast boot profile of a board configures the bitstream for:
+- x4 SPI (BITSTREAM.CONFIG.SPI_BUSWIDTH 4),
+- the highest configuration rate safe for the flash part of the board: the internal configuration
+  clock has a +/-50% tolerance, so CONFIGRATE*1.5 stays below the max (Quad Output) fast read
+  frequency of the flash,
+- compressed bitstream,
+- 32-bit addressing for flashes larger than 16MB,
+and generates the matching flash image (<build_name>.bin) with write_cfgmem.
+
+Targets enable it with --fast-boot:
+
+    fast_boot_args(parser)
+    ...
+    fast_boot_apply(soc.platform, args)
+"""
+
+# Profiles -----------------------------------------------------------------------------------------
+
+fast_boot_profiles = {
+    #  Board           Flash part                       Size(MB) ConfigRate(MHz)
+    "ac701"       : ("n25q256-3.3v-spi-x1_x2_x4",     32,      50),
+    "aller"       : ("n25q128-3.3v-spi-x1_x2_x4",     16,      50),
+    "arty"        : ("n25q128-3.3v-spi-x1_x2_x4",     16,      50),
+    "arty_s7"     : ("s25fl128sxxxxxx0-spi-x1_x2_x4", 16,      33),
+    "genesys2"    : ("s25fl256sxxxxxx0-spi-x1_x2_x4", 32,      33),
+    "kc705"       : ("n25q128-3.3v-spi-x1_x2_x4",     16,      50),
+    "mimas_a7"    : ("n25q128-3.3v-spi-x1_x2_x4",     16,      50),
+    "nereid"      : ("n25q128-3.3v-spi-x1_x2_x4",     16,      50),
+    "netv2"       : ("s25fl128sxxxxxx0-spi-x1_x2_x4", 16,      33),
+    "nexys4ddr"   : ("s25fl128sxxxxxx0-spi-x1_x2_x4", 16,      33),
+    "nexys_video" : ("s25fl256sxxxxxx0-spi-x1_x2_x4", 32,      33),
+    "tagus"       : ("n25q128-3.3v-spi-x1_x2_x4",     16,      50),
+}
+
+# Properties set by the profile (replacing the ones set by the platform).
+_properties = ["SPI_BUSWIDTH", "CONFIGRATE", "GENERAL.COMPRESS", "SPI_32BIT_ADDR", "SPI_FALL_EDGE"]
+
+def fast_boot_profile(board):
+    if board not in fast_boot_profiles:
+        raise ValueError("No fast boot profile for {}, available: {}".format(
+            board, ", ".join(sorted(fast_boot_profiles))))
+    flash_part, size, configrate = fast_boot_profiles[board]
+    return {"flash_part": flash_part, "size": size, "configrate": configrate}
+
+def fast_boot_commands(board):
+    """Return the (bitstream commands, write_cfgmem command) of the fast boot profile of `board`."""
+    profile  = fast_boot_profile(board)
+    commands = [
+        "set_property BITSTREAM.CONFIG.SPI_BUSWIDTH 4 [current_design]",
+        "set_property BITSTREAM.CONFIG.CONFIGRATE {} [current_design]".format(profile["configrate"]),
+        "set_property BITSTREAM.GENERAL.COMPRESS TRUE [current_design]",
+    ]
+    if profile["configrate"] > 33:
+        # Sample on the falling edge of CCLK for more read timing margin at high rates.
+        commands.append("set_property BITSTREAM.CONFIG.SPI_FALL_EDGE YES [current_design]")
+    if profile["size"] > 16:
+        commands.append("set_property BITSTREAM.CONFIG.SPI_32BIT_ADDR YES [current_design]")
+    cfgmem = ("write_cfgmem -force -format bin -interface spix4 -size {} "
+        "-loadbit \"up 0x0 {{build_name}}.bit\" -file {{build_name}}.bin".format(profile["size"]))
+    return commands, cfgmem
+
+def fast_boot_apply(platform, args=None):
+    """Apply the fast boot profile to `platform` (when --fast-boot is given)."""
+    if args is not None and not getattr(args, "fast_boot", False):
+        return
+    board = type(platform).__module__.split(".")[-1]
+    commands, cfgmem = fast_boot_commands(board)
+    toolchain = platform.toolchain
+    toolchain.bitstream_commands = [c for c in toolchain.bitstream_commands
+        if not any("." + p + " " in c for p in _properties)] + commands
+    toolchain.additional_commands = [c for c in toolchain.additional_commands
+        if not c.startswith("write_cfgmem")] + [cfgmem]
+
+# Target Arguments ---------------------------------------------------------------------------------
+
+def fast_boot_args(parser):
+    parser.add_argument("--fast-boot", action="store_true",
+        help="enable fast configuration boot (x4 SPI, high configuration rate, compressed bitstream)")
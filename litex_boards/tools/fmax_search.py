@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+
+# License: BSD
+
+"""Search of the highest sys_clk_freq closing timing for the ECP5 targets.
+
+The [min, max] frequency range is searched with trial builds run in parallel: each step builds
+`jobs` frequencies evenly spaced in the remaining range and narrows it to the interval between the
+highest passing and the lowest failing frequency, until it is smaller than the resolution. Trials
+are built with --nextpnr-timingstrict (the ECP5 targets otherwise build with --timing-allow-fail) and
+pass when the build succeeds and the sys clock Fmax reported by nextpnr reaches the frequency.
+
+Synthesized netlists are not reused across steps: sys_clk_freq changes the PLL configuration and the
+SDRAM controller timings, so each frequency needs its own synthesis.
+
+The winning frequency is recorded per target and configuration (target arguments) and is used by
+the target for this configuration with --sys-clk-freq=recorded:
+
+    ./fmax_search.py ulx3s --min 40e6 --max 100e6 --jobs 4 -- --sdram-module=AS4C32M16
+    ./ulx3s.py --sdram-module=AS4C32M16 --sys-clk-freq=recorded # Builds at the recorded frequency.
+"""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from litex_boards.tools.elaborate import root_dir
+from litex_boards.tools.benchmark import targets_dir
+from litex_boards.tools.nextpnr_sweep import parse_fmax
+
+# Records ------------------------------------------------------------------------------------------
+
+records_file = os.path.join(os.path.expanduser("~"), ".cache", "litex_boards", "sys_clk_freq.json")
+
+# Arguments not affecting the configuration (build/output options).
+_ignored_args = [
+    "--sys-clk-freq",
+    "--output-dir",
+    "--gateware-dir",
+    "--software-dir",
+    "--include-dir",
+    "--generated-dir",
+    "--no-compile",
+    "--csr-csv",
+    "--csr-json",
+    "--csr-svd",
+    "--memory-x",
+    "--doc",
+    "--load",
+    "--flash",
+    "--gateware-cache",
+    "--seed-sweep",
+    "--build-profile",
+    "--reports",
+    "--nextpnr-timingstrict",
+]
+
+def config_key(target, argv):
+    """Return the record key of `target` built with command line arguments `argv`."""
+    config = []
+    for arg in argv:
+        # Normalize "--option value" to "--option=value".
+        if config and not arg.startswith("-") and config[-1].startswith("--") and "=" not in config[-1]:
+            config[-1] += "=" + arg
+        else:
+            config.append(arg)
+    config = [a for a in config if not any(a.split("=")[0].startswith(i) for i in _ignored_args)]
+    return " ".join([target] + sorted(config))
+
+def load_records(filename=records_file):
+    try:
+        with open(filename) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def record_sys_clk_freq(target, argv, sys_clk_freq, filename=records_file):
+    records = load_records(filename)
+    records[config_key(target, argv)] = sys_clk_freq
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    with open(filename, "w") as f:
+        json.dump(records, f, indent=4, sort_keys=True)
+
+def resolve_sys_clk_freq(target, value, default, argv=None, filename=records_file):
+    """Return the sys_clk_freq given by --sys-clk-freq `value` of `target`: a frequency, or
+    "recorded" for the frequency recorded for `argv` (default: sys.argv), `default` if none."""
+    if value != "recorded":
+        return int(float(value))
+    argv = sys.argv[1:] if argv is None else argv
+    sys_clk_freq = load_records(filename).get(config_key(target, argv))
+    if sys_clk_freq is None:
+        print("No sys_clk_freq recorded for {}, using {:.2f}MHz.".format(
+            config_key(target, argv), default/1e6))
+        return int(default)
+    print("Using recorded sys_clk_freq: {:.2f}MHz (from {}).".format(sys_clk_freq/1e6, filename))
+    return int(sys_clk_freq)
+
+# Trial Build --------------------------------------------------------------------------------------
+
+def trial(target, sys_clk_freq, argv, output_dir):
+    """Build `target` at `sys_clk_freq`, return (passed, sys clock Fmax in MHz or None)."""
+    build_dir = os.path.join(output_dir, "{}_{:.0f}".format(target, sys_clk_freq))
+    cmd = [sys.executable, os.path.join(targets_dir, target + ".py"),
+        "--sys-clk-freq", str(sys_clk_freq),
+        "--output-dir", build_dir,
+        "--nextpnr-timingstrict",
+    ] + [a for a in argv if a != "--nextpnr-timingstrict"]
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in [root_dir, env.get("PYTHONPATH")] if p)
+    os.makedirs(build_dir, exist_ok=True)
+    with open(os.path.join(build_dir, "build.log"), "w") as f:
+        p = subprocess.run(cmd, env=env, stdout=f, stderr=subprocess.STDOUT)
+    with open(os.path.join(build_dir, "build.log"), errors="replace") as f:
+        fmax = parse_fmax(f.read())
+    sys_fmax = [achieved for clock, (achieved, _) in fmax.items() if "sys" in clock and "ps" not in clock]
+    sys_fmax = min(sys_fmax) if sys_fmax else None
+    passed   = (p.returncode == 0) and (sys_fmax is not None) and (sys_fmax >= sys_clk_freq/1e6)
+    return passed, sys_fmax
+
+# Search -------------------------------------------------------------------------------------------
+
+def search(target, min_freq, max_freq, argv=[], jobs=None, resolution=1e6, output_dir="fmax_search"):
+    """Return the highest frequency in [min_freq, max_freq] (with `resolution`) closing timing, or
+    None if none does."""
+    jobs    = jobs or os.cpu_count() or 1
+    n       = int((max_freq - min_freq)//resolution)
+    freq    = lambda k: min_freq + k*resolution
+    lo, hi  = -1, n + 1 # Highest passing / lowest failing grid points (-1/n+1: unknown).
+    results = {}
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        while hi - lo > 1:
+            points = sorted(set(lo + max(1, round((hi - lo)*i/(jobs + 1))) for i in range(1, jobs + 1)))
+            points = [k for k in points if lo < k < hi]
+            for k, (passed, fmax) in zip(points, executor.map(
+                lambda k: trial(target, freq(k), argv, output_dir), points)):
+                results[k] = passed
+                print("{:8.2f}MHz: {}{}".format(freq(k)/1e6, "PASS" if passed else "FAIL",
+                    " (sys Fmax {:.2f}MHz)".format(fmax) if fmax is not None else ""))
+            lo = max([k for k, passed in results.items() if passed], default=-1)
+            hi = min([k for k, passed in results.items() if not passed and k > lo], default=n + 1)
+    return freq(lo) if lo >= 0 else None
+
+# Main ---------------------------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Search the highest sys_clk_freq closing timing",
+        epilog="Target arguments are passed after --.")
+    parser.add_argument("target",         help="target name (ex: ulx3s)")
+    parser.add_argument("--min",          default=25e6, type=float, help="minimum frequency (default=25MHz)")
+    parser.add_argument("--max",          default=150e6, type=float, help="maximum frequency (default=150MHz)")
+    parser.add_argument("--resolution",   default=1e6, type=float, help="search resolution (default=1MHz)")
+    parser.add_argument("--jobs",         default=None, type=int, help="concurrent trial builds (default=CPU count)")
+    parser.add_argument("--output-dir",   default="fmax_search", help="trial builds directory")
+    parser.add_argument("--no-record",    action="store_true", help="do not record the winning frequency")
+    parser.add_argument("target_args",    nargs=argparse.REMAINDER, help="target arguments")
+    args = parser.parse_args()
+
+    target_args = [a for a in args.target_args if a != "--"]
+    sys_clk_freq = search(args.target, args.min, args.max, target_args,
+        jobs       = args.jobs,
+        resolution = args.resolution,
+        output_dir = args.output_dir)
+    if sys_clk_freq is None:
+        print("No frequency closing timing in [{:.2f}, {:.2f}]MHz.".format(args.min/1e6, args.max/1e6))
+        sys.exit(1)
+    print("{}: highest sys_clk_freq closing timing: {:.2f}MHz".format(
+        config_key(args.target, target_args), sys_clk_freq/1e6))
+    if not args.no_record:
+        record_sys_clk_freq(args.target, target_args, sys_clk_freq)
+
+if __name__ == "__main__":
+    main()
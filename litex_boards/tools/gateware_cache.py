@@ -0,0 +1,246 @@
+# License: BSD
+
+"""Content-addressed cache of generated gateware/software for targets.
+
+The cache key is a hash of:
+- the target and platform modules sources and the litex_boards modules they (transitively) import
+  (litex_boards.tools gateware: L2 cache sizing, DRAM benchmark, MSI moderation, ...),
+- the elaborated SoC (clock frequency, CPU, bus regions, CSRs, interrupts and constants), covering
+  values resolved outside of the target arguments,
+- the target arguments affecting the gateware/software (not the output locations or the loading/
+  flashing options), the requested exports and the Builder.build() arguments,
+- the installed Migen/LiteX/LiteDRAM/LiteEth/LitePCIe versions (package version and sources).
+
+On a hit, Builder.build() is skipped and the gateware/software directories (and CSR exports) are
+restored from the cache (the Migen namespace of the build is then not available: the cached build
+returns None in both cases). The cache is bounded in size with LRU eviction.
+
+Targets use it like the toolchains arguments:
+
+    builder_args(parser)
+    gateware_cache_args(parser)
+    ...
+    builder = Builder(soc, **builder_argdict(args))
+    gateware_cache_build(builder, args, **vivado_build_argdict(args))
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import ast
+import inspect
+import tempfile
+import importlib
+import importlib.util
+
+# Helpers ------------------------------------------------------------------------------------------
+
+packages = ["migen", "litex", "litedram", "liteeth", "litepcie"]
+
+default_cache_dir  = os.path.join(os.path.expanduser("~"), ".cache", "litex_boards", "gateware")
+default_cache_size = 10*1024**3
+
+# Target arguments not affecting the generated gateware/software.
+ignored_args = [
+    # Outputs locations (the requested CSR exports are part of the key).
+    "output_dir", "gateware_dir", "software_dir", "include_dir", "generated_dir",
+    "csr_csv", "csr_json", "csr_svd", "memory_x", "doc",
+    # Loading/Flashing.
+    "load", "load_serial", "load_all", "flash", "flash_full", "trust_manifest",
+    # Build tools.
+    "gateware_cache", "gateware_cache_dir", "gateware_cache_size", "build_profile", "reports",
+]
+
+def _hash_file(h, filename):
+    with open(filename, "rb") as f:
+        h.update(f.read())
+
+def _hash_package(h, name):
+    try:
+        module = importlib.import_module(name)
+    except ImportError:
+        h.update("{}:none".format(name).encode())
+        return
+    h.update("{}:{}".format(name, getattr(module, "__version__", "")).encode())
+    # Also hash the sources: development installs of LiteX cores do not bump the version.
+    for path in getattr(module, "__path__", [os.path.dirname(module.__file__)]):
+        for root, dirs, files in sorted(os.walk(path)):
+            dirs.sort()
+            for f in sorted(files):
+                if f.endswith((".py", ".v", ".vhd", ".sv", ".c", ".h", ".S", ".ld", ".mak")):
+                    h.update(os.path.relpath(os.path.join(root, f), path).encode())
+                    _hash_file(h, os.path.join(root, f))
+
+def _litex_boards_modules(filename, modules=None):
+    """Return {name: filename} of the litex_boards modules imported (transitively) by `filename`."""
+    modules = {} if modules is None else modules
+    with open(filename, "rb") as f:
+        tree = ast.parse(f.read(), filename)
+    names = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            names += [node.module] + [node.module + "." + alias.name for alias in node.names]
+    for name in names:
+        if not name.startswith("litex_boards.") or name in modules:
+            continue
+        try:
+            spec = importlib.util.find_spec(name)
+        except (ImportError, AttributeError, ValueError):
+            spec = None # Not a module (name imported from a module).
+        if spec is None or not spec.origin or not spec.origin.endswith(".py"):
+            continue
+        modules[name] = spec.origin
+        _litex_boards_modules(spec.origin, modules)
+    return modules
+
+def _soc_description(soc):
+    """Return the description of the elaborated `soc` hashed in the key."""
+    return {
+        "clk_freq"  : soc.clk_freq,
+        "cpu"       : [getattr(soc, "cpu_type", None), getattr(soc, "cpu_variant", None)],
+        "regions"   : {name: [region.origin, region.size] for name, region in soc.bus.regions.items()},
+        "csrs"      : soc.csr.locs,
+        "irqs"      : soc.irq.locs,
+        "constants" : {name: getattr(c, "value", c) for name, c in soc.constants.items()},
+    }
+
+def _dir_size(path):
+    size = 0
+    for root, dirs, files in os.walk(path):
+        for f in files:
+            size += os.path.getsize(os.path.join(root, f))
+    return size
+
+# Gateware Cache -----------------------------------------------------------------------------------
+
+class GatewareCache:
+    """Content-addressed cache of Builder outputs with a size bound and LRU eviction."""
+    def __init__(self, path=None, max_size=None):
+        self.path     = path or os.getenv("LITEX_BOARDS_CACHE_DIR", default_cache_dir)
+        self.max_size = max_size or int(os.getenv("LITEX_BOARDS_CACHE_SIZE", default_cache_size))
+        os.makedirs(self.path, exist_ok=True)
+
+    def key(self, builder, target_args={}, **kwargs):
+        h = hashlib.sha256()
+        # Target/Platform sources.
+        for obj in [type(builder.soc), type(builder.soc.platform)]:
+            h.update(obj.__name__.encode())
+            _hash_file(h, inspect.getfile(obj))
+        # litex_boards modules imported by the target (gateware from litex_boards.tools).
+        modules = _litex_boards_modules(inspect.getfile(type(builder.soc)))
+        for name in sorted(modules):
+            h.update(name.encode())
+            _hash_file(h, modules[name])
+        # Elaborated SoC.
+        h.update(json.dumps(_soc_description(builder.soc), sort_keys=True, default=str).encode())
+        # Target/Build arguments and requested outputs.
+        target_args = {k: v for k, v in target_args.items() if k not in ignored_args}
+        h.update(json.dumps(target_args, sort_keys=True, default=str).encode())
+        h.update(json.dumps(sorted(self._outputs(builder))).encode())
+        h.update(json.dumps([builder.compile_software, builder.compile_gateware]).encode())
+        h.update(json.dumps(kwargs,      sort_keys=True, default=str).encode())
+        # Installed packages.
+        for name in packages:
+            _hash_package(h, name)
+        return h.hexdigest()
+
+    def _outputs(self, builder):
+        outputs = {
+            "gateware": builder.gateware_dir,
+            "software": builder.software_dir,
+        }
+        for name in ["csr_csv", "csr_json", "csr_svd", "memory_x"]:
+            filename = getattr(builder, name, None)
+            if filename is not None:
+                outputs[name] = filename
+        return outputs
+
+    def lookup(self, key):
+        entry = os.path.join(self.path, key)
+        if not os.path.isfile(os.path.join(entry, "manifest.json")):
+            return None
+        os.utime(entry) # LRU: Mark entry as recently used.
+        return entry
+
+    def restore(self, entry, builder):
+        with open(os.path.join(entry, "manifest.json")) as f:
+            manifest = json.load(f)
+        for name, dst in self._outputs(builder).items():
+            if name not in manifest:
+                continue
+            src = os.path.join(entry, name)
+            if os.path.isdir(src):
+                shutil.rmtree(dst, ignore_errors=True)
+                shutil.copytree(src, dst, symlinks=True)
+            else:
+                os.makedirs(os.path.dirname(os.path.abspath(dst)), exist_ok=True)
+                shutil.copy2(src, dst)
+
+    def store(self, key, builder):
+        entry    = os.path.join(self.path, key)
+        tmp      = tempfile.mkdtemp(dir=self.path, prefix=".tmp_")
+        manifest = {"time": time.time()}
+        for name, src in self._outputs(builder).items():
+            dst = os.path.join(tmp, name)
+            if os.path.isdir(src):
+                shutil.copytree(src, dst, symlinks=True)
+            elif os.path.isfile(src):
+                shutil.copy2(src, dst)
+            else:
+                continue
+            manifest[name] = src
+        with open(os.path.join(tmp, "manifest.json"), "w") as f:
+            json.dump(manifest, f, indent=4)
+        try:
+            os.rename(tmp, entry)
+        except OSError: # Already stored by a concurrent build.
+            shutil.rmtree(tmp, ignore_errors=True)
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for name in os.listdir(self.path):
+            entry = os.path.join(self.path, name)
+            if name.startswith(".") or not os.path.isdir(entry):
+                continue
+            entries.append((os.path.getmtime(entry), _dir_size(entry), entry))
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= self.max_size:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+    def build(self, builder, target_args={}, **kwargs):
+        """Build with `builder` (Builder.build() `kwargs`) or restore its outputs from the cache."""
+        key   = self.key(builder, target_args, **kwargs)
+        entry = self.lookup(key)
+        if entry is not None:
+            print("Gateware cache hit ({}), restoring from {}.".format(key[:16], entry))
+            self.restore(entry, builder)
+            return
+        builder.build(**kwargs)
+        self.store(key, builder)
+
+# Target Arguments ---------------------------------------------------------------------------------
+
+def gateware_cache_args(parser):
+    parser.add_argument("--gateware-cache", action="store_true",
+        help="reuse gateware/software from the cache when inputs are unchanged")
+    parser.add_argument("--gateware-cache-dir", default=None,
+        help="gateware cache directory (default=LITEX_BOARDS_CACHE_DIR or ~/.cache/litex_boards)")
+    parser.add_argument("--gateware-cache-size", default=None, type=int,
+        help="gateware cache size limit in bytes (default=LITEX_BOARDS_CACHE_SIZE or 10GiB)")
+
+def gateware_cache_build(builder, args, **kwargs):
+    """Build with `builder`, through the gateware cache with --gateware-cache. Returns None (the
+    namespace of the build is not available on a cache hit)."""
+    if not getattr(args, "gateware_cache", False):
+        builder.build(**kwargs)
+        return
+    cache = GatewareCache(args.gateware_cache_dir, args.gateware_cache_size)
+    cache.build(builder, vars(args), **kwargs)
@@ -0,0 +1,111 @@
+# License: BSD
+
+"""BRAM-aware L2 cache sizing for the SDRAM targets.
+
+Instead of a fixed 8KiB L2 cache, the L2 cache is sized from the block RAM of the device: the
+largest power of two below `l2_bram_share` of the device BRAM, between 8KiB (the previous default)
+and 256KiB. The L2 cache size can still be forced with --l2-size and the BRAM used by the L2 cache
+can be capped with --l2-bram-percent:
+
+    l2_cache_args(parser)
+    ...
+    soc = BaseSoC(**soc_sdram_argdict(args), **l2_cache_argdict(args))
+    ...
+    self.add_sdram("sdram",
+        ...
+        l2_cache_size           = l2_cache_size(self.platform, **kwargs),
+        l2_cache_min_data_width = l2_cache_min_data_width(self.platform, **kwargs),
+        ...
+    )
+"""
+
+# Device BRAM --------------------------------------------------------------------------------------
+
+# Block RAM of the devices (in Kbits), by device prefix.
+device_bram = {
+    # Xilinx Spartan6 (18Kb blocks).
+    "xc6slx9"    : 32*18,
+    "xc6slx16"   : 32*18,
+    "xc6slx25"   : 52*18,
+    "xc6slx45"   : 116*18,
+    # Xilinx 7-Series (36Kb blocks).
+    "xc7a35t"    : 50*36,
+    "xc7a50t"    : 75*36,
+    "xc7a100t"   : 135*36,
+    "xc7a200t"   : 365*36,
+    "xc7s25"     : 45*36,
+    "xc7s50"     : 75*36,
+    "xc7k160t"   : 325*36,
+    "xc7k325t"   : 445*36,
+    "xc7vx485t"  : 1030*36,
+    # Xilinx Ultrascale(+) (36Kb blocks, URAM not included).
+    "xcku040"    : 600*36,
+    "xcvu9p"     : 2160*36,
+    "xczu2eg"    : 150*36,
+    "xczu7ev"    : 312*36,
+    # Lattice ECP5 (18Kb EBR).
+    "lfe5u-12f"  : 32*18,
+    "lfe5u-25f"  : 56*18,
+    "lfe5u-45f"  : 108*18,
+    "lfe5u-85f"  : 208*18,
+    # Intel Cyclone IV/10LP/MAX10 (9Kb M9K), Cyclone V (10Kb M10K).
+    "ep4ce22"    : 66*9,
+    "ep4ce115"   : 432*9,
+    "10cl055"    : 260*9,
+    "10m50"      : 182*9,
+    "5csema5"    : 397*10,
+    "5cseba6"    : 553*10,
+}
+
+l2_bram_share = 0.10
+
+l2_size_default = 8192
+l2_size_min     = 8192
+l2_size_max     = 256*1024
+
+def _pow2_floor(n):
+    return 2**(int(n).bit_length() - 1) if n >= 1 else 0
+
+def bram_bytes(device):
+    """Return the block RAM (in bytes) of `device`, None if unknown."""
+    device = device.strip().lower()
+    for prefix in ["lfe5um5g-", "lfe5um-"]:
+        device = device.replace(prefix, "lfe5u-")
+    for prefix in sorted(device_bram, key=len, reverse=True):
+        if device.startswith(prefix):
+            return device_bram[prefix]*1024//8
+    return None
+
+# L2 Cache Sizing ----------------------------------------------------------------------------------
+
+def l2_cache_size(platform, l2_size=None, l2_bram_percent=None, **kwargs):
+    """Return the L2 cache size (in bytes) for `platform`: `l2_size` when forced, else sized from
+    the device BRAM (and capped to `l2_bram_percent` of the device BRAM, but not below 8KiB)."""
+    if l2_size is not None:
+        return l2_size
+    bram = bram_bytes(platform.device)
+    if bram is None:
+        return l2_size_default
+    size = _pow2_floor(bram*l2_bram_share)
+    if l2_bram_percent is not None:
+        size = min(size, _pow2_floor(bram*l2_bram_percent/100))
+    return min(max(size, l2_size_min), l2_size_max)
+
+def l2_cache_min_data_width(platform, min_l2_data_width=None, **kwargs):
+    """Return the L2 cache minimal data width for `platform`: 256-bit (longer lines, more prefetch
+    on sequential accesses) for L2 caches of 64KiB and more, 128-bit otherwise."""
+    if min_l2_data_width is not None:
+        return min_l2_data_width
+    return 256 if l2_cache_size(platform, **kwargs) >= 64*1024 else 128
+
+# Target Arguments ---------------------------------------------------------------------------------
+
+def l2_cache_args(parser):
+    # Size the L2 cache (and its minimal data width) from the device BRAM unless --l2-size
+    # (--min-l2-data-width) is given.
+    parser.set_defaults(l2_size=None, min_l2_data_width=None)
+    parser.add_argument("--l2-bram-percent", default=None, type=float,
+        help="max percentage of the device BRAM used by the L2 cache")
+
+def l2_cache_argdict(args):
+    return {"l2_bram_percent": args.l2_bram_percent}
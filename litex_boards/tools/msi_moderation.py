@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+
+# License: BSD
+
+"""MSI interrupt moderation for the PCIe DMAs.
+
+Each DMA reader/writer IRQ (one pulse per completed descriptor) goes through a moderator that only
+forwards an interrupt to LitePCIeMSI once `count` descriptors have completed, or `timeout` cycles
+after the first pending descriptor (bounding the interrupt latency at low descriptor rates). The
+host driver handles all the completed descriptors on each interrupt (from the DMA loop status), so
+coalescing descriptors does not lose events.
+
+Both parameters are runtime tunable through CSRs (pcie_msi_moderation_<dma>_<reader/writer>_count
+and _timeout), the defaults (count=1, timeout=0: disabled) forwarding each descriptor interrupt.
+
+Running this file simulates the moderator with different traffic and parameters and reports the
+interrupt rate and latency:
+
+    ./msi_moderation.py
+"""
+
+from migen import *
+
+from litex.soc.interconnect.csr import *
+
+# MSI Moderator ------------------------------------------------------------------------------------
+
+class MSIModerator(Module, AutoCSR):
+    def __init__(self, irq, with_csr=True):
+        self.count   = Signal(16, reset=1)
+        self.timeout = Signal(32)
+        self.irq     = Signal()
+
+        # # #
+
+        pending      = Signal(16)
+        pending_next = Signal(17)
+        timer        = Signal(32)
+        fire         = Signal()
+
+        self.comb += [
+            pending_next.eq(pending + irq),
+            fire.eq((pending_next != 0) & (
+                (pending_next >= self.count) |
+                ((pending != 0) & (self.timeout != 0) & (timer >= (self.timeout - 1))))),
+            self.irq.eq(fire),
+        ]
+        self.sync += [
+            If(fire,
+                pending.eq(0),
+                timer.eq(0)
+            ).Else(
+                pending.eq(pending_next),
+                If(pending_next != 0,
+                    timer.eq(timer + 1)
+                )
+            )
+        ]
+
+        if with_csr:
+            self.add_csr()
+
+    def add_csr(self):
+        self._count   = CSRStorage(16, reset=1, description="Interrupt after ``count`` descriptors.")
+        self._timeout = CSRStorage(32, description="Interrupt ``timeout`` cycles after the first " +
+            "pending descriptor (0: disabled).")
+        self.comb += [
+            self.count.eq(self._count.storage),
+            self.timeout.eq(self._timeout.storage),
+        ]
+
+class MSIModeration(Module, AutoCSR):
+    """Moderate the `irqs` ({name: irq}), the moderated IRQs being provided in `self.irqs`."""
+    def __init__(self, irqs):
+        self.irqs = {}
+        for name, irq in irqs.items():
+            moderator = MSIModerator(irq)
+            setattr(self.submodules, name.lower().replace("pcie_", ""), moderator)
+            self.irqs[name] = moderator.irq
+
+# Simulation ---------------------------------------------------------------------------------------
+
+def simulate(events, count=1, timeout=0, cycles=None):
+    """Simulate the moderator with descriptors completing at `events` (cycles), return the
+    interrupt cycles and the latency of each descriptor (cycles until its interrupt)."""
+    irq    = Signal()
+    dut    = MSIModerator(irq, with_csr=False)
+    events = sorted(events)
+    cycles = cycles or (events[-1] + timeout + 16)
+    fired  = []
+
+    def generator():
+        yield dut.count.eq(count)
+        yield dut.timeout.eq(timeout)
+        yield
+        _events = set(events)
+        for cycle in range(cycles):
+            yield irq.eq(int(cycle in _events))
+            yield
+            if (yield dut.irq):
+                fired.append(cycle)
+
+    run_simulation(dut, generator())
+
+    latencies = []
+    for event in events:
+        after = [f for f in fired if f >= event]
+        latencies.append(after[0] - event if after else None)
+    return fired, latencies
+
+def traffic(pattern, n):
+    """Descriptor completion cycles: periodic (every 8 cycles), bursty (bursts of 32 descriptors
+    every 4096 cycles) or sparse (every 10000 cycles)."""
+    if pattern == "periodic":
+        return [8*i for i in range(n)]
+    if pattern == "bursty":
+        return [4096*(i//32) + 8*(i%32) for i in range(n)]
+    if pattern == "sparse":
+        return [10000*i for i in range(n)]
+    raise ValueError(pattern)
+
+# Main ---------------------------------------------------------------------------------------------
+
+def main():
+    n = 512
+    print("{:<10} {:>6} {:>8} {:>11} {:>12} {:>12}".format(
+        "traffic", "count", "timeout", "interrupts", "avg latency", "max latency"))
+    for pattern in ["periodic", "bursty", "sparse"]:
+        events = traffic(pattern, n)
+        for count, timeout in [(1, 0), (8, 1000), (32, 1000), (32, 4000)]:
+            fired, latencies = simulate(events, count, timeout)
+            print("{:<10} {:>6} {:>8} {:>11} {:>12.1f} {:>12}".format(
+                pattern, count, timeout, len(fired), sum(latencies)/len(latencies), max(latencies)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+
+# License: BSD
+
+"""Parallel nextpnr seed/placer sweep for the iCE40 targets.
+
+The design is synthesized once with Yosys, then placed and routed with nextpnr for N seeds and each
+placer concurrently from the same synthesized JSON. The achieved Fmax of each clock is parsed from
+the nextpnr logs, the best run (highest worst-case Fmax/constraint ratio over the selected clocks)
+is packed into the bitstream and the Fmax distribution across seeds is reported (and saved to
+<build_name>_seed_sweep.json).
+
+From a target:
+
+    builder = Builder(soc, **builder_argdict(args))
+    if args.seed_sweep:
+        nextpnr_seed_sweep_build(builder, args, clocks=["usb_48", "sys"])
+
+Or on an existing gateware directory (generated with --no-compile-gateware):
+
+    ./nextpnr_sweep.py build/gateware --seeds 32 --placers heap sa --clocks usb_48 sys
+"""
+
+import os
+import re
+import sys
+import json
+import shutil
+import argparse
+import subprocess
+import statistics
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from litex_boards.tools.build_hooks import add_build_hook
+
+# Helpers ------------------------------------------------------------------------------------------
+
+_fmax_re = re.compile(r"Max frequency for clock\s+'([^']+)': ([\d.]+) MHz \((PASS|FAIL) at ([\d.]+) MHz\)")
+
+PnRResult = namedtuple("PnRResult", "seed placer asc log success fmax")
+
+def parse_fmax(log):
+    """Return {clock: (fmax, constraint)} from a nextpnr log (last report, ie post-route)."""
+    fmax = {}
+    for clock, achieved, status, constraint in _fmax_re.findall(log):
+        fmax[clock] = (float(achieved), float(constraint))
+    return fmax
+
+def _select_clocks(fmax, clocks):
+    if clocks is None:
+        return fmax
+    return {k: v for k, v in fmax.items() if any(c in k for c in clocks)}
+
+def score(result, clocks=None):
+    """Worst Fmax/constraint ratio over the selected clocks (>= 1.0 when timing is met)."""
+    fmax = _select_clocks(result.fmax, clocks)
+    if not result.success or not fmax:
+        return 0.0
+    return min(achieved/constraint for achieved, constraint in fmax.values())
+
+def _read_script(build_dir, build_name):
+    with open(os.path.join(build_dir, "build_" + build_name + ".sh")) as f:
+        lines = [l.strip() for l in f if l.strip() and not l.startswith("#") and l.strip() != "set -e"]
+    for i, line in enumerate(lines):
+        if line.startswith("nextpnr-"):
+            return lines[:i], line, lines[i+1:]
+    raise ValueError("No nextpnr command found in build script.")
+
+def _pnr_command(line, seed, placer, asc):
+    line = re.sub(r"\s--seed\s+\S+",   "", line)
+    line = re.sub(r"\s--placer\s+\S+", "", line)
+    line = re.sub(r"\s--asc\s+\S+",    "", line)
+    line = re.sub(r"\s--log\s+\S+",    "", line) # Concurrent runs: the output is logged per run.
+    line += " --asc {} --seed {}".format(asc, seed)
+    if placer is not None:
+        line += " --placer {}".format(placer)
+    return line
+
+# Sweep --------------------------------------------------------------------------------------------
+
+def seed_sweep(build_dir, build_name="top", seeds=16, placers=["heap", "sa"], jobs=None, clocks=None):
+    """Run the seed/placer sweep in `build_dir` and pack the best run. Returns (best, results)."""
+    synth, pnr, pack = _read_script(build_dir, build_name)
+
+    # Synthesize once.
+    for line in synth:
+        subprocess.check_call(line, shell=True, cwd=build_dir)
+
+    # Place and route all seeds/placers concurrently (nextpnr-ice40 is single-threaded).
+    sweep_dir = os.path.join(build_dir, "seed_sweep")
+    os.makedirs(sweep_dir, exist_ok=True)
+    def run(seed, placer):
+        name = "{}_{}_{}".format(build_name, placer, seed)
+        asc  = os.path.join(sweep_dir, name + ".txt")
+        log  = os.path.join(sweep_dir, name + ".log")
+        with open(log, "w") as f:
+            p = subprocess.run(_pnr_command(pnr, seed, placer, asc), shell=True, cwd=build_dir,
+                stdout = f,
+                stderr = subprocess.STDOUT)
+        with open(log, errors="replace") as f:
+            fmax = parse_fmax(f.read())
+        return PnRResult(seed, placer, asc, log, p.returncode == 0 and os.path.isfile(asc), fmax)
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as executor:
+        futures = [executor.submit(run, seed, placer) for placer in placers for seed in range(seeds)]
+        results = [f.result() for f in futures]
+
+    # Keep the best successful run and pack it.
+    best = max((r for r in results if r.success), key=lambda r: score(r, clocks), default=None)
+    if best is None:
+        raise OSError("No successful nextpnr run in seed sweep.")
+    shutil.copyfile(best.asc, os.path.join(build_dir, build_name + ".txt"))
+    shutil.copyfile(best.log, os.path.join(build_dir, build_name + "_nextpnr.log"))
+    for line in pack:
+        subprocess.check_call(line, shell=True, cwd=build_dir)
+
+    # Save report.
+    with open(os.path.join(build_dir, build_name + "_seed_sweep.json"), "w") as f:
+        json.dump({
+            "best"    : {"seed": best.seed, "placer": best.placer, "fmax": best.fmax},
+            "results" : [{"seed": r.seed, "placer": r.placer, "success": r.success, "fmax": r.fmax}
+                for r in results],
+        }, f, indent=4)
+    return best, results
+
+def print_report(best, results, clocks=None, file=sys.stdout):
+    print("Seed sweep: {} runs, best: seed {} / placer {}".format(len(results), best.seed, best.placer),
+        file=file)
+    for placer in sorted(set(r.placer for r in results)):
+        runs   = [r for r in results if r.placer == placer and r.success]
+        fmaxes = {}
+        for r in runs:
+            for clock, (achieved, constraint) in _select_clocks(r.fmax, clocks).items():
+                fmaxes.setdefault(clock, []).append((achieved, constraint))
+        print("  placer {}: {}/{} successful runs".format(placer, len(runs),
+            len([r for r in results if r.placer == placer])), file=file)
+        for clock, values in sorted(fmaxes.items()):
+            achieved = [a for a, _ in values]
+            print("    {:32s} min {:7.2f} / median {:7.2f} / max {:7.2f} MHz, {}/{} >= {:.2f} MHz".format(
+                clock, min(achieved), statistics.median(achieved), max(achieved),
+                sum(a >= c for a, c in values), len(values), values[0][1]), file=file)
+
+# Target Arguments ---------------------------------------------------------------------------------
+
+def nextpnr_seed_sweep_args(parser):
+    parser.add_argument("--seed-sweep", default=0, type=int,
+        help="place and route with this number of seeds (and each placer) and keep the best")
+    parser.add_argument("--seed-sweep-placers", default=["heap", "sa"], nargs="+",
+        help="placers used in seed sweep (default=heap sa)")
+    parser.add_argument("--seed-sweep-jobs", default=None, type=int,
+        help="concurrent nextpnr runs in seed sweep (default=CPU count)")
+
+def nextpnr_seed_sweep_build(builder, args, clocks=None, build_name="top"):
+    # The sweep replaces the toolchain run of the build: the other build hooks (reports...) see a
+    # regular build, ending once the best run is packed.
+    def seed_sweep_hook(build, **kwargs):
+        r = build(**dict(kwargs, run=False))
+        if builder.compile_gateware and kwargs.get("run", True):
+            best, results = seed_sweep(builder.gateware_dir, kwargs.get("build_name", "top"),
+                seeds   = args.seed_sweep,
+                placers = args.seed_sweep_placers,
+                jobs    = args.seed_sweep_jobs,
+                clocks  = clocks)
+            print_report(best, results, clocks)
+        return r
+    add_build_hook(builder, seed_sweep_hook)
+    builder.build(build_name=build_name)
+
+# Main ---------------------------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel nextpnr seed sweep")
+    parser.add_argument("build_dir", help="gateware directory containing the build script")
+    parser.add_argument("--build-name", default="top",          help="build name (default=top)")
+    parser.add_argument("--seeds",      default=16, type=int,    help="number of seeds (default=16)")
+    parser.add_argument("--placers",    default=["heap", "sa"], nargs="+", help="placers (default=heap sa)")
+    parser.add_argument("--jobs",       default=None, type=int,  help="concurrent runs (default=CPU count)")
+    parser.add_argument("--clocks",     default=None, nargs="+",
+        help="clocks to optimize, matched on nextpnr clock names (default=all)")
+    args = parser.parse_args()
+
+    best, results = seed_sweep(args.build_dir, args.build_name, args.seeds, args.placers, args.jobs,
+        args.clocks)
+    print_report(best, results, args.clocks)
+
+if __name__ == "__main__":
+    main()
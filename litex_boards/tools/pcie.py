@@ -0,0 +1,138 @@
+# License: BSD
+
+"""PCIe core of the PCIe targets.
+
+add_pcie(soc, ...) adds behind the PCIe PHY of the SoC (soc.pcie_phy):
+- the LitePCIe endpoint and the Wishbone bridge (host access to the CSRs through BAR0),
+- `dma_channels` LitePCIeDMAs (pcie_dma<n>), optionally connected to the DRAM (pcie_dram_writer<n>:
+  Host -> DRAM, pcie_dram_reader<n>: DRAM -> Host),
+- the MSI controller with the DMAs interrupts, through MSI moderation (see msi_moderation.py) and
+  on vectors mapped per channel (reader/writer of each channel on consecutive vectors) or per
+  direction (readers of all channels first, then writers), the vectors being exported as
+  PCIE_DMA<n>_<READER/WRITER>_INTERRUPT constants.
+
+Targets use it as:
+
+    pcie_args(parser)
+    ...
+    soc = PCIeSoC(..., **pcie_argdict(args))
+
+    # In PCIeSoC, once the PHY is created:
+    add_pcie(self, **kwargs)
+"""
+
+from migen import *
+
+from litex.soc.interconnect import stream
+
+from litedram.frontend.dma import LiteDRAMDMAWriter, LiteDRAMDMAReader
+
+from litepcie.core import LitePCIeEndpoint, LitePCIeMSI
+from litepcie.frontend.dma import LitePCIeDMA
+from litepcie.frontend.wishbone import LitePCIeWishboneBridge
+
+from litex_boards.tools.msi_moderation import MSIModeration
+
+# Helpers ------------------------------------------------------------------------------------------
+
+def msi_vector(channel, direction, dma_channels, dma_msi_mapping="channel"):
+    """MSI vector of the `direction` (0: reader, 1: writer) interrupt of DMA `channel`."""
+    return {
+        "channel"   : 2*channel + direction,
+        "direction" : direction*dma_channels + channel,
+    }[dma_msi_mapping]
+
+# PCIe Core ----------------------------------------------------------------------------------------
+
+def add_pcie(soc, dma_channels=2, dma_buffering_depth=1024, dma_msi_mapping="channel",
+    with_dram_dma=False):
+    assert 1 <= dma_channels <= 16 # 2 MSI vectors per channel, 32 vectors.
+    assert dma_msi_mapping in ["channel", "direction"]
+    phy = soc.pcie_phy
+
+    # Endpoint
+    soc.submodules.pcie_endpoint = LitePCIeEndpoint(phy)
+
+    # Wishbone bridge
+    soc.submodules.pcie_bridge = LitePCIeWishboneBridge(soc.pcie_endpoint,
+        base_address = soc.mem_map["csr"])
+    soc.add_wb_master(soc.pcie_bridge.wishbone)
+
+    # DMAs
+    for i in range(dma_channels):
+        dma = LitePCIeDMA(phy, soc.pcie_endpoint,
+            with_buffering = True, buffering_depth=dma_buffering_depth,
+            with_loopback  = True)
+        setattr(soc.submodules, "pcie_dma{}".format(i), dma)
+        soc.add_csr("pcie_dma{}".format(i))
+
+    soc.add_constant("DMA_CHANNELS", dma_channels)
+    soc.add_constant("DMA_BUFFERING_DEPTH", dma_buffering_depth)
+
+    # DMA <-> DRAM
+    if with_dram_dma:
+        assert not soc.integrated_main_ram_size
+        for i in range(dma_channels):
+            dma = getattr(soc, "pcie_dma{}".format(i))
+
+            # Host -> DRAM (DMA Reader -> DRAM DMA Writer)
+            port      = soc.sdram.crossbar.get_port()
+            converter = stream.Converter(phy.data_width, port.data_width)
+            writer    = LiteDRAMDMAWriter(port, fifo_depth=32)
+            writer.add_csr()
+            soc.submodules += converter
+            setattr(soc.submodules, "pcie_dram_writer{}".format(i), writer)
+            soc.add_csr("pcie_dram_writer{}".format(i))
+            soc.comb += [
+                dma.source.connect(converter.sink),
+                converter.source.connect(writer.sink),
+            ]
+
+            # DRAM -> Host (DRAM DMA Reader -> DMA Writer)
+            port      = soc.sdram.crossbar.get_port()
+            reader    = LiteDRAMDMAReader(port, fifo_depth=32)
+            converter = stream.Converter(port.data_width, phy.data_width)
+            reader.add_csr()
+            soc.submodules += converter
+            setattr(soc.submodules, "pcie_dram_reader{}".format(i), reader)
+            soc.add_csr("pcie_dram_reader{}".format(i))
+            soc.comb += [
+                reader.source.connect(converter.sink),
+                converter.source.connect(dma.sink),
+            ]
+
+    # MSI
+    soc.submodules.pcie_msi = LitePCIeMSI()
+    soc.add_csr("pcie_msi")
+    soc.comb += soc.pcie_msi.source.connect(phy.msi)
+    soc.interrupts = {}
+    vectors        = {}
+    for i in range(dma_channels):
+        dma = getattr(soc, "pcie_dma{}".format(i))
+        for n, (direction, irq) in enumerate([("READER", dma.reader.irq), ("WRITER", dma.writer.irq)]):
+            name = "PCIE_DMA{}_{}".format(i, direction)
+            soc.interrupts[name] = irq
+            vectors[name] = msi_vector(i, n, dma_channels, dma_msi_mapping)
+    # MSI moderation: interrupt after N descriptors or timeout cycles (runtime tunable).
+    soc.submodules.pcie_msi_moderation = MSIModeration(soc.interrupts)
+    soc.add_csr("pcie_msi_moderation")
+    for k, v in soc.pcie_msi_moderation.irqs.items():
+        soc.comb += soc.pcie_msi.irqs[vectors[k]].eq(v)
+        soc.add_constant(k + "_INTERRUPT", vectors[k])
+
+# Target Arguments ---------------------------------------------------------------------------------
+
+def pcie_args(parser):
+    parser.add_argument("--dma-channels",        default=2,    type=int, help="number of PCIe DMA channels (1-16)")
+    parser.add_argument("--dma-buffering-depth", default=1024, type=int, help="PCIe DMA buffering depth")
+    parser.add_argument("--dma-msi-mapping",     default="channel", choices=["channel", "direction"],
+        help="PCIe DMA MSI vectors mapping (per channel or per direction)")
+    parser.add_argument("--with-dram-dma",       action="store_true", help="connect the PCIe DMAs to the DRAM")
+
+def pcie_argdict(args):
+    return {
+        "dma_channels"        : args.dma_channels,
+        "dma_buffering_depth" : args.dma_buffering_depth,
+        "dma_msi_mapping"     : args.dma_msi_mapping,
+        "with_dram_dma"       : args.with_dram_dma,
+    }
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+
+# License: BSD
+
+"""PCIe DMA throughput benchmark (simulation).
+
+Simulates the LitePCIeDMA path of the PCIe targets (nereid, tagus, aller, ...) against a software
+model of the PCIe root complex/host memory, without requiring a card in a host:
+- the DMAs are connected to a model endpoint whose master ports (DMA requests/completions) are
+  served by the root complex model,
+- the root complex model absorbs the memory writes (DMA writer: FPGA -> Host) and completes the
+  memory reads (DMA reader: Host -> FPGA) after a configurable latency, splitting them in completions
+  of `completion_size` bytes,
+- the link bandwidth (per direction) is modeled from the lanes/generation, with a per-TLP overhead
+  (framing, sequence number, header, LCRC). TLP (de)packetization and the PHY are not simulated.
+
+Descriptors of `descriptor_size` bytes are programmed on each channel and the DMAs enabled; the
+benchmark reports the achieved bandwidth (from enable to the last descriptor IRQ) and descriptor
+latency (from enable to the first descriptor IRQ, and average time between descriptor IRQs):
+
+    ./pcie_benchmark.py --target nereid
+    ./pcie_benchmark.py --target aller --data-width 64,128 --buffering-depth 256,1024 --channels 1,2
+"""
+
+import sys
+import json
+import argparse
+import itertools
+from collections import deque
+
+from migen import *
+from migen.sim import passive
+
+from litex.soc.interconnect import stream
+
+from litepcie.common import request_layout, completion_layout
+from litepcie.frontend.dma import LitePCIeDMA
+
+# Targets ------------------------------------------------------------------------------------------
+
+targets = {
+    # PCIe Gen2 X1, 64-bit S7PCIEPHY, 100MHz sys_clk.
+    "nereid" : {"sys_clk_freq": 100e6, "lanes": 1, "gen": 2, "data_width": 64},
+    "tagus"  : {"sys_clk_freq": 100e6, "lanes": 1, "gen": 2, "data_width": 64},
+    "aller"  : {"sys_clk_freq": 100e6, "lanes": 1, "gen": 2, "data_width": 64},
+}
+
+# Link rates per lane (bits/s, after line encoding).
+link_rates = {
+    1: 2.5e9*8/10,
+    2: 5.0e9*8/10,
+    3: 8.0e9*128/130,
+}
+
+tlp_overhead = 24 # Bytes per TLP (framing, sequence number, 3DW header, LCRC).
+
+# Model Endpoint -----------------------------------------------------------------------------------
+
+class _ModelPHY:
+    def __init__(self, data_width, max_request_size=512, max_payload_size=128):
+        self.data_width       = data_width
+        self.id               = 0x0100
+        self.max_request_size = max_request_size
+        self.max_payload_size = max_payload_size
+
+class _ModelMasterPort:
+    def __init__(self, data_width, channel, write_only=False, read_only=False):
+        self.channel    = channel
+        self.write_only = write_only
+        self.read_only  = read_only
+        self.source     = stream.Endpoint(request_layout(data_width))
+        self.sink       = stream.Endpoint(completion_layout(data_width))
+
+class _ModelCrossbar:
+    def __init__(self, data_width):
+        self.data_width = data_width
+        self.masters    = []
+
+    def get_master_port(self, write_only=False, read_only=False):
+        port = _ModelMasterPort(self.data_width, len(self.masters), write_only, read_only)
+        self.masters.append(port)
+        return port
+
+class ModelEndpoint:
+    """LitePCIeEndpoint stand-in exposing the DMA master ports to the root complex model."""
+    def __init__(self, phy, max_pending_requests=4):
+        self.phy                  = phy
+        self.max_pending_requests = max_pending_requests
+        self.crossbar             = _ModelCrossbar(phy.data_width)
+
+# Root Complex Model -------------------------------------------------------------------------------
+
+class RootComplexModel:
+    def __init__(self, endpoint, sys_clk_freq, lanes=1, gen=2, read_latency=500e-9, completion_size=64):
+        self.ports           = endpoint.crossbar.masters
+        self.beat_bytes      = endpoint.phy.data_width//8
+        self.link_bytes      = lanes*link_rates[gen]/8/sys_clk_freq # Bytes/cycle per direction.
+        self.read_latency    = int(read_latency*sys_clk_freq)
+        self.completion_size = completion_size
+        self.cycle           = 0
+        self.credits         = {"up": 0.0, "down": 0.0}
+        self.credits_max     = 2*(tlp_overhead + self.beat_bytes)
+        self.writes          = {} # Payload bytes written per port.
+        self.reads           = {} # Payload bytes completed per port.
+
+    def _take(self, direction, n):
+        if self.credits[direction] >= n:
+            self.credits[direction] -= n
+            return 1
+        return 0
+
+    def _give(self, direction, n):
+        self.credits[direction] += n
+
+    @passive
+    def _link(self):
+        while True:
+            for direction in self.credits.keys():
+                self.credits[direction] = min(self.credits[direction] + self.link_bytes, self.credits_max)
+            yield
+            self.cycle += 1
+
+    @passive
+    def _requests(self, port, reads):
+        # Memory writes (FPGA -> Host) and read requests, upstream.
+        self.writes[port.channel] = 0
+        first = True
+        cost  = 0
+        while True:
+            if cost:
+                if (yield port.source.valid):
+                    if first:
+                        if (yield port.source.we):
+                            self.writes[port.channel] += 4*(yield port.source.len)
+                        else:
+                            reads.append({
+                                "cycle"   : self.cycle + self.read_latency,
+                                "adr"     : (yield port.source.adr),
+                                "len"     : (yield port.source.len),
+                                "tag"     : (yield port.source.tag),
+                                "req_id"  : (yield port.source.req_id),
+                                "channel" : (yield port.source.channel),
+                                "user_id" : (yield port.source.user_id),
+                            })
+                    first = bool((yield port.source.last))
+                else:
+                    self._give("up", cost)
+            cost = self.beat_bytes + (tlp_overhead if first else 0)
+            if not self._take("up", cost):
+                cost = 0
+            yield port.source.ready.eq(int(cost != 0))
+            yield
+
+    def _completion_beats(self, request):
+        # Split the read request in completions of completion_size bytes, one dict per beat.
+        remaining = request["len"]
+        adr       = request["adr"]
+        while remaining:
+            n     = min(remaining, self.completion_size//4)
+            beats = (4*n + self.beat_bytes - 1)//self.beat_bytes
+            for i in range(beats):
+                yield {
+                    "first"   : i == 0,
+                    "last"    : i == beats - 1,
+                    "end"     : (remaining == n),
+                    "len"     : n,
+                    "adr"     : adr & 0x7f,
+                    "dat"     : (adr//self.beat_bytes + i) & (2**(8*self.beat_bytes) - 1),
+                    "tag"     : request["tag"],
+                    "req_id"  : request["req_id"],
+                    "channel" : request["channel"],
+                    "user_id" : request["user_id"],
+                }
+            remaining -= n
+            adr       += 4*n
+
+    @passive
+    def _completions(self, port, reads):
+        # Read completions (Host -> FPGA), downstream.
+        self.reads[port.channel] = 0
+        beats = deque()
+        beat  = None
+        valid = 0
+        while True:
+            if valid and (yield port.sink.ready):
+                if beat["first"]:
+                    self.reads[port.channel] += 4*beat["len"]
+                beat = None
+            if beat is None:
+                if not beats and reads and reads[0]["cycle"] <= self.cycle:
+                    beats.extend(self._completion_beats(reads.popleft()))
+                if beats:
+                    cost = self.beat_bytes + (tlp_overhead if beats[0]["first"] else 0)
+                    if self._take("down", cost):
+                        beat = beats.popleft()
+            valid = int(beat is not None)
+            yield port.sink.valid.eq(valid)
+            if valid:
+                yield port.sink.last.eq(beat["last"])
+                yield port.sink.end.eq(beat["end"])
+                yield port.sink.err.eq(0)
+                yield port.sink.cmp_id.eq(0x0000)
+                for name in ["len", "adr", "dat", "tag", "req_id", "channel", "user_id"]:
+                    yield getattr(port.sink, name).eq(beat[name])
+            yield
+
+    def generators(self):
+        generators = [self._link()]
+        for port in self.ports:
+            reads = deque()
+            generators.append(self._requests(port, reads))
+            if not port.write_only:
+                generators.append(self._completions(port, reads))
+        return generators
+
+# Benchmark ----------------------------------------------------------------------------------------
+
+class _Bench(Module):
+    def __init__(self, data_width, buffering_depth, channels, max_request_size, max_payload_size,
+        max_pending_requests):
+        self.phy      = _ModelPHY(data_width, max_request_size, max_payload_size)
+        self.endpoint = ModelEndpoint(self.phy, max_pending_requests)
+        self.dmas     = []
+        for i in range(channels):
+            dma = LitePCIeDMA(self.phy, self.endpoint,
+                with_buffering  = True,
+                buffering_depth = buffering_depth)
+            setattr(self.submodules, "dma{}".format(i), dma)
+            self.dmas.append(dma)
+            # User side: consume the DMA reader data and provide data to the DMA writer.
+            self.comb += [
+                dma.source.ready.eq(1),
+                dma.sink.valid.eq(1),
+            ]
+
+def run_benchmark(data_width=64, buffering_depth=1024, channels=1, direction="read",
+    descriptors=16, descriptor_size=4096, sys_clk_freq=100e6, lanes=1, gen=2, read_latency=500e-9,
+    max_request_size=512, max_payload_size=128, max_pending_requests=4, completion_size=64,
+    timeout=10000000):
+    """Simulate `channels` DMAs transferring `descriptors` descriptors of `descriptor_size` bytes in
+    `direction` (read: Host -> FPGA, write: FPGA -> Host, both)."""
+    assert direction in ["read", "write", "both"]
+    assert descriptor_size % max(max_request_size, max_payload_size) == 0
+    bench = _Bench(data_width, buffering_depth, channels, max_request_size, max_payload_size,
+        max_pending_requests)
+    rc    = RootComplexModel(bench.endpoint, sys_clk_freq, lanes, gen, read_latency, completion_size)
+
+    engines = []
+    for i, dma in enumerate(bench.dmas):
+        if direction in ["read", "both"]:
+            engines.append(("read", i, dma.reader))
+        if direction in ["write", "both"]:
+            engines.append(("write", i, dma.writer))
+    irqs  = {(name, i): [] for name, i, _ in engines}
+    start = []
+
+    def driver():
+        for name, i, engine in engines:
+            yield from engine.table.loop_prog_n.write(0)
+            for n in range(descriptors):
+                address = 0x10000000*(name == "write") + (i*descriptors + n)*descriptor_size
+                yield from engine.table.value.write(address | (descriptor_size << 32))
+                yield from engine.table.we.write(1)
+        start.append(rc.cycle)
+        for name, i, engine in engines:
+            yield engine.enable.storage.eq(1)
+        yield
+        while not all(len(v) == descriptors for v in irqs.values()):
+            if rc.cycle - start[0] > timeout:
+                raise RuntimeError("PCIe DMA benchmark timeout.")
+            for name, i, engine in engines:
+                if (yield engine.irq):
+                    irqs[(name, i)].append(rc.cycle)
+            yield
+
+    run_simulation(bench, [driver()] + rc.generators())
+
+    results = {
+        "data_width"      : data_width,
+        "buffering_depth" : buffering_depth,
+        "channels"        : channels,
+        "direction"       : direction,
+        "descriptors"     : descriptors,
+        "descriptor_size" : descriptor_size,
+        "sys_clk_freq"    : sys_clk_freq,
+        "lanes"           : lanes,
+        "gen"             : gen,
+        "link_peak"       : lanes*link_rates[gen]/8,
+        "datapath_peak"   : data_width/8*sys_clk_freq,
+    }
+    ns = 1e9/sys_clk_freq
+    for name in ["read", "write"]:
+        times = [v for (n, i), v in irqs.items() if n == name]
+        if not times:
+            continue
+        cycles    = max(t[-1] for t in times) - start[0]
+        length    = len(times)*descriptors*descriptor_size
+        intervals = [t[k+1] - t[k] for t in times for k in range(len(t) - 1)]
+        results[name] = {
+            "bytes"         : length,
+            "bandwidth"     : length/(cycles/sys_clk_freq),
+            "first_latency" : (min(t[0] for t in times) - start[0])*ns,
+            "avg_latency"   : (sum(intervals)/len(intervals) if intervals else cycles)*ns,
+        }
+        done = sum((rc.reads if name == "read" else rc.writes).values())
+        assert done == length, "{}: {} bytes transferred, {} expected".format(name, done, length)
+    return results
+
+def print_results(results, file=sys.stdout, header=False):
+    if header:
+        print("{:>5} {:>9} {:>8} {:>9} {:>6} {:>10} {:>8} {:>12} {:>12}".format(
+            "width", "buffering", "channels", "direction", "", "bandwidth", "of link",
+            "1st desc.", "avg desc."), file=file)
+    for name, label in [("read", "H->F"), ("write", "F->H")]:
+        if name not in results:
+            continue
+        r = results[name]
+        print("{:>5} {:>9} {:>8} {:>9} {:>6} {:>7.1f}MB/s {:>7.1f}% {:>10.1f}ns {:>10.1f}ns".format(
+            results["data_width"], results["buffering_depth"], results["channels"],
+            results["direction"], label, r["bandwidth"]/1e6, 100*r["bandwidth"]/results["link_peak"],
+            r["first_latency"], r["avg_latency"]), file=file)
+
+# Main ---------------------------------------------------------------------------------------------
+
+def _int_list(s):
+    return [int(v, 0) for v in s.split(",")]
+
+def main():
+    parser = argparse.ArgumentParser(description="PCIe DMA throughput benchmark (simulation)")
+    parser.add_argument("--target",               default="nereid", help="target: " + "/".join(targets))
+    parser.add_argument("--data-width",           default=None, type=_int_list, help="PCIe datapath width(s), ex: 64,128 (default: target's)")
+    parser.add_argument("--buffering-depth",      default=[1024], type=_int_list, help="DMA buffering depth(s)")
+    parser.add_argument("--channels",             default=[1], type=_int_list, help="DMA channel count(s)")
+    parser.add_argument("--direction",            default="read,write", help="direction(s): read (Host->FPGA), write (FPGA->Host), both")
+    parser.add_argument("--descriptors",          default=16, type=int, help="descriptors per channel")
+    parser.add_argument("--descriptor-size",      default=4096, type=int, help="descriptor size (in bytes)")
+    parser.add_argument("--lanes",                default=None, type=int, help="PCIe lanes (default: target's)")
+    parser.add_argument("--gen",                  default=None, type=int, help="PCIe generation (default: target's)")
+    parser.add_argument("--read-latency",         default=500, type=float, help="host memory read latency (in ns)")
+    parser.add_argument("--max-request-size",     default=512, type=int, help="max read request size (in bytes)")
+    parser.add_argument("--max-payload-size",     default=128, type=int, help="max write payload size (in bytes)")
+    parser.add_argument("--max-pending-requests", default=4, type=int, help="max pending read requests")
+    parser.add_argument("--completion-size",      default=64, type=int, help="root complex read completion size (in bytes)")
+    parser.add_argument("--output",               default=None, help="save the results to a JSON file")
+    args = parser.parse_args()
+
+    target = targets[args.target]
+    print("PCIe DMA benchmark ({}: Gen{} X{}, {:.2f}MHz sys_clk, {} x {} bytes descriptors):".format(
+        args.target,
+        args.gen or target["gen"],
+        args.lanes or target["lanes"],
+        target["sys_clk_freq"]/1e6,
+        args.descriptors,
+        args.descriptor_size))
+    results = []
+    for data_width, buffering_depth, channels, direction in itertools.product(
+        args.data_width or [target["data_width"]],
+        args.buffering_depth,
+        args.channels,
+        args.direction.split(",")):
+        r = run_benchmark(
+            data_width           = data_width,
+            buffering_depth      = buffering_depth,
+            channels             = channels,
+            direction            = direction,
+            descriptors          = args.descriptors,
+            descriptor_size      = args.descriptor_size,
+            sys_clk_freq         = target["sys_clk_freq"],
+            lanes                = args.lanes or target["lanes"],
+            gen                  = args.gen or target["gen"],
+            read_latency         = args.read_latency*1e-9,
+            max_request_size     = args.max_request_size,
+            max_payload_size     = args.max_payload_size,
+            max_pending_requests = args.max_pending_requests,
+            completion_size      = args.completion_size)
+        print_results(r, header=(len(results) == 0))
+        results.append(r)
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+
+if __name__ == "__main__":
+    main()
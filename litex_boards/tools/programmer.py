@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+
+# License: BSD
+
+"""Native JTAG programmer for the ECP5 boards.
+
+The binary bitstream (.bit) is streamed directly to the FPGA over JTAG (ISC_ENABLE, ISC_ERASE,
+LSC_RESET_CRC, LSC_BITSTREAM_BURST, ISC_DISABLE, polling LSC_CHECK_BUSY after the enable/erase) instead of playing back an SVF file: the JTAG
+scans are sent to OpenOCD through its Tcl RPC server, which only acts as the adapter driver and
+runs at the highest clock supported by the adapter. Several boards (one adapter each, selected
+by USB serial number) can be programmed in parallel, each with its own OpenOCD instance.
+
+The JTAG transport can also be a local mock server (MockJTAGServer, emulating an ECP5 TAP behind
+the OpenOCD Tcl RPC protocol) to test the programming sequence without hardware.
+
+Platforms return an ECP5Programmer from create_programmer(); standalone use:
+
+    ./programmer.py ecpix5 build/gateware/top.bit --load-all
+"""
+
+import os
+import time
+import socket
+import argparse
+import threading
+import subprocess
+import socketserver
+from concurrent.futures import ThreadPoolExecutor
+
+# ECP5 ---------------------------------------------------------------------------------------------
+
+ecp5_idcodes = {
+    "LFE5U-12F"    : 0x21111043,
+    "LFE5U-25F"    : 0x41111043,
+    "LFE5U-45F"    : 0x41112043,
+    "LFE5U-85F"    : 0x41113043,
+    "LFE5UM-25F"   : 0x01111043,
+    "LFE5UM-45F"   : 0x01112043,
+    "LFE5UM-85F"   : 0x01113043,
+    "LFE5UM5G-25F" : 0x81111043,
+    "LFE5UM5G-45F" : 0x81112043,
+    "LFE5UM5G-85F" : 0x81113043,
+}
+
+# JTAG instructions.
+ISC_ENABLE          = 0xc6
+ISC_ERASE           = 0x0e
+ISC_DISABLE         = 0x26
+READ_ID             = 0xe0
+LSC_READ_STATUS     = 0x3c
+LSC_CHECK_BUSY      = 0xf0
+LSC_RESET_CRC       = 0x3b
+LSC_BITSTREAM_BURST = 0x7a
+
+# Status register.
+STATUS_DONE         = (1 << 8)
+STATUS_BSE_ERROR    = (7 << 23)
+
+def ecp5_idcode(device):
+    for name, idcode in ecp5_idcodes.items():
+        if device.upper().startswith(name):
+            return idcode
+    raise ValueError("Unknown ECP5 device {}.".format(device))
+
+def _reverse_bits(data):
+    table = bytes(int("{:08b}".format(i)[::-1], 2) for i in range(256))
+    return data.translate(table)
+
+# Adapters -----------------------------------------------------------------------------------------
+
+# Highest JTAG clock (kHz) of the FTDI adapters.
+ftdi_max_khz = {
+    0x6010 : 30000, # FT2232H
+    0x6011 : 30000, # FT4232H
+    0x6014 : 30000, # FT232H
+    0x6001 : 3000,  # FT232R
+}
+
+def usb_serials(vid, pid):
+    """Return the serial numbers of the attached USB devices with `vid`:`pid` (sysfs)."""
+    serials = []
+    base = "/sys/bus/usb/devices"
+    if not os.path.isdir(base):
+        return serials
+    for d in sorted(os.listdir(base)):
+        try:
+            with open(os.path.join(base, d, "idVendor")) as f:
+                v = int(f.read(), 16)
+            with open(os.path.join(base, d, "idProduct")) as f:
+                p = int(f.read(), 16)
+            with open(os.path.join(base, d, "serial")) as f:
+                serial = f.read().strip()
+        except (OSError, ValueError):
+            continue
+        if (v, p) == (vid, pid):
+            serials.append(serial)
+    return serials
+
+# Transports ---------------------------------------------------------------------------------------
+
+class TclRPCTransport:
+    """JTAG scans through an OpenOCD Tcl RPC server."""
+    def __init__(self, host="localhost", port=6666, timeout=10):
+        self.sock = None
+        deadline  = time.time() + timeout
+        while self.sock is None:
+            try:
+                self.sock = socket.create_connection((host, port), timeout=timeout)
+            except OSError:
+                if time.time() > deadline:
+                    raise
+                time.sleep(0.05)
+
+    def command(self, cmd):
+        self.sock.sendall(cmd.encode() + b"\x1a")
+        data = b""
+        while not data.endswith(b"\x1a"):
+            chunk = self.sock.recv(4096)
+            if not chunk:
+                raise OSError("JTAG transport closed.")
+            data += chunk
+        return data[:-1].decode().strip()
+
+    def irscan(self, tap, value):
+        self.command("irscan {} 0x{:x}".format(tap, value))
+
+    def drscan(self, tap, nbits, value, endstate=None):
+        cmd = "drscan {} {} 0x{:x}".format(tap, nbits, value)
+        if endstate is not None:
+            cmd += " -endstate {}".format(endstate)
+        r = self.command(cmd)
+        return int(r, 16) if r else 0
+
+    def runtest(self, cycles):
+        self.command("runtest {}".format(cycles))
+
+    def close(self):
+        if self.sock is not None:
+            try:
+                self.command("shutdown")
+            except OSError:
+                pass
+            self.sock.close()
+            self.sock = None
+
+class OpenOCDTransport(TclRPCTransport):
+    """OpenOCD instance driving an FTDI adapter (selected by serial), controlled through Tcl RPC."""
+    def __init__(self, ftdi_config, tap, idcode, serial=None, port=None):
+        port = port or self._free_port()
+        vid, pid = ftdi_config["vid_pid"]
+        cmds = [
+            "interface ftdi",
+            "ftdi_vid_pid 0x{:04x} 0x{:04x}".format(vid, pid),
+            "ftdi_channel {}".format(ftdi_config.get("channel", 0)),
+            "ftdi_layout_init 0x{:04x} 0x{:04x}".format(*ftdi_config["layout_init"]),
+            "reset_config none",
+            "adapter_khz {}".format(ftdi_config.get("khz", ftdi_max_khz.get(pid, 6000))),
+            "transport select jtag",
+            "jtag newtap {} tap -irlen 8 -expected-id 0x{:08x}".format(tap, idcode),
+            "tcl_port {}".format(port),
+            "telnet_port disabled",
+            "gdb_port disabled",
+            "init",
+        ]
+        if serial is not None:
+            cmds.insert(1, "ftdi_serial {}".format(serial))
+        self.process = subprocess.Popen(["openocd"] + sum([["-c", c] for c in cmds], []),
+            stdout = subprocess.DEVNULL,
+            stderr = subprocess.DEVNULL)
+        try:
+            TclRPCTransport.__init__(self, port=port)
+        except OSError:
+            self.process.kill()
+            raise OSError("Unable to start OpenOCD (adapter{} not found?).".format(
+                "" if serial is None else " " + serial))
+
+    @staticmethod
+    def _free_port():
+        with socket.socket() as s:
+            s.bind(("localhost", 0))
+            return s.getsockname()[1]
+
+    def close(self):
+        TclRPCTransport.close(self)
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+# ECP5 Programmer ----------------------------------------------------------------------------------
+
+class ECP5Programmer:
+    def __init__(self, device, ftdi_config, chunk_size=16384):
+        self.device      = device
+        self.idcode      = ecp5_idcode(device)
+        self.ftdi_config = ftdi_config
+        self.chunk_size  = chunk_size
+        self.tap         = "ecp5.tap"
+
+    def open(self, serial=None):
+        return OpenOCDTransport(self.ftdi_config, "ecp5", self.idcode, serial)
+
+    def wait_ready(self, jtag, timeout=5.0):
+        """Poll LSC_CHECK_BUSY through `jtag` until the device is ready, OSError after `timeout`."""
+        deadline = time.time() + timeout
+        while True:
+            jtag.irscan(self.tap, LSC_CHECK_BUSY)
+            if not (jtag.drscan(self.tap, 1, 0) & 0b1):
+                return
+            if time.time() > deadline:
+                raise OSError("Timeout waiting for the device (busy for more than {}s).".format(timeout))
+            jtag.runtest(1000)
+
+    def program(self, jtag, bitstream):
+        """Program `bitstream` (.bit contents) through `jtag`."""
+        tap = self.tap
+        jtag.irscan(tap, READ_ID)
+        idcode = jtag.drscan(tap, 32, 0)
+        if idcode != self.idcode:
+            raise OSError("Unexpected IDCODE 0x{:08x} (expected 0x{:08x} for {}).".format(
+                idcode, self.idcode, self.device))
+
+        # Enable configuration, erase SRAM (the erase duration depends on the device, not on the
+        # JTAG clock: wait for the device to be ready).
+        jtag.irscan(tap, ISC_ENABLE)
+        jtag.drscan(tap, 8, 0x00)
+        jtag.runtest(100)
+        self.wait_ready(jtag)
+        jtag.irscan(tap, ISC_ERASE)
+        jtag.drscan(tap, 8, 0x01)
+        jtag.runtest(100)
+        self.wait_ready(jtag)
+        jtag.irscan(tap, LSC_RESET_CRC)
+        jtag.runtest(100)
+
+        # Stream the bitstream (MSB first: bit reversed since JTAG shifts LSB first); the DR shift
+        # is paused between chunks.
+        jtag.irscan(tap, LSC_BITSTREAM_BURST)
+        data = _reverse_bits(bitstream)
+        for offset in range(0, len(data), self.chunk_size):
+            chunk = data[offset:offset + self.chunk_size]
+            last  = offset + self.chunk_size >= len(data)
+            jtag.drscan(tap, 8*len(chunk), int.from_bytes(chunk, "little"),
+                endstate = "IDLE" if last else "DRPAUSE")
+        jtag.runtest(100)
+
+        # Start and check status.
+        jtag.irscan(tap, ISC_DISABLE)
+        jtag.runtest(1000)
+        jtag.irscan(tap, LSC_READ_STATUS)
+        status = jtag.drscan(tap, 32, 0)
+        if (status & STATUS_BSE_ERROR) or not (status & STATUS_DONE):
+            raise OSError("Configuration failed (status 0x{:08x}).".format(status))
+        return status
+
+    def load_bitstream(self, bitstream_file, serials=[None], jobs=None):
+        """Load `bitstream_file` on the boards of the adapters with `serials` (in parallel)."""
+        with open(bitstream_file, "rb") as f:
+            bitstream = f.read()
+        def load(serial):
+            jtag = self.open(serial)
+            try:
+                start = time.time()
+                self.program(jtag, bitstream)
+                print("{}: loaded {} ({} bytes) in {:.2f}s".format(serial or self.device,
+                    os.path.basename(bitstream_file), len(bitstream), time.time() - start))
+            finally:
+                jtag.close()
+        with ThreadPoolExecutor(max_workers=jobs or len(serials)) as executor:
+            for f in [executor.submit(load, serial) for serial in serials]:
+                f.result()
+
+# Mock JTAG Server ---------------------------------------------------------------------------------
+
+class MockJTAGServer(socketserver.ThreadingTCPServer):
+    """Local mock of an ECP5 TAP behind the OpenOCD Tcl RPC protocol.
+
+    The bitstream received with LSC_BITSTREAM_BURST (across paused DR scans) is available in
+    `bitstream`, the executed commands in `commands`. The erase keeps the device busy for
+    `erase_polls` LSC_CHECK_BUSY polls: a bitstream sent before is rejected (configuration error)."""
+    allow_reuse_address = True
+    daemon_threads      = True
+
+    def __init__(self, idcode, port=0, erase_polls=0):
+        self.idcode      = idcode
+        self.erase_polls = erase_polls
+        self.busy        = 0
+        self.error       = False
+        self.ir          = None
+        self.enabled     = False
+        self.burst     = bytearray()
+        self.bitstream = None
+        self.commands  = []
+        self.lock      = threading.Lock()
+        socketserver.ThreadingTCPServer.__init__(self, ("localhost", port), _MockJTAGHandler)
+        self.port = self.server_address[1]
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def execute(self, cmd):
+        args = cmd.split()
+        with self.lock:
+            self.commands.append(args[0] if args else "")
+            if not args:
+                return ""
+            if args[0] == "irscan":
+                self.ir = int(args[2], 0)
+                if self.ir == ISC_ENABLE:
+                    self.enabled = True
+                if self.ir == LSC_BITSTREAM_BURST:
+                    self.burst = bytearray()
+                if self.ir == ISC_DISABLE and self.enabled:
+                    self.bitstream = _reverse_bits(bytes(self.burst))
+                    self.enabled   = False
+                return ""
+            if args[0] == "drscan":
+                nbits, value = int(args[2]), int(args[3], 0)
+                if self.ir == READ_ID:
+                    return "{:08x}".format(self.idcode)
+                if self.ir == ISC_ERASE:
+                    self.busy = self.erase_polls
+                if self.ir == LSC_CHECK_BUSY:
+                    busy, self.busy = self.busy > 0, max(self.busy - 1, 0)
+                    return "{:x}".format(busy)
+                if self.ir == LSC_BITSTREAM_BURST and self.enabled:
+                    self.error |= self.busy > 0
+                    self.burst += value.to_bytes(nbits//8, "little")
+                if self.ir == LSC_READ_STATUS:
+                    if self.error:
+                        return "{:08x}".format(STATUS_BSE_ERROR)
+                    return "{:08x}".format(STATUS_DONE if self.bitstream else 0)
+                return "0"
+            return ""
+
+class _MockJTAGHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        data = b""
+        while True:
+            chunk = self.request.recv(65536)
+            if not chunk:
+                return
+            data += chunk
+            while b"\x1a" in data:
+                cmd, data = data.split(b"\x1a", 1)
+                if cmd.strip() == b"shutdown":
+                    self.request.sendall(b"\x1a")
+                    return
+                self.request.sendall(self.server.execute(cmd.decode()).encode() + b"\x1a")
+
+# Target Arguments ---------------------------------------------------------------------------------
+
+def programmer_args(parser):
+    parser.add_argument("--load-serial", action="append", default=None,
+        help="load on the board of the adapter with this USB serial number (can be repeated)")
+    parser.add_argument("--load-all",    action="store_true", help="load on all the attached boards")
+
+def programmer_load(platform, bitstream_file, args):
+    prog    = platform.create_programmer()
+    serials = args.load_serial or [None]
+    if args.load_all:
+        serials = usb_serials(*prog.ftdi_config["vid_pid"]) or [None]
+    prog.load_bitstream(bitstream_file, serials)
+
+# Main ---------------------------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="ECP5 JTAG programmer")
+    parser.add_argument("platform",  help="platform name (ex: ecpix5)")
+    parser.add_argument("bitstream", help="bitstream (.bit) file")
+    programmer_args(parser)
+    args = parser.parse_args()
+
+    from litex_boards import platforms
+    programmer_load(platforms.load(args.platform).Platform(), args.bitstream, args)
+
+if __name__ == "__main__":
+    main()
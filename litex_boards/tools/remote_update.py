@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+
+# License: BSD
+
+"""Remote gateware update over PCIe.
+
+The PCIe SoCs (Aller, Nereid, Tagus) expose the configuration SPI Flash (S7SPIFlashMaster, CCLK
+driven through STARTUPE2) and the ICAP through their CSRs, accessible from the host over the
+LitePCIe Wishbone bridge (BAR0). A new gateware can then be deployed without JTAG cable nor host
+reboot:
+- the image is written to the SPI Flash over PCIe (only the changed 64KiB sectors, see spiflash.py),
+- an IPROG warm reconfiguration is triggered through the ICAP, after setting the warm boot start
+  address (WBSTAR) to the image offset,
+- the PCIe device is removed and the bus rescanned once the FPGA has reconfigured.
+
+The image can either replace the power-up image (offset 0) or be written to a multiboot slot (the
+power-up image then acting as golden image).
+
+    ./remote_update.py --csr-csv csr.csv build/nereid/gateware/top.bit
+    ./remote_update.py --csr-csv csr.csv --offset 0x800000 build/nereid/gateware/top.bit
+"""
+
+import os
+import csv
+import glob
+import time
+import mmap
+import argparse
+
+from migen import *
+
+from litex.soc.interconnect.csr import *
+
+from litex_boards.tools.spiflash import spiflash_args, SectorDiffFlasher
+
+# SPI Flash Master ---------------------------------------------------------------------------------
+
+class S7SPIFlashMaster(Module, AutoCSR):
+    """SPI Flash access for Xilinx 7-Series FPGAs (CCLK through STARTUPE2).
+
+    Transfers of up to 32 bits (MSB first) are started by writing `start`, chip select is controlled
+    by `cs` and kept asserted between transfers (allowing page program/read commands of any length).
+    """
+    def __init__(self, pads, sys_clk_freq, spi_clk_freq=25e6):
+        self.cs     = CSRStorage()
+        self.length = CSRStorage(6)
+        self.start  = CSR()
+        self.done   = CSRStatus()
+        self.mosi   = CSRStorage(32)
+        self.miso   = CSRStatus(32)
+
+        # # #
+
+        div = max(int(sys_clk_freq/(2*spi_clk_freq)), 2)
+
+        clk     = Signal()
+        count   = Signal(max=div)
+        tick    = Signal()
+        bits    = Signal(6)
+        sr_out  = Signal(32)
+        sr_in   = Signal(32)
+        running = Signal()
+
+        self.comb += tick.eq(count == (div - 1))
+        self.sync += [
+            If(running & ~tick,
+                count.eq(count + 1)
+            ).Else(
+                count.eq(0)
+            ),
+            If(self.start.re,
+                running.eq(1),
+                clk.eq(0),
+                bits.eq(self.length.storage),
+                sr_out.eq(self.mosi.storage << (32 - self.length.storage))
+            ).Elif(running & tick,
+                If(~clk,
+                    # Rising edge: sample MISO.
+                    clk.eq(1),
+                    sr_in.eq(Cat(pads.miso, sr_in[:-1])),
+                    bits.eq(bits - 1)
+                ).Else(
+                    # Falling edge: shift MOSI.
+                    clk.eq(0),
+                    sr_out.eq(sr_out << 1),
+                    If(bits == 0, running.eq(0))
+                )
+            )
+        ]
+        self.comb += [
+            self.done.status.eq(~running),
+            self.miso.status.eq(sr_in),
+            pads.cs_n.eq(~self.cs.storage),
+            pads.mosi.eq(sr_out[-1]),
+        ]
+        for name in ["wp", "vpp", "vvp", "hold", "rst_n"]:
+            if hasattr(pads, name):
+                self.comb += getattr(pads, name).eq(1)
+
+        self.specials += Instance("STARTUPE2",
+            i_CLK       = 0,
+            i_GSR       = 0,
+            i_GTS       = 0,
+            i_KEYCLEARB = 0,
+            i_PACK      = 0,
+            i_USRCCLKO  = clk,
+            i_USRCCLKTS = 0,
+            i_USRDONEO  = 1,
+            i_USRDONETS = 1,
+        )
+
+# PCIe CSR Access ----------------------------------------------------------------------------------
+
+def pcie_devices(vendor=0x10ee):
+    """Return the PCIe addresses (domain:bus:device.function) of the `vendor` devices."""
+    devices = []
+    for d in sorted(glob.glob("/sys/bus/pci/devices/*")):
+        with open(os.path.join(d, "vendor")) as f:
+            if int(f.read(), 16) == vendor:
+                devices.append(os.path.basename(d))
+    return devices
+
+def read_csr_csv(filename):
+    """Return {name: address} of the CSR registers of a csr.csv file."""
+    csrs = {}
+    with open(filename) as f:
+        for row in csv.reader(f):
+            if len(row) > 2 and row[0] == "csr_register":
+                csrs[row[1]] = int(row[2], 0)
+    return csrs
+
+class PCIeCSRs:
+    """CSR access through the BAR0 of a LitePCIe device (CSR data width of 32-bit)."""
+    def __init__(self, device, csrs, bar_size=0x20000):
+        self.device = device
+        self.csrs   = csrs
+        # The Wishbone bridge base address (CSR base) is aligned on the BAR size.
+        self.mask   = bar_size - 1
+        self.file   = open(os.path.join("/sys/bus/pci/devices", device, "resource0"), "r+b")
+        self.mmap   = mmap.mmap(self.file.fileno(), bar_size)
+        self.regs   = memoryview(self.mmap).cast("I")
+
+    def read(self, name):
+        return self.regs[(self.csrs[name] & self.mask)//4]
+
+    def write(self, name, value):
+        self.regs[(self.csrs[name] & self.mask)//4] = value
+
+    def close(self):
+        self.regs.release()
+        self.mmap.close()
+        self.file.close()
+
+# SPI Flash Backend --------------------------------------------------------------------------------
+
+SPIFLASH_WRITE_ENABLE = 0x06
+SPIFLASH_READ_STATUS  = 0x05
+SPIFLASH_READ         = 0x03
+SPIFLASH_PAGE_PROGRAM = 0x02
+SPIFLASH_SECTOR_ERASE = 0xd8
+
+class PCIeSPIFlashBackend:
+    """SPI Flash backend (for SectorDiffFlasher) through the S7SPIFlashMaster CSRs."""
+    sector_size = 64*1024
+    page_size   = 256
+    flash_size  = 16*1024*1024
+
+    def __init__(self, csrs, name="flash"):
+        self.csrs = csrs
+        self.name = name
+
+    def id(self):
+        return "pcie-" + self.csrs.device
+
+    def _xfer(self, data, length=32):
+        self.csrs.write(self.name + "_mosi",   data)
+        self.csrs.write(self.name + "_length", length)
+        self.csrs.write(self.name + "_start",  1)
+        while not self.csrs.read(self.name + "_done"):
+            pass
+        return self.csrs.read(self.name + "_miso") & (2**length - 1)
+
+    def _command(self, *words):
+        """Run a command ([(data, length)]) and return the last received word."""
+        self.csrs.write(self.name + "_cs", 1)
+        for data, length in words:
+            r = self._xfer(data, length)
+        self.csrs.write(self.name + "_cs", 0)
+        return r
+
+    def _wait(self):
+        while self._command((SPIFLASH_READ_STATUS << 8, 16)) & 0x1:
+            pass
+
+    def read(self, offset, size):
+        assert offset + size <= self.flash_size
+        data = bytearray()
+        self.csrs.write(self.name + "_cs", 1)
+        self._xfer(SPIFLASH_READ << 24 | offset)
+        for i in range(0, size, 4):
+            data += self._xfer(0).to_bytes(4, "big")
+        self.csrs.write(self.name + "_cs", 0)
+        return bytes(data[:size])
+
+    def write(self, offset, data):
+        assert offset % self.sector_size == 0 and offset + len(data) <= self.flash_size
+        data = data + b"\xff"*((-len(data)) % self.page_size)
+        for sector in range(offset, offset + len(data), self.sector_size):
+            self._command((SPIFLASH_WRITE_ENABLE, 8))
+            self._command((SPIFLASH_SECTOR_ERASE << 24 | sector, 32))
+            self._wait()
+        for i in range(0, len(data), self.page_size):
+            page = data[i:i + self.page_size]
+            if page == b"\xff"*self.page_size:
+                continue
+            self._command((SPIFLASH_WRITE_ENABLE, 8))
+            self._command((SPIFLASH_PAGE_PROGRAM << 24 | (offset + i), 32),
+                *[(int.from_bytes(page[j:j + 4], "big"), 32) for j in range(0, len(page), 4)])
+            self._wait()
+        if self.read(offset, len(data)) != data:
+            raise OSError("SPI Flash verify failed at 0x{:08x}.".format(offset))
+
+# ICAP Reload --------------------------------------------------------------------------------------
+
+ICAP_CMD    = 0b00100
+ICAP_WBSTAR = 0b10000
+ICAP_IPROG  = 0b01111
+
+def icap_write(csrs, addr, data, name="icap"):
+    csrs.write(name + "_addr", addr)
+    csrs.write(name + "_data", data)
+    csrs.write(name + "_send", 1)
+    while not csrs.read(name + "_done"):
+        pass
+
+def icap_reload(csrs, offset=0, name="icap"):
+    """Trigger an IPROG warm reconfiguration from the SPI Flash image at `offset`."""
+    icap_write(csrs, ICAP_WBSTAR, offset, name)
+    icap_write(csrs, ICAP_CMD,    ICAP_IPROG, name)
+
+def pcie_rescan(device, delay=1.0):
+    """Remove `device` and rescan the PCIe bus after `delay` seconds (reconfiguration time)."""
+    with open(os.path.join("/sys/bus/pci/devices", device, "remove"), "w") as f:
+        f.write("1")
+    time.sleep(delay)
+    with open("/sys/bus/pci/rescan", "w") as f:
+        f.write("1")
+
+# Bitstream ----------------------------------------------------------------------------------------
+
+def bit_to_bin(data):
+    """Return the configuration data of a .bit file (.bin files are returned unchanged)."""
+    if data[:2] != b"\x00\x09":
+        return data
+    # Header, then fields: key, length (2 bytes, 4 bytes for the "e" data field), value.
+    i = 13
+    while i < len(data):
+        key = data[i]
+        i  += 1
+        if key == ord("e"):
+            length = int.from_bytes(data[i:i + 4], "big")
+            return data[i + 4:i + 4 + length]
+        i += 2 + int.from_bytes(data[i:i + 2], "big")
+    raise ValueError("No bitstream data in .bit file.")
+
+# Remote Update ------------------------------------------------------------------------------------
+
+def remote_update(csrs, bitstream, offset=0, reload=True, args=None, delay=1.0, manifest_file=None):
+    """Write `bitstream` to the SPI Flash at `offset` then reload the FPGA from it."""
+    if bitstream is not None:
+        with open(bitstream, "rb") as f:
+            data = bit_to_bin(f.read())
+        backend = PCIeSPIFlashBackend(csrs)
+        flasher = SectorDiffFlasher(backend,
+            trust_manifest = args is not None and args.trust_manifest,
+            manifest_file  = manifest_file)
+        if args is not None and args.flash_full:
+            flasher.flash_full([(offset, data + b"\xff"*((-len(data)) % backend.sector_size))])
+        else:
+            flasher.flash([(offset, data)])
+    if reload:
+        print("Reloading FPGA from 0x{:08x}...".format(offset))
+        icap_reload(csrs, offset)
+        csrs.close()
+        pcie_rescan(csrs.device, delay)
+
+# Main ---------------------------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Remote gateware update over PCIe")
+    parser.add_argument("bitstream",   nargs="?", default=None, help="bitstream to flash (.bit or .bin)")
+    parser.add_argument("--csr-csv",   default="csr.csv", help="CSR configuration of the SoC")
+    parser.add_argument("--device",    default=None, help="PCIe device (ex: 0000:02:00.0)")
+    parser.add_argument("--offset",    default=0, type=lambda x: int(x, 0), help="SPI Flash offset (WBSTAR)")
+    parser.add_argument("--no-reload", action="store_true", help="do not reload the FPGA")
+    parser.add_argument("--delay",     default=1.0, type=float, help="reconfiguration time (s)")
+    spiflash_args(parser)
+    args = parser.parse_args()
+
+    device = args.device
+    if device is None:
+        devices = pcie_devices()
+        if len(devices) != 1:
+            raise ValueError("{} PCIe device(s) found, select one with --device: {}".format(
+                len(devices), ", ".join(devices)))
+        device = devices[0]
+    csrs = PCIeCSRs(device, read_csr_csv(args.csr_csv))
+    remote_update(csrs, args.bitstream, args.offset, not args.no_reload, args, args.delay)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+
+# License: BSD
+
+"""Machine-readable resource utilization and timing reports.
+
+The text reports of the toolchains (Vivado, nextpnr, Quartus, Libero) are parsed after the build
+into a normalized JSON (<build_name>_reports.json in the gateware directory):
+
+    {
+        "toolchain"   : "vivado",
+        "utilization" : {
+            "total"   : {"lut": {"used": 3521, "available": 20800, "percent": 16.93}, "ff": ..., ...},
+            "modules" : {"ddrphy": {"lut": 210, "ff": 350, "bram": 0, "dsp": 0, "io": 0}, ...},
+        },
+        "timing"      : {
+            "met"    : true,
+            "clocks" : {"sys_clk": {"constraint_mhz": 100.0, "fmax_mhz": 131.2, "slack_ns": 2.38}, ...},
+        },
+    }
+
+Normalized resources are lut, ff, bram, dsp and io; other resources keep their (lower-cased)
+vendor name. Migen flattens the design, so the breakdown per submodule (ddrphy, sdram, ethmac,
+pcie_dma0...) is done by attributing the cells to the SoC submodules from their name prefix; it is
+only available with Vivado (where the cell list is dumped after placement).
+
+From a target (reports generated with --reports):
+
+    reports_args(parser)
+    ...
+    builder = Builder(soc, **builder_argdict(args))
+    build_reports(builder, args)
+
+Or on an existing gateware directory:
+
+    ./reports.py build/gateware --build-name top
+"""
+
+import os
+import re
+import sys
+import glob
+import json
+import argparse
+
+from litex_boards.tools.nextpnr_sweep import parse_fmax
+from litex_boards.tools.build_hooks import add_build_hook
+
+# Helpers ------------------------------------------------------------------------------------------
+
+resources = ["lut", "ff", "bram", "dsp", "io"]
+
+def _number(s):
+    return float(s.replace(",", ""))
+
+def _resource(used, available=None):
+    r = {"used": used, "available": available, "percent": None}
+    if available:
+        r["percent"] = round(100*used/available, 2)
+    return r
+
+def _timing(clocks):
+    return {
+        "met"    : all(c["slack_ns"] >= 0 for c in clocks.values() if c["slack_ns"] is not None),
+        "clocks" : clocks,
+    }
+
+def _clock(constraint_mhz=None, fmax_mhz=None, slack_ns=None):
+    if slack_ns is None and None not in (constraint_mhz, fmax_mhz):
+        slack_ns = 1e3/constraint_mhz - 1e3/fmax_mhz
+    if fmax_mhz is None and None not in (constraint_mhz, slack_ns):
+        fmax_mhz = 1e3/(1e3/constraint_mhz - slack_ns)
+    return {
+        "constraint_mhz" : constraint_mhz,
+        "fmax_mhz"       : None if fmax_mhz is None else round(fmax_mhz, 3),
+        "slack_ns"       : None if slack_ns is None else round(slack_ns, 3),
+    }
+
+def _read(filename):
+    with open(filename, errors="replace") as f:
+        return f.read()
+
+# Submodules ---------------------------------------------------------------------------------------
+
+def soc_modules(soc):
+    """Return the names of the top-level submodules of `soc`."""
+    return [name for name, _ in getattr(soc, "_submodules", []) if name is not None]
+
+def module_of(cell, modules):
+    """Return the submodule of `modules` a cell belongs to (from its hierarchical name, then from
+    the Migen name prefix), or "other"."""
+    name = re.sub(r"^(main|builder)_", "", cell.split("/")[0])
+    for module in sorted(modules, key=len, reverse=True):
+        if name == module or name.startswith(module + "_"):
+            return module
+    # Cells of unmatched instances (ex: CPU) are attributed to the instance.
+    return name if "/" in cell else "other"
+
+# Vivado -------------------------------------------------------------------------------------------
+
+_vivado_resources = [
+    # Site type                         Resource
+    (r"(Slice|CLB) LUTs",               "lut"),
+    (r"(Slice|CLB) Registers",          "ff"),
+    (r"Block RAM Tile",                 "bram"),
+    (r"DSPs",                           "dsp"),
+    (r"Bonded IOB",                     "io"),
+]
+
+_vivado_cells = [
+    # Reference name                    Resource  Weight
+    (r"LUT\d",                          "lut",    1),
+    (r"(RAM\d+[XMSD]|SRL)",             "lut",    1),
+    (r"(FD|LD)",                        "ff",     1),
+    (r"RAMB36",                         "bram",   1),
+    (r"RAMB18",                         "bram",   0.5),
+    (r"DSP48",                          "dsp",    1),
+    (r"(IBUF|OBUF|IOBUF)",              "io",     1),
+]
+
+# Cell dump appended to the Vivado script (formatted with build_name: braces are doubled).
+vivado_cells_command = (
+    "set f [open {build_name}_cells.txt w]; "
+    "foreach c [get_cells -hierarchical -filter {{IS_PRIMITIVE}}] "
+    "{{puts $f \"[get_property NAME $c] [get_property REF_NAME $c]\"}}; "
+    "close $f")
+
+def parse_vivado_utilization(report):
+    total = {}
+    for line in report.splitlines():
+        columns = [c.strip() for c in line.strip().strip("|").split("|")]
+        if len(columns) < 4:
+            continue
+        for pattern, resource in _vivado_resources:
+            if resource not in total and re.fullmatch(pattern + r"\*?", columns[0]):
+                try:
+                    total[resource] = _resource(_number(columns[1]), _number(columns[-2]))
+                except ValueError:
+                    pass
+    return total
+
+def parse_vivado_cells(cells, modules):
+    r = {}
+    for line in cells.splitlines():
+        try:
+            name, ref = line.split()
+        except ValueError:
+            continue
+        for pattern, resource, weight in _vivado_cells:
+            if re.match(pattern, ref):
+                module = r.setdefault(module_of(name, modules), {k: 0 for k in resources})
+                module[resource] += weight
+                break
+    return r
+
+def parse_vivado_timing(report):
+    # Clock periods (Clock Summary) and worst slacks (Intra Clock Table).
+    periods = {}
+    slacks  = {}
+    section = None
+    for line in report.splitlines():
+        if line.startswith("| ") and not line.startswith("| -"):
+            section = line[2:].strip()
+            continue
+        fields = line.split()
+        if section == "Clock Summary" and len(fields) >= 4 and fields[1].startswith("{"):
+            try:
+                periods[fields[0]] = _number(fields[-2])
+            except ValueError:
+                pass
+        if section == "Intra Clock Table" and len(fields) >= 2 and fields[0] in periods:
+            try:
+                slacks[fields[0]] = _number(fields[1])
+            except ValueError:
+                pass
+    clocks = {}
+    for clock, period in periods.items():
+        clocks[clock] = _clock(1e3/period, slack_ns=slacks.get(clock))
+    return _timing(clocks)
+
+def parse_vivado(build_dir, build_name, modules=[]):
+    r = {"toolchain": "vivado"}
+    prefix = os.path.join(build_dir, build_name)
+    r["utilization"] = {"total": parse_vivado_utilization(_read(prefix + "_utilization_place.rpt"))}
+    if os.path.isfile(prefix + "_cells.txt"):
+        r["utilization"]["modules"] = parse_vivado_cells(_read(prefix + "_cells.txt"), modules)
+    if os.path.isfile(prefix + "_timing.rpt"):
+        r["timing"] = parse_vivado_timing(_read(prefix + "_timing.rpt"))
+    return r
+
+# Nextpnr ------------------------------------------------------------------------------------------
+
+_nextpnr_resources = {
+    "ICESTORM_LC"   : "lut",
+    "TRELLIS_COMB"  : "lut",
+    "TRELLIS_FF"    : "ff",
+    "ICESTORM_RAM"  : "bram",
+    "DP16KD"        : "bram",
+    "ICESTORM_DSP"  : "dsp",
+    "MULT18X18D"    : "dsp",
+    "SB_IO"         : "io",
+    "TRELLIS_IO"    : "io",
+}
+
+def parse_nextpnr(log):
+    # Device utilisation (last report, ie after placement).
+    total = {}
+    for cell, used, available in re.findall(r"^Info:\s+(\w+):\s+(\d+)/\s*(\d+)\s+\d+%", log, re.MULTILINE):
+        total[_nextpnr_resources.get(cell, cell.lower())] = _resource(int(used), int(available))
+    clocks = {}
+    for clock, (fmax, constraint) in parse_fmax(log).items():
+        clocks[clock] = _clock(constraint, fmax)
+    return {"toolchain": "nextpnr", "utilization": {"total": total}, "timing": _timing(clocks)}
+
+# Quartus ------------------------------------------------------------------------------------------
+
+_quartus_resources = [
+    # Summary entry                         Resource
+    ("Total logic elements",                "lut"),
+    ("Logic utilization (in ALMs)",         "lut"),
+    ("Dedicated logic registers",           "ff"),
+    ("Total registers",                     "ff"),
+    ("Total RAM Blocks",                    "bram"),
+    ("Total memory bits",                   "memory_bits"),
+    ("Embedded Multiplier 9-bit elements",  "dsp"),
+    ("Total DSP Blocks",                    "dsp"),
+    ("Total pins",                          "io"),
+]
+
+def parse_quartus_utilization(summary):
+    total = {}
+    for line in summary.splitlines():
+        m = re.match(r"^\s*([^:]+?)\s*:\s*([\d,]+)(?:\s*/\s*([\d,]+))?", line)
+        if m is None:
+            continue
+        for entry, resource in _quartus_resources:
+            if m.group(1) == entry and resource not in total:
+                total[resource] = _resource(_number(m.group(2)),
+                    _number(m.group(3)) if m.group(3) else None)
+    return total
+
+def parse_quartus_timing(report):
+    # Fmax and setup slack of the first (slow) timing model.
+    fmax  = {}
+    slack = {}
+    table = None
+    seen  = set()
+    for line in report.splitlines():
+        m = re.match(r"^; .*Model (Fmax|Setup) Summary", line)
+        if m is not None:
+            table = m.group(1) if m.group(1) not in seen else None
+            seen.add(m.group(1))
+            continue
+        if line.startswith("+") or not line.startswith(";"):
+            if line.strip() == "":
+                table = None
+            continue
+        fields = [f.strip() for f in line.strip(";").split(";")]
+        try:
+            if table == "Fmax" and fields[0].endswith("MHz"):
+                fmax[fields[2]] = _number(fields[1].split()[0])
+            if table == "Setup" and len(fields) >= 2:
+                slack[fields[0]] = _number(fields[1])
+        except (IndexError, ValueError):
+            pass
+    clocks = {}
+    for clock in sorted(set(fmax) | set(slack)):
+        constraint = None
+        if clock in fmax and clock in slack:
+            constraint = round(1e3/(1e3/fmax[clock] + slack[clock]), 3)
+        clocks[clock] = _clock(constraint, fmax.get(clock), slack.get(clock))
+    return _timing(clocks)
+
+def parse_quartus(build_dir, build_name):
+    def find(suffix):
+        for d in [build_dir, os.path.join(build_dir, "output_files")]:
+            if os.path.isfile(os.path.join(d, build_name + suffix)):
+                return os.path.join(d, build_name + suffix)
+    r = {"toolchain": "quartus"}
+    r["utilization"] = {"total": parse_quartus_utilization(_read(find(".fit.summary")))}
+    if find(".sta.rpt") is not None:
+        r["timing"] = parse_quartus_timing(_read(find(".sta.rpt")))
+    return r
+
+# Libero -------------------------------------------------------------------------------------------
+
+_libero_resources = {
+    "4LUT"     : "lut",
+    "DFF"      : "ff",
+    "LSRAM"    : "bram",
+    "Math"     : "dsp",
+    "User I/O" : "io",
+}
+
+def parse_libero(log):
+    total = {}
+    for name, used, available in re.findall(r"^\|\s*([\w/ ]+?)\s*\|\s*(\d+)\s*\|\s*(\d+)\s*\|", log, re.MULTILINE):
+        resource = _libero_resources.get(name, name.lower().replace(" ", "_"))
+        if resource not in total:
+            total[resource] = _resource(int(used), int(available))
+    return {"toolchain": "libero", "utilization": {"total": total}}
+
+# Reports ------------------------------------------------------------------------------------------
+
+def parse_reports(build_dir, build_name="top", modules=[]):
+    """Parse the toolchain reports found in `build_dir` into the normalized schema (None if no
+    report is found)."""
+    prefix = os.path.join(build_dir, build_name)
+    if os.path.isfile(prefix + "_utilization_place.rpt"):
+        return parse_vivado(build_dir, build_name, modules)
+    if os.path.isfile(prefix + "_nextpnr.log"):
+        return parse_nextpnr(_read(prefix + "_nextpnr.log"))
+    if any(os.path.isfile(os.path.join(d, build_name + ".fit.summary"))
+        for d in [build_dir, os.path.join(build_dir, "output_files")]):
+        return parse_quartus(build_dir, build_name)
+    libero_logs = glob.glob(os.path.join(build_dir, "**", "*_layout_log.log"), recursive=True)
+    if libero_logs:
+        return parse_libero(_read(libero_logs[0]))
+    return None
+
+def write_reports(build_dir, build_name="top", modules=[]):
+    reports = parse_reports(build_dir, build_name, modules)
+    if reports is not None:
+        with open(os.path.join(build_dir, build_name + "_reports.json"), "w") as f:
+            json.dump(reports, f, indent=4, sort_keys=True)
+    return reports
+
+def print_reports(reports, file=sys.stdout):
+    total = reports["utilization"]["total"]
+    print("Utilization ({}):".format(reports["toolchain"]), file=file)
+    for resource, r in sorted(total.items(), key=lambda r: (r[0] not in resources, r[0])):
+        print("  {:16s} {:>10g} / {:>10s} {:>8s}".format(resource, r["used"],
+            "{:g}".format(r["available"]) if r["available"] else "-",
+            "{:.2f}%".format(r["percent"]) if r["percent"] is not None else ""), file=file)
+    if "timing" in reports:
+        print("Timing ({}):".format("met" if reports["timing"]["met"] else "FAILED"), file=file)
+        for clock, c in sorted(reports["timing"]["clocks"].items()):
+            print("  {:32s} {:>10s} MHz / {:>10s} MHz".format(clock,
+                "{:.2f}".format(c["fmax_mhz"]) if c["fmax_mhz"] is not None else "-",
+                "{:.2f}".format(c["constraint_mhz"]) if c["constraint_mhz"] is not None else "-"),
+                file=file)
+
+# Builder Integration ------------------------------------------------------------------------------
+
+def reports_args(parser):
+    parser.add_argument("--reports", action="store_true",
+        help="generate machine-readable utilization/timing reports (<build_name>_reports.json)")
+
+def build_reports(builder, args=None):
+    """Generate the reports after the builds of `builder` compiling the gateware (when --reports
+    is given)."""
+    if args is not None and not getattr(args, "reports", False):
+        return
+    toolchain = builder.soc.platform.toolchain
+    # Vivado: dump the cells for the per-submodule breakdown.
+    if hasattr(toolchain, "additional_commands"):
+        toolchain.additional_commands = list(toolchain.additional_commands) + [vivado_cells_command]
+    # Nextpnr: save the log.
+    template = getattr(toolchain, "build_template", None)
+    if isinstance(template, list):
+        toolchain.build_template = [cmd + " --log {build_name}_nextpnr.log"
+            if cmd.lstrip().startswith("nextpnr") and "--log" not in cmd else cmd for cmd in template]
+
+    def reports_hook(build, **kwargs):
+        r = build(**kwargs)
+        if builder.compile_gateware and kwargs.get("run", True):
+            reports = write_reports(builder.gateware_dir, kwargs.get("build_name", "top"),
+                soc_modules(builder.soc))
+            if reports is not None:
+                print_reports(reports)
+        return r
+    add_build_hook(builder, reports_hook)
+
+# Main ---------------------------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse toolchain reports into a normalized JSON")
+    parser.add_argument("build_dir",    help="gateware directory")
+    parser.add_argument("--build-name", default="top", help="build name (default=top)")
+    parser.add_argument("--modules",    default=[], nargs="+",
+        help="SoC submodules for the per-submodule breakdown (ex: ddrphy sdram ethmac)")
+    parser.add_argument("--output",     default=None,
+        help="output JSON file (default=<build_dir>/<build_name>_reports.json)")
+    args = parser.parse_args()
+
+    reports = parse_reports(args.build_dir, args.build_name, args.modules)
+    if reports is None:
+        print("No toolchain report found in {}.".format(args.build_dir))
+        sys.exit(1)
+    output = args.output or os.path.join(args.build_dir, args.build_name + "_reports.json")
+    with open(output, "w") as f:
+        json.dump(reports, f, indent=4, sort_keys=True)
+    print_reports(reports)
+
+if __name__ == "__main__":
+    main()
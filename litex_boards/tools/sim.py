@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+
+# License: BSD
+
+"""Simulation-backed variant of the targets for memory bandwidth benchmarking.
+
+The target SoC is elaborated with its own arguments to capture its configuration (CPU,
+sys_clk_freq, integrated ROM/SRAM, SDRAM module, PHY settings and add_sdram parameters such as the
+L2 cache size) and an equivalent SoC is built for Verilator: same bus, L2 cache and LiteDRAM
+controller with the same SDRAM module and PHY settings (latencies, phases), but with the simulated
+SDRAM PHY/DRAM model in place of the board PHY.
+
+The simulation is run until the BIOS reports the memory speed, the (simulated time) write/read
+bandwidth being saved to <output-dir>/sim_benchmark.json:
+
+    ./sim.py arty --threads 4
+    ./sim.py ulx3s -- --sdram-module=AS4C32M16
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import inspect
+import argparse
+import importlib
+import subprocess
+
+from migen import *
+
+from litex.build.generic_platform import Pins, Subsignal
+from litex.build.io import CRG
+from litex.build.sim import SimPlatform
+from litex.build.sim.config import SimConfig
+
+from litex.soc.cores.clock import *
+from litex.soc.integration.soc import SoC
+from litex.soc.integration.soc_core import SoCCore
+from litex.soc.integration.builder import Builder
+
+from litedram.phy.model import SDRAMPHYModel
+
+from litex_boards.tools.benchmark import target_required_args
+
+# Target Configuration -----------------------------------------------------------------------------
+
+class _Elaborated(Exception):
+    def __init__(self, soc):
+        self.soc = soc
+
+def target_config(target, argv=[]):
+    """Elaborate `target` with arguments `argv` and return its SoC configuration."""
+    config = {"sdram": None}
+
+    # Record add_sdram parameters.
+    add_sdram = SoC.add_sdram
+    signature = inspect.signature(add_sdram)
+    def recorded_add_sdram(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        sdram = dict(bound.arguments)
+        sdram.pop("self")
+        sdram.update(sdram.pop("kwargs", {}))
+        config["sdram"] = sdram
+        return add_sdram(*args, **kwargs)
+
+    # Stop at the build.
+    build = Builder.build
+    def elaborated(builder, **kwargs):
+        raise _Elaborated(builder.soc)
+
+    module = importlib.import_module("litex_boards.targets." + target)
+    sys_argv = sys.argv
+    sys.argv = [target] + target_required_args.get(target, []) + list(argv)
+    SoC.add_sdram = recorded_add_sdram
+    Builder.build = elaborated
+    try:
+        module.main()
+        raise ValueError("{} did not build a SoC.".format(target))
+    except _Elaborated as e:
+        soc = e.soc
+    finally:
+        SoC.add_sdram = add_sdram
+        Builder.build = build
+        sys.argv = sys_argv
+
+    config.update({
+        "sys_clk_freq"             : int(getattr(soc, "sys_clk_freq", getattr(soc, "clk_freq", 0))),
+        "cpu_type"                 : getattr(soc, "cpu_type", None),
+        "cpu_variant"              : getattr(soc, "cpu_variant", None),
+        "integrated_rom_size"      : getattr(soc, "integrated_rom_size", 0),
+        "integrated_sram_size"     : getattr(soc, "integrated_sram_size", 0x2000),
+        "integrated_main_ram_size" : getattr(soc, "integrated_main_ram_size", 0),
+    })
+    return config
+
+# Simulation Platform ------------------------------------------------------------------------------
+
+_io = [
+    ("sys_clk", 0, Pins(1)),
+    ("sys_rst", 0, Pins(1)),
+    ("serial", 0,
+        Subsignal("source_valid", Pins(1)),
+        Subsignal("source_ready", Pins(1)),
+        Subsignal("source_data",  Pins(8)),
+
+        Subsignal("sink_valid",   Pins(1)),
+        Subsignal("sink_ready",   Pins(1)),
+        Subsignal("sink_data",    Pins(8)),
+    ),
+]
+
+class Platform(SimPlatform):
+    def __init__(self):
+        SimPlatform.__init__(self, "SIM", _io)
+
+# Simulation SoC -----------------------------------------------------------------------------------
+
+class SimSoC(SoCCore):
+    def __init__(self, config, memtest_size=0x10000):
+        platform     = Platform()
+        sys_clk_freq = config["sys_clk_freq"]
+
+        # SoCCore ----------------------------------------------------------------------------------
+        SoCCore.__init__(self, platform, clk_freq=sys_clk_freq,
+            cpu_type                 = config["cpu_type"],
+            cpu_variant              = config["cpu_variant"],
+            integrated_rom_size      = config["integrated_rom_size"],
+            integrated_sram_size     = config["integrated_sram_size"],
+            integrated_main_ram_size = config["integrated_main_ram_size"],
+            uart_name                = "sim")
+
+        # CRG --------------------------------------------------------------------------------------
+        self.submodules.crg = CRG(platform.request("sys_clk"))
+
+        # SDRAM (model of the target SDRAM module, behind the target PHY settings) -----------------
+        sdram = config["sdram"]
+        if sdram is not None and not self.integrated_main_ram_size:
+            self.submodules.sdrphy = SDRAMPHYModel(sdram["module"], sdram["phy"].settings, sys_clk_freq)
+            kwargs = {k: v for k, v in sdram.items() if k not in ["name", "phy", "module", "origin"]}
+            self.add_sdram("sdram",
+                phy    = self.sdrphy,
+                module = sdram["module"],
+                origin = self.mem_map["main_ram"],
+                **kwargs)
+            # Only measure the speed on a small region (full memtests are too slow in simulation).
+            self.add_constant("MEMTEST_BUS_SIZE",  0)
+            self.add_constant("MEMTEST_ADDR_SIZE", 0)
+            self.add_constant("MEMTEST_DATA_SIZE", memtest_size)
+
+# Run ----------------------------------------------------------------------------------------------
+
+_speed_res = [
+    # LiteX BIOS memspeed reports.
+    re.compile(r"Memspeed Writes: (?P<write>[\d.]+)Mbps Reads: (?P<read>[\d.]+)Mbps"),
+    re.compile(r"Write speed: (?P<write>[\d.]+)MiB/s[\s\S]*Read speed: (?P<read>[\d.]+)MiB/s"),
+]
+
+def parse_speed(log):
+    """Return (write, read) bandwidth in bytes/s from the BIOS log, or None."""
+    for r in _speed_res:
+        m = r.search(log)
+        if m is not None:
+            scale = 1e6/8 if "Mbps" in r.pattern else 1024**2
+            return float(m.group("write"))*scale, float(m.group("read"))*scale
+    return None
+
+def run_sim(build_dir, timeout=3600):
+    """Run the built simulation until the BIOS reports the memory speed (or prompt/timeout)."""
+    log = ""
+    p = subprocess.Popen(["obj_dir/Vsim"], cwd=build_dir,
+        stdout = subprocess.PIPE,
+        stderr = subprocess.STDOUT)
+    os.set_blocking(p.stdout.fileno(), False)
+    start = time.time()
+    try:
+        while p.poll() is None and time.time() - start < timeout:
+            data = p.stdout.read()
+            if data:
+                sys.stdout.write(data.decode(errors="replace"))
+                log += data.decode(errors="replace")
+                if parse_speed(log) is not None or "litex>" in log:
+                    break
+            else:
+                time.sleep(0.1)
+    finally:
+        p.kill()
+        p.wait()
+    return log
+
+def benchmark(target, argv=[], output_dir=None, threads=1, trace=False, timeout=3600):
+    config = target_config(target, argv)
+    output_dir = output_dir or os.path.join("build", target + "_sim")
+    soc = SimSoC(config)
+    builder = Builder(soc, output_dir=output_dir)
+    sim_config = SimConfig(default_clk="sys_clk")
+    sim_config.add_module("serial2console", "serial")
+    builder.build(sim_config=sim_config, run=False, threads=threads, trace=trace, opt_level="O3")
+    log   = run_sim(builder.gateware_dir, timeout)
+    speed = parse_speed(log)
+    sdram = config["sdram"]
+    result = {
+        "target"        : target,
+        "args"          : list(argv),
+        "sys_clk_freq"  : config["sys_clk_freq"],
+        "cpu_type"      : config["cpu_type"],
+        "sdram_module"  : None if sdram is None else sdram["module"].__class__.__name__,
+        "l2_cache_size" : None if sdram is None else sdram.get("l2_cache_size"),
+        "write_bps"     : None if speed is None else speed[0],
+        "read_bps"      : None if speed is None else speed[1],
+    }
+    with open(os.path.join(output_dir, "sim_benchmark.json"), "w") as f:
+        json.dump(result, f, indent=4)
+    return result
+
+# Main ---------------------------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulation-backed target memory benchmark",
+        epilog="Target arguments are passed after --.")
+    parser.add_argument("target",       help="target name (ex: arty)")
+    parser.add_argument("--output-dir", default=None, help="output directory (default=build/<target>_sim)")
+    parser.add_argument("--threads",    default=1, type=int, help="Verilator threads (default=1)")
+    parser.add_argument("--trace",      action="store_true", help="enable VCD tracing")
+    parser.add_argument("--timeout",    default=3600, type=float, help="simulation timeout in seconds")
+    parser.add_argument("target_args",  nargs=argparse.REMAINDER, help="target arguments")
+    args = parser.parse_args()
+
+    target_args = [a for a in args.target_args if a != "--"]
+    r = benchmark(args.target, target_args,
+        output_dir = args.output_dir,
+        threads    = args.threads,
+        trace      = args.trace,
+        timeout    = args.timeout)
+    if r["write_bps"] is None:
+        print("No memory speed reported by the simulation.")
+        sys.exit(1)
+    print("{} ({}, L2 {} bytes, {:.2f}MHz): write {:.2f}MB/s, read {:.2f}MB/s".format(
+        r["target"], r["sdram_module"], r["l2_cache_size"], r["sys_clk_freq"]/1e6,
+        r["write_bps"]/1e6, r["read_bps"]/1e6))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+
+# License: BSD
+
+"""Shared BIOS/software object cache across targets.
+
+Targets with the same CPU configuration compile the same BIOS/libraries sources with the same
+compiler and flags: only the sources including the generated headers (csr.h, soc.h, mem.h) differ.
+The compiler is wrapped (through shims placed first in PATH, inherited by the software make) and
+each object is cached under a hash of:
+- the compiler (path and version),
+- the compilation flags (without output/include paths and dependency file flags),
+- the preprocessed source (without line markers, so identical sources compiled from different build
+  directories share the same entry).
+
+Sources not depending on the generated headers are then compiled once for all targets (and builds),
+the others being compiled again only when the content of the headers they include changes.
+
+The batch builder enables it by default; for manual builds:
+
+    eval $(python3 -m litex_boards.tools.software_cache --env)
+    ./arty.py --build
+"""
+
+import os
+import re
+import sys
+import stat
+import shutil
+import hashlib
+import argparse
+import subprocess
+
+# Helpers ------------------------------------------------------------------------------------------
+
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+default_cache_dir  = os.path.join(os.path.expanduser("~"), ".cache", "litex_boards", "software")
+default_cache_size = 2*1024**3
+
+# Compilers wrapped by the shims (cross compilers found in PATH and clang).
+_compilers_re = re.compile(r"^([\w.]+-)+(gcc|g\+\+)$|^clang(\+\+)?$")
+
+# Flags not affecting the generated object: (flag, number of values).
+_ignored_flags = {
+    "-o"  : 1,
+    "-MF" : 1,
+    "-MT" : 1,
+    "-MQ" : 1,
+    "-MD" : 0,
+    "-MMD": 0,
+    "-MP" : 0,
+}
+
+def _compiler_version(compiler):
+    return subprocess.run([compiler, "--version"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        check=True).stdout
+
+def _parse_args(args):
+    """Return (source, output, dependencies, hashed flags, preprocessor flags) of a compilation
+    command, source being None when it is not a single source compilation to an object."""
+    source, output, deps = None, None, False
+    hashed, preprocess   = [], []
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg in _ignored_flags:
+            n = _ignored_flags[arg]
+            if arg == "-o":
+                output = args[i + 1]
+            if arg in ["-MD", "-MMD"]:
+                deps = True
+            i += 1 + n
+            continue
+        if arg.startswith("-I") or arg in ["-isystem", "-iquote"]:
+            # Include paths only change the preprocessed source (which is hashed).
+            n = 2 if arg in ["-I", "-isystem", "-iquote"] else 1
+            preprocess += args[i:i + n]
+            i += n
+            continue
+        if arg.endswith((".c", ".cpp", ".cc", ".S")) and not arg.startswith("-"):
+            if source is not None:
+                return None, None, False, [], []
+            source = arg
+        elif arg != "-c":
+            hashed.append(arg)
+            preprocess.append(arg)
+        i += 1
+    if "-c" not in args or output is None or not output.endswith(".o"):
+        return None, None, False, [], []
+    return source, output, deps, hashed, preprocess
+
+# Software Cache -----------------------------------------------------------------------------------
+
+class SoftwareCache:
+    def __init__(self, path=None, max_size=None):
+        self.path     = path or os.getenv("LITEX_BOARDS_SOFTWARE_CACHE_DIR", default_cache_dir)
+        self.max_size = max_size or int(os.getenv("LITEX_BOARDS_SOFTWARE_CACHE_SIZE", default_cache_size))
+
+    def compiler_version(self, compiler):
+        """Return the version of `compiler`, memoized in the cache per compiler path and mtime (each
+        compilation runs in its own process, running `compiler --version` each time is costly)."""
+        path  = os.path.realpath(shutil.which(compiler) or compiler)
+        key   = "{}\0{}".format(path, os.stat(path).st_mtime_ns)
+        entry = os.path.join(self.path, "compilers", hashlib.sha256(key.encode()).hexdigest())
+        if os.path.isfile(entry):
+            with open(entry, "rb") as f:
+                return f.read()
+        version = _compiler_version(compiler)
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        tmp = entry + ".{}".format(os.getpid())
+        with open(tmp, "wb") as f:
+            f.write(version)
+        os.replace(tmp, entry)
+        return version
+
+    def compile(self, compiler, args):
+        """Compile with `compiler` and `args`, reusing the cached object when possible. Returns the
+        compiler return code."""
+        source, output, deps, hashed, preprocess = _parse_args(args)
+        if source is None:
+            return subprocess.call([compiler] + args)
+
+        # Preprocess (and generate the dependencies file expected by make).
+        cmd = [compiler] + preprocess + ["-E", source]
+        if deps:
+            cmd += ["-MD", "-MP", "-MF", os.path.splitext(output)[0] + ".d", "-MT", output]
+        p = subprocess.run(cmd, stdout=subprocess.PIPE)
+        if p.returncode != 0:
+            return subprocess.call([compiler] + args)
+        preprocessed = re.sub(rb"^# \d+ .*\n", b"", p.stdout, flags=re.MULTILINE)
+
+        h = hashlib.sha256()
+        h.update(os.path.basename(compiler).encode())
+        h.update(self.compiler_version(compiler))
+        h.update("\0".join(hashed).encode())
+        h.update(os.path.splitext(source)[1].encode())
+        h.update(preprocessed)
+        entry = os.path.join(self.path, "objects", h.hexdigest()[:2], h.hexdigest() + ".o")
+
+        # Hit.
+        if os.path.isfile(entry):
+            shutil.copyfile(entry, output)
+            os.utime(entry)
+            return 0
+
+        # Miss.
+        r = subprocess.call([compiler] + args)
+        if r == 0:
+            os.makedirs(os.path.dirname(entry), exist_ok=True)
+            tmp = entry + ".{}".format(os.getpid())
+            shutil.copyfile(output, tmp)
+            os.replace(tmp, entry)
+        return r
+
+    def evict(self):
+        entries = []
+        for root, dirs, files in os.walk(os.path.join(self.path, "objects")):
+            for f in files:
+                s = os.stat(os.path.join(root, f))
+                entries.append((s.st_mtime, s.st_size, os.path.join(root, f)))
+        size = sum(e[1] for e in entries)
+        for mtime, entry_size, filename in sorted(entries):
+            if size <= self.max_size:
+                break
+            os.remove(filename)
+            size -= entry_size
+
+# Shims --------------------------------------------------------------------------------------------
+
+def install_shims(shims_dir, path=None):
+    """Create compiler shims in `shims_dir` for the compilers found in `path` (default: PATH)."""
+    path = path if path is not None else os.getenv("PATH", "")
+    os.makedirs(shims_dir, exist_ok=True)
+    for d in path.split(os.pathsep):
+        if not os.path.isdir(d) or os.path.abspath(d) == os.path.abspath(shims_dir):
+            continue
+        for name in os.listdir(d):
+            shim = os.path.join(shims_dir, name)
+            if not _compilers_re.match(name) or os.path.exists(shim):
+                continue
+            with open(shim, "w") as f:
+                f.write("#!/bin/sh\n")
+                f.write("PYTHONPATH=\"{}${{PYTHONPATH:+:$PYTHONPATH}}\" exec \"{}\" -m {} --compile \"{}\" \"$@\"\n".format(
+                    root_dir, sys.executable, "litex_boards.tools.software_cache", os.path.join(d, name)))
+            os.chmod(shim, os.stat(shim).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+def software_cache_env(cache_dir=None, env=None):
+    """Return `env` (default: os.environ) with the compiler shims of the cache first in PATH."""
+    env   = dict(os.environ if env is None else env)
+    cache = SoftwareCache(cache_dir)
+    shims = os.path.join(cache.path, "shims")
+    install_shims(shims, env.get("PATH", ""))
+    cache.evict()
+    env["PATH"] = os.pathsep.join([shims, env.get("PATH", "")])
+    env["LITEX_BOARDS_SOFTWARE_CACHE_DIR"] = cache.path
+    return env
+
+# Main ---------------------------------------------------------------------------------------------
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == "--compile":
+        sys.exit(SoftwareCache().compile(sys.argv[2], sys.argv[3:]))
+
+    parser = argparse.ArgumentParser(description="Shared BIOS/software object cache")
+    parser.add_argument("--cache-dir", default=None, help="cache directory")
+    parser.add_argument("--env",       action="store_true", help="print the shell environment enabling the cache")
+    parser.add_argument("--clear",     action="store_true", help="clear the cache")
+    args = parser.parse_args()
+
+    cache = SoftwareCache(args.cache_dir)
+    if args.clear:
+        shutil.rmtree(cache.path, ignore_errors=True)
+    if args.env:
+        env = software_cache_env(args.cache_dir)
+        for k in ["PATH", "LITEX_BOARDS_SOFTWARE_CACHE_DIR"]:
+            print("export {}=\"{}\"".format(k, env[k]))
+
+if __name__ == "__main__":
+    main()
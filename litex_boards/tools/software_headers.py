@@ -0,0 +1,177 @@
+# License: BSD
+
+"""Software headers of the PCIe targets.
+
+generate_software_headers(soc) writes the headers used by the host software of the PCIe SoCs:
+- csr.h, soc.h, mem.h: CSRs addresses/constants/memory regions (for the kernel driver),
+- csr_mmap.h: self-contained userspace library accessing the CSRs directly through an mmap of the
+  BAR0 window (/sys/bus/pci/devices/<device>/resource0): inline read/write accessors for each CSR
+  and batched read/write helpers, avoiding a syscall/ioctl per CSR access.
+
+    #include "csr_mmap.h"
+
+    struct bar0 bar;
+    bar0_open(&bar, "/sys/bus/pci/devices/0000:02:00.0/resource0");
+    bar0_pcie_dma0_writer_enable_write(&bar, 1);
+    bar0_close(&bar);
+"""
+
+import os
+
+from migen import Memory
+
+from litex.build import tools
+from litex.soc.interconnect.csr import CSRStatus
+from litex.soc.integration.export import get_csr_header, get_soc_header, get_mem_header
+
+# Userspace Library --------------------------------------------------------------------------------
+
+_csr_mmap_lib = """
+#include <stdint.h>
+#include <stddef.h>
+#include <fcntl.h>
+#include <unistd.h>
+#include <sys/mman.h>
+
+#define BAR0_SIZE {bar0_size}
+#define BAR0_CSR_STRIDE {stride}
+
+struct bar0 {{
+	int fd;
+	volatile uint32_t *base;
+}};
+
+static inline int bar0_open(struct bar0 *bar, const char *resource)
+{{
+	void *base;
+	bar->fd = open(resource, O_RDWR | O_SYNC);
+	if (bar->fd < 0)
+		return -1;
+	base = mmap(NULL, BAR0_SIZE, PROT_READ | PROT_WRITE, MAP_SHARED, bar->fd, 0);
+	if (base == MAP_FAILED) {{
+		close(bar->fd);
+		return -1;
+	}}
+	bar->base = (volatile uint32_t *)base;
+	return 0;
+}}
+
+static inline void bar0_close(struct bar0 *bar)
+{{
+	munmap((void *)bar->base, BAR0_SIZE);
+	close(bar->fd);
+}}
+
+/* Single accesses (offset in bytes in the BAR0 window). */
+
+static inline uint32_t bar0_read(struct bar0 *bar, uint32_t offset)
+{{
+	return bar->base[offset/4];
+}}
+
+static inline void bar0_write(struct bar0 *bar, uint32_t offset, uint32_t value)
+{{
+	bar->base[offset/4] = value;
+}}
+
+/* Writes are posted on PCIe: read back to ensure the previous writes have been done. */
+static inline void bar0_flush(struct bar0 *bar)
+{{
+	(void)bar->base[0];
+}}
+
+/* Batched accesses: n consecutive CSR words from offset. */
+
+static inline void bar0_read_burst(struct bar0 *bar, uint32_t offset, uint32_t *values, int n)
+{{
+	int i;
+	for (i = 0; i < n; i++)
+		values[i] = bar->base[offset/4 + i*(BAR0_CSR_STRIDE/4)];
+}}
+
+static inline void bar0_write_burst(struct bar0 *bar, uint32_t offset, const uint32_t *values, int n)
+{{
+	int i;
+	for (i = 0; i < n; i++)
+		bar->base[offset/4 + i*(BAR0_CSR_STRIDE/4)] = values[i];
+}}
+
+/* Batched accesses: n scattered offsets. */
+
+static inline void bar0_read_batch(struct bar0 *bar, const uint32_t *offsets, uint32_t *values, int n)
+{{
+	int i;
+	for (i = 0; i < n; i++)
+		values[i] = bar->base[offsets[i]/4];
+}}
+
+static inline void bar0_write_batch(struct bar0 *bar, const uint32_t *offsets, const uint32_t *values, int n)
+{{
+	int i;
+	for (i = 0; i < n; i++)
+		bar->base[offsets[i]/4] = values[i];
+}}
+"""
+
+def _get_csr_mmap_accessors(name, offset, nwords, read_only):
+    r = "\n#define BAR0_{}_OFFSET {}\n".format(name.upper(), hex(offset))
+    r += "#define BAR0_{}_SIZE {}\n".format(name.upper(), nwords)
+    if nwords == 1:
+        r += "static inline uint32_t bar0_{}_read(struct bar0 *bar) {{\n".format(name)
+        r += "\treturn bar0_read(bar, {});\n}}\n".format(hex(offset))
+        if not read_only:
+            r += "static inline void bar0_{}_write(struct bar0 *bar, uint32_t value) {{\n".format(name)
+            r += "\tbar0_write(bar, {}, value);\n}}\n".format(hex(offset))
+    elif nwords == 2:
+        # CSR words are big-endian ordered (MSBs at the lowest address).
+        r += "static inline uint64_t bar0_{}_read(struct bar0 *bar) {{\n".format(name)
+        r += "\tuint32_t values[2];\n"
+        r += "\tbar0_read_burst(bar, {}, values, 2);\n".format(hex(offset))
+        r += "\treturn ((uint64_t)values[0] << 32) | values[1];\n}\n"
+        if not read_only:
+            r += "static inline void bar0_{}_write(struct bar0 *bar, uint64_t value) {{\n".format(name)
+            r += "\tuint32_t values[2] = {(uint32_t)(value >> 32), (uint32_t)value};\n"
+            r += "\tbar0_write_burst(bar, {}, values, 2);\n}}\n".format(hex(offset))
+    else:
+        r += "static inline void bar0_{}_read(struct bar0 *bar, uint32_t *values) {{\n".format(name)
+        r += "\tbar0_read_burst(bar, {}, values, {});\n}}\n".format(hex(offset), nwords)
+        if not read_only:
+            r += "static inline void bar0_{}_write(struct bar0 *bar, const uint32_t *values) {{\n".format(name)
+            r += "\tbar0_write_burst(bar, {}, values, {});\n}}\n".format(hex(offset), nwords)
+    return r
+
+def get_csr_mmap_header(regions, constants, csr_base, bar0_size=0x20000):
+    """Userspace library header for the CSRs `regions` seen at `csr_base` in the BAR0 window."""
+    alignment = constants.get("CONFIG_CSR_ALIGNMENT", 32)
+    alignment = getattr(alignment, "value", alignment)
+    stride    = alignment//8
+    r = "#ifndef __GENERATED_CSR_MMAP_H\n#define __GENERATED_CSR_MMAP_H\n"
+    r += _csr_mmap_lib.format(bar0_size=hex(bar0_size), stride=stride)
+    for name, region in regions.items():
+        if isinstance(region.obj, Memory):
+            continue
+        assert region.busword == 32
+        offset = region.origin - csr_base
+        r += "\n/* {} */".format(name)
+        for csr in region.obj:
+            nwords = (csr.size + region.busword - 1)//region.busword
+            r += _get_csr_mmap_accessors(name + "_" + csr.name, offset, nwords,
+                isinstance(csr, CSRStatus))
+            offset += stride*nwords
+    r += "\n#endif\n"
+    return r
+
+# Generation ---------------------------------------------------------------------------------------
+
+def generate_software_headers(soc, output_dir="."):
+    """Write csr.h/soc.h/mem.h and the csr_mmap.h userspace library of `soc` to `output_dir`."""
+    csr_header = get_csr_header(soc.csr_regions, soc.constants, with_access_functions=False)
+    tools.write_to_file(os.path.join(output_dir, "csr.h"), csr_header)
+    soc_header = get_soc_header(soc.constants, with_access_functions=False)
+    tools.write_to_file(os.path.join(output_dir, "soc.h"), soc_header)
+    mem_header = get_mem_header(soc.mem_regions)
+    tools.write_to_file(os.path.join(output_dir, "mem.h"), mem_header)
+    csr_mmap_header = get_csr_mmap_header(soc.csr_regions, soc.constants,
+        csr_base  = soc.mem_map["csr"],
+        bar0_size = getattr(soc.pcie_phy, "bar0_size", 0x20000))
+    tools.write_to_file(os.path.join(output_dir, "csr_mmap.h"), csr_mmap_header)
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+
+# License: BSD
+
+"""Differential (sector-diff) SPI flash updates.
+
+Instead of erasing/programming whole images, the flash sectors covered by the images are read
+back (or, with a trusted manifest, their hashes from the previous update are used) and only the
+sectors that changed are erased and programmed. Writes are grouped in contiguous runs of changed
+sectors.
+
+Backends provide read(offset, size), write(offset, data) (with data aligned on the sector size:
+erase and program) and the sector size (4KiB or 64KiB):
+- IceprogBackend:         iCE40 boards programmed with iceprog (64KiB erase granularity).
+- OpenOCDJTAGSPIBackend:  boards with the SPI flash behind the FPGA, through a JTAG-SPI proxy
+                          bitstream (jtagspi).
+
+    ./spiflash.py --backend iceprog build/gateware/top.bin@0 build/software/bios/bios.bin@0x40000
+"""
+
+import os
+import json
+import hashlib
+import argparse
+import tempfile
+import subprocess
+
+# Backends -----------------------------------------------------------------------------------------
+
+class IceprogBackend:
+    sector_size = 64*1024
+
+    def __init__(self, device=None):
+        self.device = device
+
+    def id(self):
+        return "iceprog" + ("-" + self.device if self.device else "")
+
+    def _iceprog(self, args):
+        cmd = ["iceprog"] + (["-d", self.device] if self.device else []) + args
+        subprocess.check_call(cmd)
+
+    def read(self, offset, size):
+        with tempfile.TemporaryDirectory() as d:
+            f = os.path.join(d, "read.bin")
+            self._iceprog(["-o", str(offset), "-R", str(size), f])
+            with open(f, "rb") as f:
+                return f.read()
+
+    def write(self, offset, data):
+        # iceprog erases the aligned 64KiB chunks covered by the data, then programs and verifies.
+        with tempfile.TemporaryDirectory() as d:
+            f = os.path.join(d, "write.bin")
+            with open(f, "wb") as fw:
+                fw.write(data)
+            self._iceprog(["-o", str(offset), f])
+
+class OpenOCDJTAGSPIBackend:
+    def __init__(self, config, flash_proxy, sector_size=64*1024):
+        self.config      = config
+        self.flash_proxy = flash_proxy
+        self.sector_size = sector_size
+
+    def id(self):
+        return "openocd-" + os.path.splitext(os.path.basename(self.config))[0]
+
+    def _openocd(self, cmds):
+        script = "; ".join([
+            "init",
+            "jtagspi_init 0 {{{}}}".format(self.flash_proxy),
+        ] + cmds + ["exit"])
+        subprocess.check_call(["openocd", "-f", self.config, "-c", script])
+
+    def read(self, offset, size):
+        with tempfile.TemporaryDirectory() as d:
+            f = os.path.join(d, "read.bin")
+            self._openocd(["flash read_bank 0 {{{}}} 0x{:x} 0x{:x}".format(f, offset, size)])
+            with open(f, "rb") as f:
+                return f.read()
+
+    def write(self, offset, data):
+        with tempfile.TemporaryDirectory() as d:
+            f = os.path.join(d, "write.bin")
+            with open(f, "wb") as fw:
+                fw.write(data)
+            self._openocd([
+                "flash erase_address 0x{:x} 0x{:x}".format(offset, len(data)),
+                "flash write_bank 0 {{{}}} 0x{:x}".format(f, offset),
+                "flash verify_bank 0 {{{}}} 0x{:x}".format(f, offset),
+            ])
+
+# Sector Diff Flasher ------------------------------------------------------------------------------
+
+manifests_dir = os.path.join(os.path.expanduser("~"), ".cache", "litex_boards", "spiflash")
+
+def _hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+def _runs(sectors):
+    """Group sorted sector indexes in runs of contiguous sectors: [(first, count)]."""
+    runs = []
+    for s in sorted(sectors):
+        if runs and runs[-1][0] + runs[-1][1] == s:
+            runs[-1] = (runs[-1][0], runs[-1][1] + 1)
+        else:
+            runs.append((s, 1))
+    return runs
+
+class SectorDiffFlasher:
+    def __init__(self, backend, sector_size=None, trust_manifest=False, manifest_file=None):
+        self.backend        = backend
+        self.sector_size    = sector_size or backend.sector_size
+        self.trust_manifest = trust_manifest
+        self.manifest_file  = manifest_file or os.path.join(manifests_dir, backend.id() + ".json")
+
+    def load_manifest(self):
+        try:
+            with open(self.manifest_file) as f:
+                manifest = json.load(f)
+            if manifest.get("sector_size") == self.sector_size:
+                return {int(k): v for k, v in manifest["sectors"].items()}
+        except (OSError, ValueError, KeyError):
+            pass
+        return {}
+
+    def save_manifest(self, sectors):
+        os.makedirs(os.path.dirname(self.manifest_file), exist_ok=True)
+        with open(self.manifest_file, "w") as f:
+            json.dump({"sector_size": self.sector_size, "sectors": sectors}, f, indent=4, sort_keys=True)
+
+    def plan(self, images):
+        """Return ({sector: desired contents}, [changed sectors]) to flash `images` [(offset, data)]."""
+        ss = self.sector_size
+
+        # Sectors covered by the images (and number of bytes of each sector set by the images).
+        covered = {}
+        for offset, data in images:
+            for s in range(offset//ss, (offset + len(data) + ss - 1)//ss):
+                start = max(offset, s*ss)
+                end   = min(offset + len(data), (s + 1)*ss)
+                covered[s] = covered.get(s, 0) + end - start
+
+        # Current contents/hashes: from the manifest (for fully covered sectors, if trusted) or
+        # read back.
+        manifest = self.load_manifest() if self.trust_manifest else {}
+        hashes   = {}
+        current  = {}
+        to_read  = []
+        for s in covered:
+            if s in manifest and covered[s] >= ss:
+                hashes[s] = manifest[s]
+            else:
+                to_read.append(s)
+        for first, count in _runs(to_read):
+            data = self.backend.read(first*ss, count*ss)
+            for i in range(count):
+                current[first + i] = data[i*ss:(i + 1)*ss]
+                hashes[first + i]  = _hash(current[first + i])
+
+        # Desired contents.
+        desired = {s: bytearray(current.get(s, b"\xff"*ss)) for s in covered}
+        for offset, data in images:
+            for s in range(offset//ss, (offset + len(data) + ss - 1)//ss):
+                start = max(offset, s*ss)
+                end   = min(offset + len(data), (s + 1)*ss)
+                desired[s][start - s*ss:end - s*ss] = data[start - offset:end - offset]
+
+        changed = sorted(s for s in covered if _hash(bytes(desired[s])) != hashes[s])
+        return desired, changed
+
+    def flash(self, images, dry_run=False):
+        """Flash `images` [(offset, data)], only writing the changed sectors. Returns the list of
+        written sectors."""
+        ss = self.sector_size
+        desired, changed = self.plan(images)
+        print("{}/{} sector(s) of {}KiB changed.".format(len(changed), len(desired), ss//1024))
+        if dry_run:
+            return changed
+        for first, count in _runs(changed):
+            print("Writing 0x{:08x}-0x{:08x}...".format(first*ss, (first + count)*ss - 1))
+            self.backend.write(first*ss, b"".join(bytes(desired[first + i]) for i in range(count)))
+        manifest = self.load_manifest()
+        manifest.update({s: _hash(bytes(data)) for s, data in desired.items()})
+        self.save_manifest(manifest)
+        return changed
+
+    def flash_full(self, images):
+        """Write `images` [(offset, data)] entirely, then update the manifest: sectors fully covered
+        by the images get their new hash, the others written are no longer known."""
+        ss = self.sector_size
+        for offset, data in images:
+            self.backend.write(offset, data)
+        manifest = self.load_manifest()
+        for offset, data in images:
+            for s in range(offset//ss, (offset + len(data) + ss - 1)//ss):
+                start, end = s*ss - offset, (s + 1)*ss - offset
+                if start >= 0 and end <= len(data):
+                    manifest[s] = _hash(data[start:end])
+                else:
+                    manifest.pop(s, None)
+        self.save_manifest(manifest)
+
+def read_images(images):
+    """Read [(offset, filename)] images."""
+    r = []
+    for offset, filename in images:
+        with open(filename, "rb") as f:
+            r.append((offset, f.read()))
+    return r
+
+# Target Arguments ---------------------------------------------------------------------------------
+
+def spiflash_args(parser):
+    parser.add_argument("--flash-full",     action="store_true",
+        help="flash the full images (default: only the changed sectors)")
+    parser.add_argument("--trust-manifest", action="store_true",
+        help="do not read back the sectors written by the previous update")
+
+def spiflash_update(backend, images, args):
+    """Flash [(offset, filename)] `images` with `backend`, differentially unless --flash-full."""
+    flasher = SectorDiffFlasher(backend, trust_manifest=args.trust_manifest)
+    if args.flash_full:
+        flasher.flash_full(read_images(images))
+    else:
+        flasher.flash(read_images(images))
+
+# Main ---------------------------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Differential SPI flash update")
+    parser.add_argument("images",        nargs="+", help="images to flash (file@offset)")
+    parser.add_argument("--backend",     default="iceprog", help="backend: iceprog or openocd")
+    parser.add_argument("--device",      default=None, help="iceprog device (ex: i:0x0403:0x6010)")
+    parser.add_argument("--config",      default=None, help="OpenOCD board configuration")
+    parser.add_argument("--flash-proxy", default=None, help="JTAG-SPI proxy bitstream (OpenOCD)")
+    parser.add_argument("--sector-size", default=64*1024, type=lambda x: int(x, 0),
+        help="OpenOCD backend sector size, must match the flash erase sector size (default=0x10000)")
+    parser.add_argument("--dry-run",     action="store_true", help="only report the changed sectors")
+    spiflash_args(parser)
+    args = parser.parse_args()
+
+    if args.backend == "iceprog":
+        backend = IceprogBackend(args.device)
+    elif args.backend == "openocd":
+        backend = OpenOCDJTAGSPIBackend(args.config, args.flash_proxy, args.sector_size)
+    else:
+        raise ValueError("Unknown backend {}.".format(args.backend))
+    images = []
+    for image in args.images:
+        filename, offset = image.rsplit("@", 1) if "@" in image else (image, "0")
+        images.append((int(offset, 0), filename))
+    if args.dry_run:
+        SectorDiffFlasher(backend, trust_manifest=args.trust_manifest).flash(read_images(images), dry_run=True)
+    else:
+        spiflash_update(backend, images, args)
+
+if __name__ == "__main__":
+    main()
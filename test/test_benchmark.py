@@ -0,0 +1,15 @@
+# License: BSD
+
+import unittest
+
+from litex_boards.tools.benchmark import get_configs
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_configs(self):
+        self.assertEqual(sorted(get_configs("arty")), ["default", "ethernet", "minimal"])
+        self.assertEqual(sorted(get_configs("kc705")), ["default", "ethernet", "minimal", "pcie"])
+        self.assertEqual(get_configs("nereid"), {"pcie": []})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+# License: BSD
+
+import unittest
+
+from litex_boards.tools.build_hooks import add_build_hook
+
+
+class Builder:
+    def __init__(self):
+        self.calls = []
+
+    def build(self, **kwargs):
+        self.calls.append(("build", kwargs))
+        return "vns"
+
+
+class TestBuildHooks(unittest.TestCase):
+    def test_order(self):
+        builder = Builder()
+        def hook(name):
+            def _hook(build, **kwargs):
+                builder.calls.append((name, kwargs))
+                return build(**dict(kwargs, hooks=kwargs.get("hooks", []) + [name]))
+            return _hook
+        add_build_hook(builder, hook("a"))
+        add_build_hook(builder, hook("b"))
+        self.assertEqual(builder.build(run=True), "vns")
+        self.assertEqual(builder.calls, [
+            ("a",     {"run": True}),
+            ("b",     {"run": True, "hooks": ["a"]}),
+            ("build", {"run": True, "hooks": ["a", "b"]}),
+        ])
+        # Other instances are not affected.
+        self.assertEqual(Builder().build(), "vns")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+# License: BSD
+
+import unittest
+
+from migen import *
+from migen.sim import passive
+
+from litedram.common import LiteDRAMNativePort
+
+from litex_boards.tools.dram_benchmark import _CycleCounter, DRAMLatencyProbe
+
+
+class CycleCounterDUT(Module):
+    def __init__(self):
+        self.start = Signal()
+        self.done  = Signal(reset=1)
+        self.submodules.counter = _CycleCounter(self.start, self.done)
+
+
+class LatencyProbeDUT(Module):
+    def __init__(self):
+        self.port = LiteDRAMNativePort("both", address_width=24, data_width=32)
+        self.submodules.probe = DRAMLatencyProbe(self.port)
+
+
+@passive
+def port_model(port, delays, addrs):
+    """Native port accepting each read command and returning its data `delays[n]` cycles later."""
+    yield port.cmd.ready.eq(1)
+    n = 0
+    while True:
+        if (yield port.cmd.valid):
+            addrs.append((yield port.cmd.addr))
+            for i in range(delays[n]):
+                yield
+            yield port.rdata.valid.eq(1)
+            yield
+            yield port.rdata.valid.eq(0)
+            n += 1
+        yield
+
+
+class TestDRAMBenchmark(unittest.TestCase):
+    def test_cycle_counter(self):
+        def generator(dut, busy, results):
+            yield dut.start.eq(1)
+            yield
+            yield dut.start.eq(0)
+            yield dut.done.eq(0)
+            for i in range(busy):
+                yield
+            yield dut.done.eq(1)
+            for i in range(8):
+                yield
+            results.append((yield dut.counter.cycles))
+            # Restart: counter cleared and counting again.
+            yield dut.start.eq(1)
+            yield
+            yield dut.start.eq(0)
+            yield dut.done.eq(0)
+            for i in range(2*busy):
+                yield
+            yield dut.done.eq(1)
+            for i in range(8):
+                yield
+            results.append((yield dut.counter.cycles))
+
+        dut     = CycleCounterDUT()
+        results = []
+        run_simulation(dut, generator(dut, 100, results))
+        self.assertEqual(results, [100, 200])
+
+    def test_latency_probe(self):
+        delays = [3, 7, 5, 4]
+        def generator(dut, results):
+            probe = dut.probe
+            yield probe.base.storage.eq(0x100)
+            yield probe.stride.storage.eq(4)
+            yield probe.count.storage.eq(len(delays))
+            yield
+            yield probe.start.re.eq(1)
+            yield
+            yield probe.start.re.eq(0)
+            yield
+            for i in range(1000):
+                if (yield probe.done.status):
+                    break
+                yield
+            results["done"]  = (yield probe.done.status)
+            results["min"]   = (yield probe.min.status)
+            results["max"]   = (yield probe.max.status)
+            results["total"] = (yield probe.total.status)
+
+        dut     = LatencyProbeDUT()
+        results = {}
+        addrs   = []
+        run_simulation(dut, [generator(dut, results), port_model(dut.port, delays, addrs)])
+        # Latency of a read: command cycle + data delay.
+        latencies = [d + 1 for d in delays]
+        self.assertEqual(results["done"], 1)
+        self.assertEqual(results["min"],   min(latencies))
+        self.assertEqual(results["max"],   max(latencies))
+        self.assertEqual(results["total"], sum(latencies))
+        self.assertEqual(addrs, [0x100 + 4*i for i in range(len(delays))])
+
+if __name__ == "__main__":
+    unittest.main()
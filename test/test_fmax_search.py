@@ -0,0 +1,25 @@
+# License: BSD
+
+import os
+import tempfile
+import unittest
+
+from litex_boards.tools.fmax_search import record_sys_clk_freq, resolve_sys_clk_freq
+
+
+class TestFmaxSearch(unittest.TestCase):
+    def test_resolve(self):
+        with tempfile.TemporaryDirectory() as d:
+            records = os.path.join(d, "sys_clk_freq.json")
+            argv    = ["--sdram-module=AS4C32M16"]
+            record_sys_clk_freq("ulx3s", argv, 72e6, filename=records)
+            # Explicit/default frequencies do not use the records.
+            self.assertEqual(resolve_sys_clk_freq("ulx3s", 50e6, 50e6, argv, records), 50000000)
+            self.assertEqual(resolve_sys_clk_freq("ulx3s", "60e6", 50e6, argv, records), 60000000)
+            # Recorded frequency, only for the recorded configuration.
+            self.assertEqual(resolve_sys_clk_freq("ulx3s", "recorded", 50e6,
+                argv + ["--sys-clk-freq=recorded"], records), 72000000)
+            self.assertEqual(resolve_sys_clk_freq("ulx3s", "recorded", 50e6, [], records), 50000000)
+
+if __name__ == "__main__":
+    unittest.main()
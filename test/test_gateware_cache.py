@@ -0,0 +1,61 @@
+# License: BSD
+
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+from litex_boards.tools.gateware_cache import _litex_boards_modules, GatewareCache
+
+targets_dir = os.path.join(os.path.dirname(__file__), "..", "litex_boards", "targets")
+
+
+class Platform:
+    pass
+
+
+class SoC:
+    def __init__(self, clk_freq):
+        self.platform    = Platform()
+        self.clk_freq    = clk_freq
+        self.cpu_type    = "vexriscv"
+        self.cpu_variant = "standard"
+        self.bus         = SimpleNamespace(regions={"rom": SimpleNamespace(origin=0, size=0x8000)})
+        self.csr         = SimpleNamespace(locs={"ctrl": 0})
+        self.irq         = SimpleNamespace(locs={"uart": 0})
+        self.constants   = {"CONFIG_CLOCK_FREQUENCY": clk_freq}
+
+
+def builder(clk_freq=50e6, csr_csv=None):
+    return SimpleNamespace(soc=SoC(clk_freq), gateware_dir="build/gateware",
+        software_dir="build/software", csr_csv=csr_csv, compile_software=True, compile_gateware=True)
+
+
+class TestGatewareCache(unittest.TestCase):
+    def test_key(self):
+        with tempfile.TemporaryDirectory() as d:
+            cache = GatewareCache(d)
+            args  = {"with_ethernet": False, "output_dir": "build", "load": False}
+            key   = cache.key(builder(), args, run=True)
+            # Loading/output options do not change the key.
+            self.assertEqual(key, cache.key(builder(), dict(args, load=True, output_dir="b"), run=True))
+            # SoC (resolved values), gateware arguments, exports and build arguments do.
+            self.assertNotEqual(key, cache.key(builder(clk_freq=60e6), args, run=True))
+            self.assertNotEqual(key, cache.key(builder(), dict(args, with_ethernet=True), run=True))
+            self.assertNotEqual(key, cache.key(builder(csr_csv="csr.csv"), args, run=True))
+            self.assertNotEqual(key, cache.key(builder(), args, run=False))
+
+    def test_imported_modules(self):
+        # Gateware from litex_boards.tools (and its own imports) must be part of the key.
+        modules = _litex_boards_modules(os.path.join(targets_dir, "nereid.py"))
+        for name in [
+            "litex_boards.platforms.nereid",
+            "litex_boards.tools.l2_cache",
+            "litex_boards.tools.msi_moderation",
+            "litex_boards.tools.remote_update",
+            "litex_boards.tools.spiflash"]:
+            self.assertIn(name, modules)
+        self.assertNotIn("litex_boards.targets.arty", modules)
+
+if __name__ == "__main__":
+    unittest.main()
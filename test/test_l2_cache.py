@@ -0,0 +1,47 @@
+# License: BSD
+
+import argparse
+import unittest
+
+from litex_boards.tools.l2_cache import bram_bytes, l2_cache_size, l2_cache_min_data_width
+from litex_boards.tools.l2_cache import l2_cache_args, l2_cache_argdict
+
+
+class Platform:
+    def __init__(self, device):
+        self.device = device
+
+
+class TestL2Cache(unittest.TestCase):
+    def test_bram(self):
+        self.assertEqual(bram_bytes("xc7a35ticsg324-1L"), 50*36*1024//8)
+        self.assertEqual(bram_bytes(" xc7k160tffg676-2"), 325*36*1024//8)
+        self.assertEqual(bram_bytes("LFE5UM5G-85F-8BG381C"), bram_bytes("LFE5U-85F-6BG381C"))
+        self.assertIsNone(bram_bytes("ice40-up5k-sg48"))
+
+    def test_size(self):
+        arty  = Platform("xc7a35ticsg324-1L")
+        vc707 = Platform("xc7vx485tffg1761-2")
+        self.assertEqual(l2_cache_size(arty), 16384)
+        self.assertEqual(l2_cache_size(vc707), 256*1024)
+        self.assertEqual(l2_cache_size(Platform("EP4CE22F17C6")), 8192)
+        self.assertEqual(l2_cache_size(Platform("unknown")), 8192)
+        self.assertEqual(l2_cache_size(vc707, l2_bram_percent=1), 32768)
+        self.assertEqual(l2_cache_size(vc707, l2_size=4096, l2_bram_percent=1), 4096)
+        self.assertEqual(l2_cache_size(arty, l2_bram_percent=0.1), 8192)
+        self.assertEqual(l2_cache_size(vc707, l2_bram_percent=0), 8192)
+        self.assertEqual(l2_cache_min_data_width(arty), 128)
+        self.assertEqual(l2_cache_min_data_width(vc707), 256)
+        self.assertEqual(l2_cache_min_data_width(vc707, min_l2_data_width=64), 64)
+
+    def test_args(self):
+        parser = argparse.ArgumentParser()
+        parser.add_argument("--min-l2-data-width", default=128, type=int)
+        l2_cache_args(parser)
+        args  = parser.parse_args([])
+        vc707 = Platform("xc7vx485tffg1761-2")
+        self.assertEqual(l2_cache_min_data_width(vc707, min_l2_data_width=args.min_l2_data_width,
+            **l2_cache_argdict(args)), 256)
+        args  = parser.parse_args(["--min-l2-data-width=128"])
+        self.assertEqual(l2_cache_min_data_width(vc707, min_l2_data_width=args.min_l2_data_width,
+            **l2_cache_argdict(args)), 128)
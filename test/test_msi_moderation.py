@@ -0,0 +1,42 @@
+# License: BSD
+
+import unittest
+
+from litex_boards.tools.msi_moderation import simulate, traffic
+
+
+class TestMSIModeration(unittest.TestCase):
+    def test_disabled(self):
+        events = traffic("periodic", 128)
+        fired, latencies = simulate(events, count=1, timeout=0)
+        self.assertEqual(len(fired), len(events))
+        self.assertEqual(max(latencies), 0)
+
+    def test_count(self):
+        events = traffic("periodic", 512)
+        fired, latencies = simulate(events, count=8, timeout=1000)
+        self.assertEqual(len(fired), 512//8)
+        self.assertLess(max(latencies), 8*8)
+
+    def test_bursty(self):
+        events = traffic("bursty", 512)
+        fired, latencies = simulate(events, count=32, timeout=1000)
+        self.assertEqual(len(fired), 512//32)
+        self.assertLessEqual(max(latencies), 1000)
+
+    def test_timeout(self):
+        events = traffic("sparse", 16)
+        fired, latencies = simulate(events, count=32, timeout=500)
+        self.assertEqual(len(fired), len(events))
+        self.assertNotIn(None, latencies)
+        self.assertLessEqual(max(latencies), 500)
+
+    def test_partial(self):
+        # Tail of a burst: interrupt on timeout for the remaining descriptors.
+        events = traffic("periodic", 20)
+        fired, latencies = simulate(events, count=8, timeout=200)
+        self.assertEqual(len(fired), 3)
+        self.assertLessEqual(max(latencies), 200)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+# License: BSD
+
+import os
+import tempfile
+import unittest
+
+from litex.soc.integration.builder import Builder
+
+from litex_boards.platforms import nereid as nereid_platform
+from litex_boards.tools.pcie import msi_vector
+from litex_boards.targets import kc705, kcu105, netv2, nereid
+
+
+def build_test(soc):
+    with tempfile.TemporaryDirectory() as d:
+        builder = Builder(soc, output_dir=d, compile_software=False, compile_gateware=False)
+        builder.build()
+        return os.path.isfile(os.path.join(d, "gateware", "top.v"))
+
+
+class TestPCIe(unittest.TestCase):
+    def pcie_soc(self, target, **kwargs):
+        return target.PCIeSoC(uart_name="crossover", csr_data_width=32, **kwargs)
+
+    def test_kc705_x8(self):
+        self.assertTrue(build_test(self.pcie_soc(kc705, pcie_lanes=8, pcie_data_width=128)))
+
+    def test_kc705_x8_64(self):
+        with self.assertRaises(AssertionError):
+            self.pcie_soc(kc705, pcie_lanes=8, pcie_data_width=64)
+
+    def test_kcu105_x2_64(self):
+        self.assertTrue(build_test(self.pcie_soc(kcu105, pcie_lanes=2, pcie_data_width=64)))
+
+    def test_netv2_x2_64(self):
+        self.assertTrue(build_test(self.pcie_soc(netv2, pcie_lanes=2, pcie_data_width=64)))
+
+    def test_nereid_dram_dma(self):
+        soc = nereid.PCIeSoC(nereid_platform.Platform(), with_dram_dma=True,
+            uart_name="crossover", csr_data_width=32)
+        self.assertTrue(build_test(soc))
+        for i in range(2):
+            self.assertIn("pcie_dram_writer{}".format(i), soc.csr.locs)
+            self.assertIn("pcie_dram_reader{}".format(i), soc.csr.locs)
+
+    def test_msi_direction_mapping(self):
+        soc = nereid.PCIeSoC(nereid_platform.Platform(), dma_channels=3, dma_msi_mapping="direction",
+            uart_name="crossover", csr_data_width=32)
+        self.assertTrue(build_test(soc))
+        for i in range(3):
+            for n, direction in enumerate(["READER", "WRITER"]):
+                vector = soc.constants["PCIE_DMA{}_{}_INTERRUPT".format(i, direction)]
+                vector = getattr(vector, "value", vector)
+                self.assertEqual(vector, msi_vector(i, n, 3, "direction"))
+                self.assertEqual(vector, n*3 + i)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,31 @@
+# License: BSD
+
+import unittest
+
+from litex_boards.tools.pcie_benchmark import run_benchmark
+
+
+class TestPCIeBenchmark(unittest.TestCase):
+    def check(self, results, name):
+        r = results[name]
+        self.assertEqual(r["bytes"], results["channels"]*results["descriptors"]*results["descriptor_size"])
+        self.assertGreater(r["bandwidth"], 0)
+        self.assertLessEqual(r["bandwidth"], results["link_peak"])
+        self.assertLessEqual(r["bandwidth"], results["datapath_peak"])
+
+    def test_read(self):
+        results = run_benchmark(direction="read", descriptors=4, descriptor_size=1024)
+        self.check(results, "read")
+        self.assertGreaterEqual(results["read"]["first_latency"], 500)
+
+    def test_write(self):
+        results = run_benchmark(direction="write", descriptors=4, descriptor_size=1024)
+        self.check(results, "write")
+
+    def test_channels(self):
+        results = run_benchmark(direction="both", channels=2, descriptors=2, descriptor_size=1024)
+        self.check(results, "read")
+        self.check(results, "write")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+# License: BSD
+
+import os
+import unittest
+
+from litex_boards import platforms
+
+
+class TestPlatforms(unittest.TestCase):
+    def test_boards(self):
+        platforms_dir = os.path.dirname(platforms.__file__)
+        boards = sorted(f[:-3] for f in os.listdir(platforms_dir)
+            if f.endswith(".py") and not f.startswith("_"))
+        self.assertEqual(platforms.boards(), boards)
+
+    def test_board_info(self):
+        info = platforms.board_info("arty")
+        self.assertEqual(info["vendor"], "xilinx")
+        self.assertEqual(info["family"], "Artix7")
+        self.assertEqual(info["device"], "xc7a35ticsg324-1L")
+        self.assertIn("xc7a100tcsg324-1", info["devices"])
+        self.assertEqual(info["default_clk_name"], "clk100")
+        self.assertEqual(info["default_clk_freq"], 100e6)
+        self.assertIn("ddram", info["resources"])
+        self.assertIn("pmoda", info["connectors"])
+
+    def test_board_filters(self):
+        self.assertIn("kc705",   platforms.boards(resource="pcie_x4"))
+        self.assertIn("ulx3s",   platforms.boards(family="ECP5"))
+        self.assertIn("fomu_pvt", platforms.boards(vendor="lattice", device="ice40-up5k"))
+        self.assertNotIn("arty", platforms.boards(family="ECP5"))
+
+    def test_unknown_board(self):
+        with self.assertRaises(ValueError):
+            platforms.board_info("unknown")
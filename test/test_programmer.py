@@ -0,0 +1,69 @@
+# License: BSD
+
+import os
+import tempfile
+import unittest
+
+from litex_boards.tools.programmer import ECP5Programmer, MockJTAGServer, TclRPCTransport
+
+
+class MockECP5Programmer(ECP5Programmer):
+    def __init__(self, servers, *args, **kwargs):
+        ECP5Programmer.__init__(self, *args, **kwargs)
+        self.servers = servers
+
+    def open(self, serial=None):
+        return TclRPCTransport(port=self.servers[serial].port)
+
+
+class TestProgrammer(unittest.TestCase):
+    ftdi_config = {"vid_pid": (0x0403, 0x6010), "layout_init": (0x00e8, 0x60eb)}
+
+    def test_program(self):
+        bitstream = os.urandom(100000)
+        server = MockJTAGServer(idcode=0x81113043).start()
+        prog   = ECP5Programmer("LFE5UM5G-85F-8BG554I", self.ftdi_config, chunk_size=4096)
+        jtag   = TclRPCTransport(port=server.port)
+        try:
+            prog.program(jtag, bitstream)
+        finally:
+            jtag.close()
+            server.shutdown()
+        self.assertEqual(server.bitstream, bitstream)
+
+    def test_erase_busy(self):
+        bitstream = os.urandom(10000)
+        server = MockJTAGServer(idcode=0x81113043, erase_polls=5).start()
+        prog   = ECP5Programmer("LFE5UM5G-85F-8BG554I", self.ftdi_config)
+        jtag   = TclRPCTransport(port=server.port)
+        try:
+            prog.program(jtag, bitstream)
+        finally:
+            jtag.close()
+            server.shutdown()
+        self.assertFalse(server.error)
+        self.assertEqual(server.bitstream, bitstream)
+
+    def test_wrong_idcode(self):
+        server = MockJTAGServer(idcode=0x41111043).start()
+        prog   = ECP5Programmer("LFE5UM5G-85F-8BG554I", self.ftdi_config)
+        jtag   = TclRPCTransport(port=server.port)
+        try:
+            with self.assertRaises(OSError):
+                prog.program(jtag, b"\x00"*16)
+        finally:
+            jtag.close()
+            server.shutdown()
+        self.assertIsNone(server.bitstream)
+
+    def test_parallel_load(self):
+        bitstream = os.urandom(20000)
+        servers   = {serial: MockJTAGServer(idcode=0x41111043).start() for serial in ["A", "B", "C"]}
+        prog      = MockECP5Programmer(servers, "LFE5U-25F-6BG256C", self.ftdi_config)
+        with tempfile.NamedTemporaryFile(suffix=".bit") as f:
+            f.write(bitstream)
+            f.flush()
+            prog.load_bitstream(f.name, serials=list(servers))
+        for server in servers.values():
+            server.shutdown()
+            self.assertEqual(server.bitstream, bitstream)
@@ -0,0 +1,103 @@
+# License: BSD
+
+import os
+import tempfile
+import unittest
+
+from litex_boards.tools.remote_update import PCIeSPIFlashBackend, bit_to_bin, remote_update
+
+
+class MockSPIFlash:
+    def __init__(self, size=0x100000):
+        self.mem = bytearray(b"\xff"*size)
+        self.wel = False
+        self.cmd = []
+
+    def transfer(self, byte):
+        self.cmd.append(byte)
+        if self.cmd[0] == 0x03 and len(self.cmd) > 4:
+            addr = int.from_bytes(bytes(self.cmd[1:4]), "big")
+            return self.mem[addr + len(self.cmd) - 5]
+        return 0x00
+
+    def release(self):
+        cmd, self.cmd = self.cmd, []
+        if not cmd:
+            return
+        addr = int.from_bytes(bytes(cmd[1:4]), "big")
+        if cmd[0] == 0x06:
+            self.wel = True
+        elif cmd[0] == 0xd8 and self.wel:
+            addr &= ~0xffff
+            self.mem[addr:addr + 0x10000] = b"\xff"*0x10000
+            self.wel = False
+        elif cmd[0] == 0x02 and self.wel:
+            for i, b in enumerate(cmd[4:]):
+                a = (addr & ~0xff) | ((addr + i) & 0xff)
+                self.mem[a] &= b
+            self.wel = False
+
+
+class MockCSRs:
+    device = "0000:01:00.0"
+
+    def __init__(self, flash):
+        self.flash  = flash
+        self.regs   = {"flash_cs": 0, "flash_done": 1, "icap_done": 1}
+        self.icap   = []
+
+    def read(self, name):
+        return self.regs[name]
+
+    def write(self, name, value):
+        self.regs[name] = value
+        if name == "flash_cs" and not value:
+            self.flash.release()
+        if name == "flash_start":
+            assert self.regs["flash_cs"]
+            length = self.regs["flash_length"]
+            data   = self.regs["flash_mosi"].to_bytes(4, "big")[4 - length//8:]
+            miso   = bytes(self.flash.transfer(b) for b in data)
+            self.regs["flash_miso"] = int.from_bytes(miso, "big")
+        if name == "icap_send":
+            self.icap.append((self.regs["icap_addr"], self.regs["icap_data"]))
+
+    def close(self):
+        pass
+
+
+class TestRemoteUpdate(unittest.TestCase):
+    def test_backend(self):
+        flash   = MockSPIFlash()
+        backend = PCIeSPIFlashBackend(MockCSRs(flash))
+        data    = os.urandom(0x10000) + b"\xff"*0x200 + os.urandom(0x1000)
+        backend.write(0x20000, data)
+        self.assertEqual(backend.read(0x20000, len(data)), data)
+        self.assertEqual(flash.mem[0x20000:0x20000 + len(data)], data)
+        self.assertEqual(flash.mem[:0x20000], b"\xff"*0x20000)
+
+    def test_bit_to_bin(self):
+        data   = os.urandom(1000)
+        header = b"\x00\x09\x0f\xf0\x0f\xf0\x0f\xf0\x0f\xf0\x00\x00\x01"
+        for k, v in [(b"a", b"top;UserID=0XFFFFFFFF\x00"), (b"b", b"7k160tffg676\x00"),
+                     (b"c", b"2020/05/01\x00"), (b"d", b"12:00:00\x00")]:
+            header += k + len(v).to_bytes(2, "big") + v
+        header += b"e" + len(data).to_bytes(4, "big")
+        self.assertEqual(bit_to_bin(header + data), data)
+        self.assertEqual(bit_to_bin(data[2:]), data[2:])
+
+    def test_remote_update(self):
+        flash = MockSPIFlash()
+        csrs  = MockCSRs(flash)
+        data  = os.urandom(0x18000)
+        with tempfile.TemporaryDirectory() as d:
+            bitstream = os.path.join(d, "top.bin")
+            with open(bitstream, "wb") as f:
+                f.write(data)
+            args = type("Args", (), {"flash_full": True, "trust_manifest": False})()
+            manifest_file = os.path.join(d, "manifest.json")
+            remote_update(csrs, bitstream, offset=0x80000, reload=False, args=args,
+                manifest_file=manifest_file)
+            self.assertTrue(os.path.isfile(manifest_file))
+        self.assertEqual(flash.mem[0x80000:0x80000 + len(data)], data)
+        self.assertEqual(csrs.icap, [])
@@ -0,0 +1,17 @@
+# License: BSD
+
+import unittest
+
+from litex_boards.tools.sim import target_config, SimSoC
+
+
+class TestSim(unittest.TestCase):
+    def test_arty(self):
+        config = target_config("arty")
+        self.assertIsNotNone(config["sdram"])
+        soc = SimSoC(config)
+        soc.finalize()
+        self.assertIn("sdram", soc.csr.locs)
+
+if __name__ == "__main__":
+    unittest.main()
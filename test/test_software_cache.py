@@ -0,0 +1,34 @@
+# License: BSD
+
+import os
+import stat
+import tempfile
+import unittest
+
+from litex_boards.tools.software_cache import SoftwareCache
+
+
+class TestSoftwareCache(unittest.TestCase):
+    def test_compiler_version(self):
+        with tempfile.TemporaryDirectory() as d:
+            compiler = os.path.join(d, "riscv64-unknown-elf-gcc")
+            calls    = os.path.join(d, "calls")
+            def write_compiler(version, mtime):
+                with open(compiler, "w") as f:
+                    f.write("#!/bin/sh\necho x >> {}\necho {}\n".format(calls, version))
+                os.chmod(compiler, os.stat(compiler).st_mode | stat.S_IXUSR)
+                os.utime(compiler, (mtime, mtime))
+            cache = SoftwareCache(os.path.join(d, "cache"))
+
+            write_compiler("gcc 8.3.0", 1000)
+            self.assertEqual(cache.compiler_version(compiler), b"gcc 8.3.0\n")
+            self.assertEqual(cache.compiler_version(compiler), b"gcc 8.3.0\n")
+            with open(calls) as f:
+                self.assertEqual(len(f.readlines()), 1)
+
+            # Compiler update.
+            write_compiler("gcc 9.2.0", 2000)
+            self.assertEqual(cache.compiler_version(compiler), b"gcc 9.2.0\n")
+
+if __name__ == "__main__":
+    unittest.main()
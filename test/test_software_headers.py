@@ -0,0 +1,51 @@
+# License: BSD
+
+import os
+import shutil
+import tempfile
+import subprocess
+import unittest
+
+from litex.soc.interconnect.csr import CSR, CSRStatus, CSRStorage
+from litex.soc.integration.soc import SoCCSRRegion
+
+from litex_boards.tools.software_headers import get_csr_mmap_header
+
+
+def _regions():
+    return {
+        "ctrl"      : SoCCSRRegion(0x0000, 32, [CSR(name="reset"), CSRStatus(64, name="scratch")]),
+        "pcie_dma0" : SoCCSRRegion(0x8000, 32, [CSRStorage(32, name="enable"),
+                                                 CSRStorage(96, name="table")]),
+    }
+
+
+class TestSoftwareHeaders(unittest.TestCase):
+    def test_offsets(self):
+        header = get_csr_mmap_header(_regions(), {}, csr_base=0x0000)
+        self.assertIn("#define BAR0_CTRL_RESET_OFFSET 0x0", header)
+        self.assertIn("#define BAR0_CTRL_SCRATCH_OFFSET 0x4", header)
+        self.assertIn("#define BAR0_CTRL_SCRATCH_SIZE 2", header)
+        self.assertIn("#define BAR0_PCIE_DMA0_ENABLE_OFFSET 0x8000", header)
+        self.assertIn("#define BAR0_PCIE_DMA0_TABLE_OFFSET 0x8004", header)
+        self.assertIn("#define BAR0_PCIE_DMA0_TABLE_SIZE 3", header)
+
+    def test_accessors(self):
+        header = get_csr_mmap_header(_regions(), {}, csr_base=0x0000)
+        self.assertIn("uint64_t bar0_ctrl_scratch_read(", header)
+        self.assertNotIn("bar0_ctrl_scratch_write(", header)
+        self.assertIn("bar0_pcie_dma0_enable_write(", header)
+        self.assertIn("bar0_pcie_dma0_table_read(struct bar0 *bar, uint32_t *values)", header)
+
+    @unittest.skipIf(shutil.which("cc") is None, "no C compiler")
+    def test_compile(self):
+        header = get_csr_mmap_header(_regions(), {}, csr_base=0x0000)
+        with tempfile.TemporaryDirectory() as d:
+            with open(os.path.join(d, "csr_mmap.h"), "w") as f:
+                f.write(header)
+            with open(os.path.join(d, "main.c"), "w") as f:
+                f.write("#include \"csr_mmap.h\"\nint main(void) { return 0; }\n")
+            subprocess.check_call(["cc", "-Wall", "-Werror", "-c", "main.c", "-o", "main.o"], cwd=d)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+# License: BSD
+
+import os
+import tempfile
+import unittest
+
+from litex_boards.tools.spiflash import SectorDiffFlasher
+
+
+class MemoryBackend:
+    sector_size = 4096
+
+    def __init__(self, size=0x20000):
+        self.mem    = bytearray(os.urandom(size))
+        self.reads  = 0
+        self.writes = []
+
+    def id(self):
+        return "memory"
+
+    def read(self, offset, size):
+        self.reads += 1
+        return bytes(self.mem[offset:offset + size])
+
+    def write(self, offset, data):
+        assert offset % self.sector_size == 0 and len(data) % self.sector_size == 0
+        self.writes.append((offset, len(data)))
+        self.mem[offset:offset + len(data)] = data
+
+
+class TestSPIFlash(unittest.TestCase):
+    def flasher(self, backend, d, **kwargs):
+        return SectorDiffFlasher(backend, manifest_file=os.path.join(d, "manifest.json"), **kwargs)
+
+    def test_sector_diff(self):
+        backend = MemoryBackend()
+        gateware, bios = os.urandom(0x5000), os.urandom(0x3100)
+        with tempfile.TemporaryDirectory() as d:
+            # Initial update writes all the sectors covered by the images.
+            self.flasher(backend, d).flash([(0, gateware), (0x10000, bios)])
+            self.assertEqual(backend.mem[:0x5000], gateware)
+            self.assertEqual(backend.mem[0x10000:0x13100], bios)
+
+            # Only the sector containing the change is written, the rest of the sector is preserved.
+            before = bytes(backend.mem)
+            bios   = bios[:0x3010] + b"\x00" + bios[0x3011:]
+            backend.writes = []
+            self.assertEqual(self.flasher(backend, d).flash([(0, gateware), (0x10000, bios)]), [0x13])
+            self.assertEqual(backend.writes, [(0x13000, 0x1000)])
+            self.assertEqual(backend.mem[0x10000:0x13100], bios)
+            self.assertEqual(backend.mem[0x13100:], before[0x13100:])
+
+            # Unchanged images: nothing written; with a trusted manifest, only partially covered
+            # sectors are read back.
+            backend.writes, backend.reads = [], 0
+            self.flasher(backend, d, trust_manifest=True).flash([(0, gateware), (0x10000, bios)])
+            self.assertEqual(backend.writes, [])
+            self.assertEqual(backend.reads, 1)
+
+    def test_flash_full(self):
+        backend = MemoryBackend()
+        a, b = os.urandom(0x5000), os.urandom(0x5000)
+        with tempfile.TemporaryDirectory() as d:
+            self.flasher(backend, d).flash([(0, a)])
+            # Full write of another image: the manifest must follow, a trusted differential update
+            # back to the first image has to write all its sectors again.
+            self.flasher(backend, d).flash_full([(0, b)])
+            self.assertEqual(backend.mem[:0x5000], b)
+            self.assertEqual(self.flasher(backend, d, trust_manifest=True).flash([(0, a)]),
+                [0, 1, 2, 3, 4])
+            self.assertEqual(backend.mem[:0x5000], a)